@@ -0,0 +1,141 @@
+"""
+Concurrent fan-out for REST APIs, the asyncio counterpart of client.py.
+
+    import asyncio
+    from async_client import AsyncApiClient
+
+    async def main():
+        async with AsyncApiClient("https://jsonplaceholder.typicode.com") as api:
+            async for user_id, user in api.fetch_many(range(1, 1001), concurrency=50):
+                print(user_id, user["name"])
+
+    asyncio.run(main())
+
+Thousands of /users/{id} calls take about (count / concurrency) round trips
+instead of count round trips. fetch_many yields results in input order
+(ordered=True) or as they complete (ordered=False). The first fatal error
+(a 4xx other than 429, or a request that is still failing after its
+retries) cancels all requests in flight and is raised as FetchError.
+"""
+import asyncio
+import random
+
+import aiohttp
+
+from client import DEFAULT_TIMEOUT, RETRY_STATUSES
+
+
+class FetchError(Exception):
+    def __init__(self, key, reason):
+        super().__init__(f"{key}: {reason}")
+        self.key = key
+        self.reason = reason
+
+
+class AsyncApiClient:
+    def __init__(self, base_url, max_connections=100, max_per_host=20, timeout=DEFAULT_TIMEOUT,
+                 retries=3, backoff=0.5, backoff_max=30, headers=None):
+        connect, read = timeout
+        self.session = aiohttp.ClientSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            connector=aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_per_host),
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), self.backoff_max)
+        delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+        return min(delay, self.backoff_max)
+
+    async def request(self, method, url, **kwargs):
+        """Send a request, retrying idempotent ones on 429/5xx and connection errors.
+
+        The body is read before returning, so `await response.json()` works
+        after the connection went back to the pool.
+        """
+        retryable = method.upper() not in ("POST", "PATCH")
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    await response.read()
+                if response.status not in RETRY_STATUSES or not retryable or attempt >= self.retries:
+                    return response
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retryable or attempt >= self.retries:
+                    raise
+            await asyncio.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def fetch_many(self, keys, path="/users/{}", concurrency=10, ordered=True):
+        """GET path.format(key) for every key, at most `concurrency` at a time.
+
+        Yields (key, json) pairs. Stopping the iteration early cancels the rest.
+        """
+        pending = iter(enumerate(keys))
+        results = asyncio.Queue()
+        # workers may run at most this far ahead of what the caller consumed,
+        # so a slow head request in ordered mode can't make results pile up
+        window = asyncio.Semaphore(concurrency * 4)
+
+        async def worker():
+            for index, key in pending:
+                await window.acquire()
+                try:
+                    response = await self.get(path.format(key))
+                    if response.status >= 400:
+                        raise FetchError(key, f"HTTP {response.status}")
+                    await results.put((index, key, await response.json(), None))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = e if isinstance(e, FetchError) else FetchError(key, repr(e))
+                    await results.put((index, key, None, error))
+                    return
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        running = len(workers)
+        waiting = {}
+        next_index = 0
+        try:
+            while running:
+                item = await results.get()
+                if item is None:
+                    running -= 1
+                    continue
+                index, key, data, error = item
+                if error is not None:
+                    raise error
+                if not ordered:
+                    yield key, data
+                    window.release()
+                    continue
+                waiting[index] = (key, data)
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+                    window.release()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def aclose(self):
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
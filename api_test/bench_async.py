@@ -0,0 +1,78 @@
+"""
+Sequential ApiClient vs AsyncApiClient.fetch_many against the local
+stand-in server with injected latency, plus checks of ordering and of
+cancel-on-first-error.
+
+    python bench_async.py [--ids 2000] [--latency 0.05] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from async_client import AsyncApiClient, FetchError
+from client import ApiClient
+from stand_in_server import Handler, start
+
+
+async def fan_out(base_url, ids, concurrency, ordered):
+    async with AsyncApiClient(base_url, max_per_host=concurrency) as api:
+        return [key async for key, _ in api.fetch_many(ids, concurrency=concurrency, ordered=ordered)]
+
+
+async def fan_out_with_error(base_url, ids, concurrency):
+    async with AsyncApiClient(base_url, max_per_host=concurrency) as api:
+        try:
+            async for _ in api.fetch_many(ids, concurrency=concurrency):
+                pass
+        except FetchError as e:
+            return e
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ids", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    Handler.latency = args.latency
+    server, base_url = start()
+    ids = list(range(1, args.ids + 1))
+    failed = False
+    try:
+        # sequential: only a sample, the full run would take ids * latency
+        sample = ids[: max(1, args.ids // 20)]
+        with ApiClient(base_url) as api:
+            started = time.perf_counter()
+            for i in sample:
+                api.get(f"/users/{i}").raise_for_status()
+            sequential = len(sample) / (time.perf_counter() - started)
+        print(f"sequential ApiClient           {sequential:10.1f} req/s")
+
+        for ordered in (True, False):
+            started = time.perf_counter()
+            keys = asyncio.run(fan_out(base_url, ids, args.concurrency, ordered))
+            rate = len(keys) / (time.perf_counter() - started)
+            label = "ordered" if ordered else "as completed"
+            print(f"fetch_many c={args.concurrency} {label:12} {rate:10.1f} req/s")
+            if sorted(keys) != ids or (ordered and keys != ids):
+                print(f"FAIL: {label} results are wrong")
+                failed = True
+
+        Handler.missing_ids = {args.ids // 10}
+        before = Handler.requests_served
+        error = asyncio.run(fan_out_with_error(base_url, ids, args.concurrency))
+        served = Handler.requests_served - before
+        print(f"fatal error: {error}; {served} of {len(ids)} requests were made")
+        if error is None or served >= len(ids):
+            print("FAIL: the error did not stop the fan-out")
+            failed = True
+    finally:
+        server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Requests, bytes transferred and hit ratio with and without the HTTP cache,
+against the local stand-in server.
+
+    python bench_cache.py [--requests 2000] [--max-age 1]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from client import ApiClient
+from http_cache import CachingClient, SQLiteStore
+from stand_in_server import Handler, start
+
+
+def run(label, api, n, ids):
+    requests_before, bytes_before = Handler.requests_served, Handler.bytes_sent
+    started = time.perf_counter()
+    for _ in range(n):
+        # mostly the user list, sometimes one user: a typical polling job
+        path = "/users" if random.random() < 0.7 else f"/users/{random.choice(ids)}"
+        api.get(path).raise_for_status()
+        # spread the run over a few max-age periods so entries go stale
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    print(f"{label:22} {n / elapsed:9.1f} req/s {Handler.requests_served - requests_before:7} "
+          f"requests {Handler.bytes_sent - bytes_before:10} body bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-age", type=int, default=1)
+    args = parser.parse_args()
+
+    Handler.cache_control = f"max-age={args.max_age}, stale-while-revalidate={args.max_age}"
+    server, base_url = start()
+    ids = list(range(1, 11))
+    disk_path = os.path.join(tempfile.mkdtemp(), "http_cache.db")
+    try:
+        with ApiClient(base_url) as api:
+            run("no cache", api, args.requests, ids)
+            cached = CachingClient(api)
+            run("memory cache", cached, args.requests, ids)
+            print(f"  {cached.stats()}")
+            disk = SQLiteStore(disk_path, max_bytes=100_000)
+            cached = CachingClient(api, disk=disk)
+            run("memory + sqlite cache", cached, args.requests, ids)
+            print(f"  {cached.stats()}, {disk.total_bytes()} bytes on disk")
+            disk.close()
+    finally:
+        server.shutdown()
+        shutil.rmtree(os.path.dirname(disk_path))
+
+
+if __name__ == "__main__":
+    main()
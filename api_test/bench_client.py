@@ -0,0 +1,45 @@
+"""
+Requests/sec with a new connection per call (plain requests.get) vs a pooled
+ApiClient, against the local stand-in server.
+
+    python bench_client.py [--requests 2000]
+"""
+import argparse
+import time
+
+import requests
+
+from client import ApiClient
+from stand_in_server import Handler, start
+
+
+def bench(label, get, n):
+    before = Handler.requests_served
+    started = time.perf_counter()
+    for i in range(n):
+        get(f"/users/{i % 10 + 1}").raise_for_status()
+    elapsed = time.perf_counter() - started
+    print(f"{label:32} {n / elapsed:10.1f} req/s ({Handler.requests_served - before} served)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    server, base_url = start()
+    try:
+        bench("requests.get (no pooling)", lambda path: requests.get(base_url + path, timeout=10), args.requests)
+        with ApiClient(base_url) as api:
+            bench("ApiClient (pooled Session)", api.get, args.requests)
+
+            # retries: /flaky/2 fails twice with Retry-After: 1 before succeeding
+            started = time.perf_counter()
+            response = api.get("/flaky/2")
+            print(f"retry: {response.status_code} {response.json()} after {time.perf_counter() - started:.1f}s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
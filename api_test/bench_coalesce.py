@@ -0,0 +1,86 @@
+"""
+Request counts with and without coalescing, against the local stand-in
+server (which counts every request it answers).
+
+    python bench_coalesce.py [--threads 50] [--mutations 5000]
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from client import ApiClient
+from coalesce import CoalescingClient
+from stand_in_server import Handler, start
+
+
+def count_requests(fn):
+    before = Handler.requests_served
+    started = time.perf_counter()
+    fn()
+    return Handler.requests_served - before, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--mutations", type=int, default=5000)
+    args = parser.parse_args()
+
+    Handler.latency = 0.02
+    server, base_url = start()
+    failed = False
+    try:
+        with ApiClient(base_url, pool_size=args.threads) as api, \
+                ThreadPoolExecutor(args.threads) as pool:
+            paths = [f"/users/{i % 5 + 1}" for i in range(args.threads * 10)]
+
+            plain, t = count_requests(lambda: list(pool.map(lambda p: api.get(p).json(), paths)))
+            print(f"GET x{len(paths)} plain:          {plain:6} requests in {t:.2f}s")
+            with CoalescingClient(api) as co:
+                shared, t = count_requests(lambda: list(pool.map(lambda p: co.get(p).json(), paths)))
+            print(f"GET x{len(paths)} single-flight:  {shared:6} requests in {t:.2f}s")
+            failed |= shared >= plain
+
+            ids = range(1, args.mutations + 1)
+
+            def plain_sync():
+                list(pool.map(lambda i: api.patch(f"/users/{i}", json={"age": 50}).raise_for_status(), ids))
+
+            def batched_sync():
+                with CoalescingClient(api) as co:
+                    futures = [co.patch("/users", i, {"age": 50}) for i in ids]
+                    results = [f.result() for f in futures]
+                assert [r["body"]["id"] for r in results] == list(ids)
+
+            plain, t = count_requests(plain_sync)
+            print(f"PATCH x{args.mutations} plain:      {plain:6} requests in {t:.2f}s")
+            batched, t = count_requests(batched_sync)
+            print(f"PATCH x{args.mutations} batched:    {batched:6} requests in {t:.2f}s")
+            failed |= batched * 10 > plain
+
+            # a lone op must not wait for the batch to fill up
+            with CoalescingClient(api, max_delay=0.05) as co:
+                started = time.perf_counter()
+                result = co.patch("/users", 1, {"age": 50}).result(timeout=2)
+                t = time.perf_counter() - started
+                print(f"PATCH x1 batched:          {result['status']:6} after {t:.2f}s")
+                failed |= t > 0.05 + 0.5
+                futures = [co.patch("/users", i, {"age": 51}) for i in range(1, 11)]
+                co.batcher("/users").flush()
+                flushed = all(f.done() for f in futures)
+                print(f"flush() sent its batch:    {flushed!s:>6}")
+                failed |= not flushed
+
+            Handler.bulk_enabled = False
+            fallback, t = count_requests(batched_sync)
+            print(f"PATCH x{args.mutations} no bulk API: {fallback:6} requests in {t:.2f}s (fallback)")
+    finally:
+        server.shutdown()
+    if failed:
+        print("FAIL: coalescing did not reduce request counts, or left a batch waiting")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
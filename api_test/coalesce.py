@@ -0,0 +1,242 @@
+"""
+Fewer requests for high-volume sync jobs.
+
+    from client import ApiClient
+    from coalesce import CoalescingClient
+
+    with CoalescingClient(ApiClient("http://127.0.0.1:8200")) as api:
+        api.get("/users/1")                                   # many threads asking at once -> 1 request
+        futures = [api.patch("/users", i, {"age": 50}) for i in range(1, 1001)]
+        results = [f.result() for f in futures]               # -> ~10 bulk requests
+
+- Single-flight: identical GETs issued while one is already in flight wait
+  for that request and share its response instead of sending their own.
+- Batching: create/update/patch/delete calls for the same collection are
+  queued and sent as one POST <collection>/bulk request once max_batch
+  operations are waiting or max_delay seconds passed, whichever comes first.
+  Each call returns a Future resolving to {"status": ..., "body": ...}.
+  If the server has no bulk endpoint (404/405/501), the batcher remembers
+  that and sends the operations one by one (in order for the same id).
+  A future never stays pending: a failed request, or a bulk response with
+  the wrong number of results, fails every future in the batch.
+  Every batch is sent from the batcher's own thread, flush() included, so
+  operations reach the server in the order they were submitted.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+BULK_UNSUPPORTED = (404, 405, 501)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time; concurrent callers with the same key share its result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class MutationBatcher:
+    """Queues mutations for one collection and sends them in bulk."""
+
+    def __init__(self, api, collection, max_batch=100, max_delay=0.05, bulk_suffix="/bulk"):
+        self.api = api
+        self.collection = "/" + collection.strip("/")
+        self.bulk_path = self.collection + bulk_suffix
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.bulk_supported = None  # unknown until the first batch; only the batcher thread touches it
+        self.requests_sent = 0
+        self._pending = []
+        self._flushes = []  # futures of flush() calls waiting for the queue to drain
+        self._cond = threading.Condition()
+        self._closed = False
+        self._fallback_pool = ThreadPoolExecutor(max_workers=8)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, method, id=None, body=None):
+        op = {"method": method.upper()}
+        if id is not None:
+            op["id"] = id
+        if body is not None:
+            op["body"] = body
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            self._pending.append((op, future))
+            # the first op starts the max_delay clock, a full queue ends it early
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def _take(self):
+        """Wait until a batch is due (full, flushed, or the oldest op waited max_delay), then take it.
+
+        Also returns the flush() futures to resolve once the batch is sent:
+        all of them when this batch empties the queue, none otherwise.
+        """
+        with self._cond:
+            while not self._pending and not self._flushes and not self._closed:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_batch and not self._flushes and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            flushes = []
+            if not self._pending:
+                flushes, self._flushes = self._flushes, []
+            return batch, flushes
+
+    def _run(self):
+        while True:
+            batch, flushes = self._take()
+            if not batch and not flushes:
+                return  # closed and drained
+            if batch:
+                self._send_batch(batch)
+            for future in flushes:
+                future.set_result(None)
+
+    def _send_batch(self, batch):
+        """Send one batch; every future in it ends up resolved, even if sending fails."""
+        try:
+            self._send(batch)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("no result for this operation"))
+
+    def _send(self, batch):
+        if self.bulk_supported is not False:
+            with self._cond:
+                self.requests_sent += 1
+            response = self.api.post(self.bulk_path, json={"operations": [op for op, _ in batch]})
+            if response.status_code in BULK_UNSUPPORTED:
+                self.bulk_supported = False
+            else:
+                response.raise_for_status()
+                self.bulk_supported = True
+                results = response.json().get("results")
+                if not isinstance(results, list) or len(results) != len(batch):
+                    got = len(results) if isinstance(results, list) else results
+                    raise ValueError(f"bulk response has {got} results for {len(batch)} operations")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                return
+        # no bulk endpoint: one request per operation, a few at a time. Operations
+        # on the same id go in order on one worker, so a PATCH can't overtake the
+        # DELETE queued after it; creates (no id) are independent.
+        groups = {}
+        for op, future in batch:
+            key = op.get("id", object())
+            groups.setdefault(key, []).append((op, future))
+        list(self._fallback_pool.map(self._send_in_order, groups.values()))
+
+    def _send_in_order(self, ops):
+        for op, future in ops:
+            try:
+                future.set_result(self._send_one(op))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _send_one(self, op):
+        with self._cond:
+            self.requests_sent += 1
+        path = self.collection if op.get("id") is None else f"{self.collection}/{op['id']}"
+        response = self.api.request(op["method"], path, json=op.get("body"))
+        return {"status": response.status_code, "body": response.json() if response.content else None}
+
+    def flush(self):
+        """Send everything queued so far without waiting for max_delay, and wait until it is sent."""
+        done = Future()
+        with self._cond:
+            if self._closed:
+                return  # close() already drained the queue
+            self._flushes.append(done)
+            self._cond.notify()
+        done.result()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._fallback_pool.shutdown()
+
+
+class CoalescingClient:
+    """Wraps an ApiClient with single-flight GETs and batched mutations."""
+
+    def __init__(self, api, max_batch=100, max_delay=0.05):
+        self.api = api
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._flight = SingleFlight()
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, **kwargs):
+        if kwargs:
+            # params/headers make the request different, keep it simple and don't share
+            return self.api.get(path, **kwargs)
+        return self._flight.do(path, lambda: self.api.get(path))
+
+    def batcher(self, collection):
+        with self._lock:
+            if collection not in self._batchers:
+                self._batchers[collection] = MutationBatcher(
+                    self.api, collection, self.max_batch, self.max_delay
+                )
+            return self._batchers[collection]
+
+    def create(self, collection, body):
+        return self.batcher(collection).submit("POST", body=body)
+
+    def update(self, collection, id, body):
+        return self.batcher(collection).submit("PUT", id, body)
+
+    def patch(self, collection, id, body):
+        return self.batcher(collection).submit("PATCH", id, body)
+
+    def delete(self, collection, id):
+        return self.batcher(collection).submit("DELETE", id)
+
+    def close(self):
+        for batcher in self._batchers.values():
+            batcher.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
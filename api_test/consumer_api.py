@@ -1,4 +1,9 @@
-import requests
+# run from api_test/ (python consumer_api.py): client.py is imported as a
+# top-level module, like the bench_*.py scripts here do
+from client import ApiClient
+
+# one pooled client for every call below, see client.py
+api = ApiClient('https://jsonplaceholder.typicode.com')
 
 #res = requests.get('https://jsonplaceholder.typicode.com/users')
 #print(res.json())
@@ -28,7 +33,7 @@ if res.status_code == 200:
 
 """
 
-res = requests.delete('https://jsonplaceholder.typicode.com/users/5')
+res = api.delete('/users/5')
 
 #print(res.status_code)
 print(res)
@@ -0,0 +1,365 @@
+"""
+A client-side HTTP cache for ApiClient GET requests.
+
+    from client import ApiClient
+    from http_cache import CachingClient, SQLiteStore
+
+    api = CachingClient(ApiClient("https://jsonplaceholder.typicode.com"),
+                        disk=SQLiteStore("http_cache.db", max_bytes=50_000_000))
+    api.get("/users")   # network
+    api.get("/users")   # served from memory while fresh
+    print(api.stats())
+
+What it follows from the response headers:
+- Cache-Control max-age (or Expires) says how long a response is fresh.
+  no-store is never stored, no-cache is stored but revalidated every time.
+- ETag / Last-Modified let a stale entry be revalidated with If-None-Match /
+  If-Modified-Since; a 304 answer refreshes it without sending the body again.
+- stale-while-revalidate=N: for N seconds past freshness the stale copy is
+  returned immediately and refreshed in a background thread.
+- Vary: the request headers it names are stored with the entry, and a
+  request with different values for them is a miss.
+
+Entries are keyed on the full URL plus a hash of the Authorization header
+the request is sent with, so one user's responses are never served to another.
+
+Entries live in an in-memory LRU, and optionally in a SQLite file that drops
+the least recently used entries once it grows past max_bytes.
+"""
+import email.utils
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHEABLE_STATUSES = (200, 203, 300, 301, 308, 404, 410)
+# what a 304 may update on the stored entry; anything else (Content-Length: 0,
+# Content-Encoding) describes the empty 304 body, not the stored one
+REVALIDATION_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date")
+
+
+@dataclass
+class Entry:
+    status: int
+    headers: dict
+    body: bytes
+    # time.time() when the response was received or last revalidated
+    stored_at: float
+    max_age: float = 0.0
+    stale_while_revalidate: float = 0.0
+    no_cache: bool = False
+    last_access: float = field(default_factory=time.time)
+    # {header name: value} of the request, for the names in the response's Vary
+    vary: dict = field(default_factory=dict)
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self):
+        return not self.no_cache and self.age < self.max_age
+
+    @property
+    def usable_stale(self):
+        return not self.no_cache and self.age < self.max_age + self.stale_while_revalidate
+
+    @property
+    def validators(self):
+        headers = CaseInsensitiveDict(self.headers)
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    @property
+    def size(self):
+        return len(self.body) + len(json.dumps(self.headers))
+
+    def matches(self, request_headers):
+        return all(request_headers.get(name) == value for name, value in self.vary.items())
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+def freshness(headers):
+    """Return (store, max_age, stale_while_revalidate, no_cache) for response headers."""
+    cc = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in cc or headers.get("Vary", "").strip() == "*":
+        return False, 0.0, 0.0, False
+    seconds = lambda name: float(cc[name]) if re.fullmatch(r"\d+", cc.get(name, "")) else None
+
+    max_age = seconds("max-age")
+    if max_age is None and headers.get("Expires"):
+        try:
+            expires = email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+            max_age = max(0.0, expires - time.time())
+        except (TypeError, ValueError):
+            max_age = 0.0
+    has_validator = "ETag" in headers or "Last-Modified" in headers
+    if max_age is None and not has_validator:
+        # nothing to go on: no freshness and no way to revalidate
+        return False, 0.0, 0.0, False
+    return True, max_age or 0.0, seconds("stale-while-revalidate") or 0.0, "no-cache" in cc
+
+
+class MemoryStore:
+    """Least recently used entries are dropped past max_entries."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+
+class SQLiteStore:
+    """Entries in a SQLite file, least recently used dropped past max_bytes."""
+
+    def __init__(self, path, max_bytes=50_000_000):
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                max_age REAL NOT NULL,
+                stale_while_revalidate REAL NOT NULL,
+                no_cache INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                vary TEXT NOT NULL DEFAULT '{}'
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(entries)")}
+        if "vary" not in columns:
+            # a file written before Vary support
+            self.conn.execute("ALTER TABLE entries ADD COLUMN vary TEXT NOT NULL DEFAULT '{}'")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._lock = threading.Lock()
+        # kept up to date by set/delete/evict instead of a SUM(size) per write;
+        # it only sees this process's writes, so share a file with one writer
+        self._total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, stored_at, max_age, stale_while_revalidate, no_cache,"
+                " vary FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        status, headers, body, stored_at, max_age, swr, no_cache, vary = row
+        return Entry(status, json.loads(headers), body, stored_at, max_age, swr, bool(no_cache),
+                     vary=json.loads(vary))
+
+    def _size(self, key):
+        row = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def set(self, key, entry):
+        with self._lock:
+            replaced = self._size(key)
+            size = entry.size
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, status, headers, body, stored_at, max_age,"
+                " stale_while_revalidate, no_cache, size, last_access, vary)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.status, json.dumps(entry.headers), entry.body, entry.stored_at,
+                 entry.max_age, entry.stale_while_revalidate, int(entry.no_cache),
+                 size, time.time(), json.dumps(entry.vary)),
+            )
+            self._total += size - replaced
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._total -= self._size(key)
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def total_bytes(self):
+        return self._total
+
+    def _evict(self):
+        excess = self._total - self.max_bytes
+        if excess <= 0:
+            return
+        # walk from the least recently used until enough bytes are freed
+        doomed, freed = [], 0
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._total -= freed
+
+    def close(self):
+        self.conn.close()
+
+
+class CachingClient:
+    """Wraps an ApiClient; get() goes through the cache, everything else straight through."""
+
+    def __init__(self, api, memory=None, disk=None):
+        self.api = api
+        self.memory = memory or MemoryStore()
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self.counts = {"fresh": 0, "stale": 0, "revalidated": 0, "miss": 0}
+
+    def __getattr__(self, name):
+        # post/put/patch/delete/close are the wrapped client's
+        return getattr(self.api, name)
+
+    def _prepare(self, path, params, headers):
+        """(cache key, request headers) as the session would send the GET."""
+        url = path if path.startswith(("http://", "https://")) else self.api.base_url + "/" + path.lstrip("/")
+        # prepare_request adds the session's headers and auth, like the real send
+        request = self.api.session.prepare_request(
+            requests.Request("GET", url, params=params, headers=headers)
+        )
+        key = request.url
+        authorization = request.headers.get("Authorization")
+        if authorization:
+            key += "#auth=" + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+        return key, request.headers
+
+    def _lookup(self, key, request_headers):
+        with self._lock:
+            entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.memory.set(key, entry)
+        if entry is not None and not entry.matches(request_headers):
+            return None  # stored for other values of a Vary header
+        return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    @staticmethod
+    def _response(key, entry, outcome):
+        response = requests.Response()
+        response.status_code = entry.status
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response.url = key
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = outcome
+        return response
+
+    def _fetch(self, key, entry, path, params, request_headers, **kwargs):
+        """Go to the network, conditionally if we have an entry. Returns (response, outcome)."""
+        headers = {**(entry.validators if entry else {}), **(kwargs.pop("headers", None) or {})}
+        response = self.api.get(path, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            merged = CaseInsensitiveDict(entry.headers)
+            for name in REVALIDATION_HEADERS:
+                if name in response.headers:
+                    merged[name] = response.headers[name]
+            store, max_age, swr, no_cache = freshness(merged)
+            entry = Entry(entry.status, dict(merged), entry.body, time.time(), max_age, swr,
+                          no_cache, vary=entry.vary)
+            self._store(key, entry)
+            return self._response(key, entry, "revalidated"), "revalidated"
+
+        store, max_age, swr, no_cache = freshness(response.headers)
+        if store and response.status_code in CACHEABLE_STATUSES:
+            vary = [name.strip().lower() for name in response.headers.get("Vary", "").split(",")
+                    if name.strip()]
+            self._store(key, Entry(response.status_code, dict(response.headers), response.content,
+                                   time.time(), max_age, swr, no_cache,
+                                   vary={name: request_headers.get(name) for name in vary}))
+        else:
+            with self._lock:
+                self.memory.delete(key)
+            if self.disk is not None:
+                self.disk.delete(key)
+        response.from_cache = None
+        return response, "miss"
+
+    def _revalidate_in_background(self, key, entry, path, params, request_headers, kwargs):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                # the caller's headers and timeout apply to the refresh too
+                self._fetch(key, entry, path, params, request_headers, **kwargs)
+            except requests.RequestException:
+                pass  # keep serving the stale copy; the next request tries again
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get(self, path, params=None, **kwargs):
+        key, request_headers = self._prepare(path, params, kwargs.get("headers"))
+        entry = self._lookup(key, request_headers)
+        if entry is not None and entry.fresh:
+            self._count("fresh")
+            return self._response(key, entry, "fresh")
+        if entry is not None and entry.usable_stale:
+            self._count("stale")
+            self._revalidate_in_background(key, entry, path, params, request_headers, dict(kwargs))
+            return self._response(key, entry, "stale")
+        response, outcome = self._fetch(key, entry, path, params, request_headers, **kwargs)
+        self._count(outcome)
+        return response
+
+    def stats(self):
+        """Counts per outcome, and hit_ratio: share of gets that didn't transfer a body."""
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        hits = counts["fresh"] + counts["stale"] + counts["revalidated"]
+        return {**counts, "total": total, "hit_ratio": hits / total if total else 0.0}
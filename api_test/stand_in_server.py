@@ -0,0 +1,146 @@
+"""
+A tiny local stand-in for jsonplaceholder, for benchmarks and experiments.
+
+    python stand_in_server.py            # serves on http://127.0.0.1:8200
+
+Routes:
+- GET /users, GET /users/<id>, POST/PUT/PATCH/DELETE /users/<id>
+- GET /flaky/<n>: answers 503 with Retry-After: 1 the first n times per n, then 200
+- POST /users/bulk: {"operations": [{"method": "PATCH", "id": 5, "body": {...}}, ...]}
+  runs every operation and answers {"results": [{"status": ..., "body": ...}, ...]}
+  in the same order (404 when Handler.bulk_enabled is False)
+
+It speaks HTTP/1.1 with keep-alive, so clients that reuse connections can.
+Set Handler.latency (seconds) to delay every response, and add ids to
+Handler.missing_ids to make GET /users/<id> answer 404. Set
+Handler.cache_control (e.g. "max-age=60") to send it with ETag and
+Last-Modified on the /users routes and answer If-None-Match with 304.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USERS = [{"id": i, "name": f"user {i}", "email": f"user{i}@example.com"} for i in range(1, 11)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, Nagle + delayed
+    # ACK add ~40ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+    flaky_hits = {}
+    lock = threading.Lock()
+    # every response sent, so clients can check how many requests they made
+    requests_served = 0
+    latency = 0.0
+    missing_ids = set()
+    cache_control = None
+    bulk_enabled = True
+    bytes_sent = 0
+    last_modified = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # the client hung up (e.g. a cancelled request), nothing to report
+            pass
+
+    def send_json(self, status, body, headers=None, cacheable=False):
+        if Handler.latency:
+            time.sleep(Handler.latency)
+        data = json.dumps(body).encode()
+        headers = dict(headers or {})
+        if cacheable and Handler.cache_control:
+            etag = '"%s"' % hashlib.sha1(data).hexdigest()
+            headers.update({
+                "Cache-Control": Handler.cache_control,
+                "ETag": etag,
+                "Last-Modified": Handler.last_modified,
+            })
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+        with Handler.lock:
+            Handler.requests_served += 1
+            Handler.bytes_sent += len(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["users"]:
+            return self.send_json(200, USERS, cacheable=True)
+        if parts[0] == "users" and len(parts) == 2 and parts[1].isdigit():
+            if int(parts[1]) in Handler.missing_ids:
+                return self.send_json(404, {"error": "no such user"})
+            return self.send_json(200, {"id": int(parts[1]), "name": f"user {parts[1]}"}, cacheable=True)
+        if parts[0] == "flaky" and len(parts) == 2 and parts[1].isdigit():
+            with Handler.lock:
+                hits = Handler.flaky_hits[self.path] = Handler.flaky_hits.get(self.path, 0) + 1
+            if hits <= int(parts[1]):
+                return self.send_json(503, {"error": "try later"}, {"Retry-After": "1"})
+            return self.send_json(200, {"ok": True, "attempts": hits})
+        self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        # always read the body, or it is left on the kept-alive connection
+        body = self.read_json()
+        if self.path.rstrip("/") == "/users/bulk":
+            if not Handler.bulk_enabled:
+                return self.send_json(404, {"error": "not found"})
+            results = [self.apply(op) for op in body.get("operations", [])]
+            return self.send_json(200, {"results": results})
+        self.send_json(201, {**body, "id": 11})
+
+    @staticmethod
+    def apply(op):
+        method = op.get("method", "").upper()
+        if method == "POST":
+            return {"status": 201, "body": {**op.get("body", {}), "id": 11}}
+        if method in ("PUT", "PATCH"):
+            return {"status": 200, "body": {**op.get("body", {}), "id": op.get("id")}}
+        if method == "DELETE":
+            return {"status": 200, "body": {}}
+        return {"status": 400, "body": {"error": f"unsupported method {method!r}"}}
+
+    def do_PUT(self):
+        self.send_json(200, {**self.read_json(), "id": int(self.path.rsplit("/", 1)[-1])})
+
+    do_PATCH = do_PUT
+
+    def do_DELETE(self):
+        self.send_json(200, {})
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # read by server_activate() when the constructor calls listen(), so it has
+    # to be set on the class: the default of 5 drops connections under load
+    request_queue_size = 1024
+
+
+def start(port=0):
+    """Serve in a background thread, return (server, base_url)."""
+    server = Server(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server = Server(("127.0.0.1", 8200), Handler)
+    print("serving on http://127.0.0.1:8200")
+    server.serve_forever()
@@ -0,0 +1,124 @@
+"""
+Requests/sec: this FastAPI catalog vs book_api's DRF BookViewSet.
+
+    python bench.py [--books 10000] [--duration 10] [--concurrency 32]
+
+Both apps are served by uvicorn (1 worker each) over the same freshly
+migrated and seeded SQLite file, and answer the same two queries:
+newest 10 books, and one book by id.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+HERE = Path(__file__).resolve().parent
+BOOK_API = HERE.parent / "book_api"
+
+
+def seed(db_path, n_books, n_authors=200):
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "-v0"],
+        cwd=BOOK_API, env={**os.environ, "BOOK_API_DB": db_path}, check=True,
+    )
+    conn = sqlite3.connect(db_path)
+    now = datetime.now(timezone.utc)
+    with conn:
+        conn.execute(
+            "INSERT INTO auth_user (password, is_superuser, username, first_name, last_name,"
+            " email, is_staff, is_active, date_joined) VALUES ('!', 0, 'bench', '', '', '', 0, 1, ?)",
+            (now.isoformat(" "),),
+        )
+        conn.executemany(
+            "INSERT INTO book_author (name, bio, birth_date, created_at) VALUES (?, ?, ?, ?)",
+            [(f"Author {i}", "bio", "1970-01-01", "12:00:00") for i in range(n_authors)],
+        )
+        def rows():
+            for i in range(n_books):
+                stamp = (now - timedelta(seconds=n_books - i)).strftime("%Y-%m-%d %H:%M:%S.%f")
+                yield (
+                    f"Book {i}", random.randint(1, n_authors), f"{i:013d}", "2020-01-01",
+                    19.99, 300, f"Description of book {i}", i % 2, 1, stamp, stamp,
+                )
+        conn.executemany(
+            "INSERT INTO book_book (title, author_id, isbn, published_date, price, pages,"
+            " description, is_published, owner_id, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows(),
+        )
+    conn.close()
+
+
+def serve(app, cwd, port, env):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env={**os.environ, **env},
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{app} did not start")
+
+
+async def load(url_for, duration, concurrency):
+    done = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                response = await client.get(url_for())
+                response.raise_for_status()
+                done += 1
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    db_path = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+    seed(db_path, args.books)
+    fast = serve("main:app", HERE, 8101, {"CATALOG_DB": db_path})
+    drf = serve("config.asgi:application", BOOK_API, 8102, {"BOOK_API_DB": db_path})
+    ids = lambda: random.randint(1, args.books)
+    cases = [
+        ("newest 10 books", lambda: "http://127.0.0.1:8101/books/?limit=10",
+                            lambda: "http://127.0.0.1:8102/api/books/"),
+        ("book by id", lambda: f"http://127.0.0.1:8101/books/{ids()}",
+                       lambda: f"http://127.0.0.1:8102/api/books/{ids()}/"),
+    ]
+    try:
+        print(f"{'query':18} {'fastapi req/s':>14} {'drf req/s':>10} {'speedup':>8}")
+        for label, fast_url, drf_url in cases:
+            fast_rate = asyncio.run(load(fast_url, args.duration, args.concurrency))
+            drf_rate = asyncio.run(load(drf_url, args.duration, args.concurrency))
+            print(f"{label:18} {fast_rate:14.1f} {drf_rate:10.1f} {fast_rate / drf_rate:7.1f}x")
+    finally:
+        fast.terminate()
+        drf.terminate()
+        fast.wait()
+        drf.wait()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+First-request latency with and without the lifespan warmup.
+
+    python bench_startup.py [--books 200000]
+
+For each CATALOG_WARMUP mode the app is started fresh with uvicorn, then
+the very first list and detail requests are timed, followed by the same
+requests again once everything is warm.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench import HERE, seed, serve
+
+PORT = 8104
+
+
+def timed(client, url):
+    started = time.perf_counter()
+    client.get(url).raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(mode, db_path, newest_id):
+    started = time.perf_counter()
+    server = serve("main:app", HERE, PORT, {"CATALOG_DB": db_path, "CATALOG_WARMUP": mode})
+    boot = time.perf_counter() - started
+    base = f"http://127.0.0.1:{PORT}"
+    try:
+        with httpx.Client(base_url=base) as client:
+            first_list = timed(client, "/books/?limit=10")
+            first_detail = timed(client, f"/books/{newest_id}")
+            warm_list = timed(client, "/books/?limit=10")
+            warm_detail = timed(client, f"/books/{newest_id - 1}")
+        print(f"{mode:9} {boot:8.2f}s {first_list:12.2f} {first_detail:14.2f} "
+              f"{warm_list:11.2f} {warm_detail:13.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=200_000)
+    args = parser.parse_args()
+
+    db_path = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+    seed(db_path, args.books)
+    try:
+        print(f"{'warmup':9} {'boot':>9} {'1st list ms':>12} {'1st detail ms':>14} "
+              f"{'list ms':>11} {'detail ms':>13}")
+        for mode in ("off", "blocking"):
+            run(mode, db_path, args.books)
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
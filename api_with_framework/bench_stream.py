@@ -0,0 +1,99 @@
+"""
+Peak server memory and throughput for GET /books/stream over a large table.
+
+    python bench_stream.py [--books 1000000] [--max-growth-mb 64]
+
+Seeds a throwaway database, serves the app with uvicorn and reads the
+server's peak RSS (VmHWM, Linux only) around three runs: a full read, a
+deliberately slow reader (backpressure), and a client that disconnects
+early. Exits non-zero if peak RSS grew more than --max-growth-mb.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench import HERE, seed, serve
+
+PORT = 8103
+URL = f"http://127.0.0.1:{PORT}/books/stream"
+
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available")
+
+
+def full_read():
+    rows = 0
+    started = time.perf_counter()
+    with httpx.stream("GET", URL, timeout=None) as response:
+        for line in response.iter_lines():
+            if line:
+                rows += 1
+    return rows, time.perf_counter() - started
+
+
+def slow_read(seconds=3.0):
+    # read a little, then stall long enough for socket buffers to fill up
+    with httpx.stream("GET", URL, timeout=None) as response:
+        chunks = response.iter_raw(64 * 1024)
+        next(chunks)
+        time.sleep(seconds)
+        for _ in range(10):
+            next(chunks)
+
+
+def early_disconnect():
+    with httpx.stream("GET", URL, timeout=None) as response:
+        next(response.iter_raw())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--max-growth-mb", type=float, default=64.0)
+    args = parser.parse_args()
+
+    db_path = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+    print(f"seeding {args.books} books...")
+    seed(db_path, args.books)
+    server = serve("main:app", HERE, PORT, {"CATALOG_DB": db_path})
+    try:
+        httpx.get(f"http://127.0.0.1:{PORT}/books/?limit=1").raise_for_status()
+        baseline = peak_rss_mb(server.pid)
+
+        rows, elapsed = full_read()
+        assert rows == args.books, rows
+        after_full = peak_rss_mb(server.pid)
+        print(f"full read: {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+        slow_read()
+        early_disconnect()
+        # the server must still serve streams after the aborted ones
+        rows, _ = full_read()
+        assert rows == args.books, rows
+        after_all = peak_rss_mb(server.pid)
+
+        print(f"peak RSS: baseline {baseline:.1f} MB, after full read {after_full:.1f} MB, "
+              f"after slow/aborted reads {after_all:.1f} MB")
+        growth = after_all - baseline
+        if growth > args.max_growth_mb:
+            print(f"FAIL: peak RSS grew {growth:.1f} MB (limit {args.max_growth_mb} MB)")
+            return 1
+        print(f"OK: peak RSS grew {growth:.1f} MB")
+        return 0
+    finally:
+        server.terminate()
+        server.wait()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
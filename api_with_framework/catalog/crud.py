@@ -0,0 +1,164 @@
+"""Read queries over the book_api tables (book_book, book_author, auth_user).
+
+Rows are turned into the same JSON shape as book_api's BookSerializer /
+BookDetailSerializer so clients can switch between the two APIs.
+"""
+import base64
+
+import anyio
+
+BOOK_COLUMNS = """
+    b.id, b.title, b.author_id, a.name, b.isbn, b.published_date, b.price,
+    b.pages, b.description, b.is_published, b.owner_id, u.username, b.created_at
+"""
+
+BOOK_FROM = """
+    FROM book_book b
+    JOIN book_author a ON a.id = b.author_id
+    JOIN auth_user u ON u.id = b.owner_id
+"""
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, book_id):
+    return base64.urlsafe_b64encode(f"{created_at}|{book_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, book_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return created_at, int(book_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _datetime(value):
+    # Django stores "YYYY-MM-DD HH:MM:SS.ffffff" in UTC, DRF renders ISO 8601 with Z
+    return value.replace(" ", "T") + "Z" if value else value
+
+
+def _price(value):
+    return f"{value:.2f}"
+
+
+def book_row(row):
+    return {
+        "id": row[0],
+        "title": row[1],
+        "author": row[2],
+        "author_name": row[3],
+        "isbn": row[4],
+        "published_date": row[5],
+        "price": _price(row[6]),
+        "pages": row[7],
+        "description": row[8],
+        "is_published": bool(row[9]),
+        "owner": row[10],
+        "owner_username": row[11],
+    }
+
+
+async def list_books(pool, limit=10, cursor=None, author=None, is_published=None):
+    """Newest first (same order as BookViewSet), keyset-paginated on (created_at, id).
+
+    Returns (books, next_cursor).
+    """
+    where, params = [], []
+    if cursor:
+        created_at, book_id = decode_cursor(cursor)
+        where.append("(b.created_at, b.id) < (?, ?)")
+        params += [created_at, book_id]
+    if author is not None:
+        where.append("b.author_id = ?")
+        params.append(author)
+    if is_published is not None:
+        where.append("b.is_published = ?")
+        params.append(int(is_published))
+
+    sql = f"SELECT {BOOK_COLUMNS} {BOOK_FROM}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY b.created_at DESC, b.id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = await pool.fetchall(sql, params)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][12], rows[-1][0])
+    return [book_row(row) for row in rows], next_cursor
+
+
+async def get_book(pool, book_id):
+    """One book with its author nested, like BookDetailSerializer. None if missing."""
+    row = await pool.fetchone(
+        """
+        SELECT b.id, b.title, b.isbn, b.published_date, b.price, b.pages,
+               b.description, b.is_published, b.created_at, b.updated_at,
+               a.id, a.name, a.birth_date, a.created_at,
+               (SELECT COUNT(*) FROM book_book c WHERE c.author_id = a.id)
+        FROM book_book b
+        JOIN book_author a ON a.id = b.author_id
+        WHERE b.id = ?
+        """,
+        (book_id,),
+    )
+    if row is None:
+        return None
+    return {
+        "id": row[0],
+        "title": row[1],
+        "author": {
+            "id": row[10],
+            "name": row[11],
+            "birth_date": row[12],
+            "book_count": row[14],
+            "created_at": row[13],
+        },
+        "isbn": row[2],
+        "published_date": row[3],
+        "price": _price(row[4]),
+        "pages": row[5],
+        "description": row[6],
+        "is_published": bool(row[7]),
+        "created_at": _datetime(row[8]),
+        "updated_at": _datetime(row[9]),
+    }
+
+
+async def stream_books(conn, author=None, is_published=None, batch_size=1000):
+    """Yield lists of up to `batch_size` book rows, newest first, straight off the cursor.
+
+    The whole result is never held in memory. If the consumer stops early the
+    running statement is interrupted instead of being read to the end.
+    """
+    where, params = [], []
+    if author is not None:
+        where.append("b.author_id = ?")
+        params.append(author)
+    if is_published is not None:
+        where.append("b.is_published = ?")
+        params.append(int(is_published))
+
+    sql = f"SELECT {BOOK_COLUMNS} {BOOK_FROM}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY b.created_at DESC, b.id DESC"
+
+    cursor = await conn.execute(sql, params)
+    finished = False
+    try:
+        while True:
+            rows = await cursor.fetchmany(batch_size)
+            if not rows:
+                finished = True
+                return
+            yield rows
+    finally:
+        with anyio.CancelScope(shield=True):
+            if not finished:
+                await conn.interrupt()
+            await cursor.close()
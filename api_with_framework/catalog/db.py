@@ -0,0 +1,70 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+
+# same database file (and schema) the Django book_api uses
+DEFAULT_DB = Path(__file__).resolve().parents[2] / "book_api" / "db.sqlite3"
+DB_PATH = os.environ.get("CATALOG_DB", str(DEFAULT_DB))
+POOL_SIZE = int(os.environ.get("CATALOG_POOL_SIZE", "8"))
+
+
+async def connect(path=DB_PATH):
+    """Open a read-only connection to the catalog."""
+    conn = await aiosqlite.connect(f"file:{path}?mode=ro", uri=True)
+    await conn.execute("PRAGMA query_only = ON")
+    await conn.execute("PRAGMA cache_size = -16000")  # 16 MB per connection
+    return conn
+
+
+class Pool:
+    """A fixed set of open aiosqlite connections handed out one request at a time.
+
+    Opening a SQLite connection per request costs a file open plus schema
+    parsing; reusing them keeps the page cache and prepared statements warm.
+    """
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = asyncio.Queue()
+        self._connections = []
+
+    async def open(self):
+        for _ in range(self.size):
+            conn = await connect(self.path)
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        for conn in self._connections:
+            await conn.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self):
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def fetchall(self, sql, params=()):
+        async with self.acquire() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+
+    async def fetchone(self, sql, params=()):
+        async with self.acquire() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+
+    async def warm(self, sql, params=()):
+        """Run `sql` once on every connection so each has the schema parsed,
+        the statement cached and the pages it touches in its cache."""
+        for conn in self._connections:
+            async with conn.execute(sql, params) as cursor:
+                await cursor.fetchall()
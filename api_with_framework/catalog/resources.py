@@ -0,0 +1,116 @@
+"""
+Things shared by every request, created once per worker in the app lifespan:
+the database pool, an outbound HTTP client pool and the hot-books cache.
+
+Uvicorn only starts accepting connections after the lifespan startup
+finished, so with CATALOG_WARMUP=blocking (the default) the first request
+already finds warm connections and a filled cache. CATALOG_WARMUP=background
+starts serving right away and reports not-ready until warmup is done;
+CATALOG_WARMUP=off skips it. A failed warmup is logged and retried
+CATALOG_WARMUP_RETRIES times with backoff; in the background, once those run
+out the worker reports ready and serves cold rather than never.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
+
+from catalog import crud
+from catalog.cache import TTLCache
+from catalog.db import Pool
+
+logger = logging.getLogger(__name__)
+
+WARMUP = os.environ.get("CATALOG_WARMUP", "blocking")
+WARM_BOOKS = int(os.environ.get("CATALOG_WARM_BOOKS", "500"))
+WARMUP_RETRIES = int(os.environ.get("CATALOG_WARMUP_RETRIES", "3"))
+
+
+async def warmup(app: FastAPI):
+    started = time.perf_counter()
+    pool = app.state.pool
+    await pool.warm(f"SELECT {crud.BOOK_COLUMNS} {crud.BOOK_FROM} ORDER BY b.created_at DESC, b.id DESC LIMIT 10")
+
+    # the newest books are the ones people open, put them in the cache up front
+    rows = await pool.fetchall(
+        "SELECT id FROM book_book ORDER BY created_at DESC, id DESC LIMIT ?", (WARM_BOOKS,)
+    )
+    ids = [row[0] for row in rows]
+    books = await asyncio.gather(*(crud.get_book(pool, book_id) for book_id in ids))
+    for book_id, book in zip(ids, books):
+        if book is not None:
+            app.state.cache.set(book_id, book)
+
+    app.state.warmup_seconds = time.perf_counter() - started
+    app.state.ready = True
+    logger.info("warmup done in %.3fs, %d books cached", app.state.warmup_seconds, len(ids))
+
+
+async def warmup_with_retries(app: FastAPI, retries=WARMUP_RETRIES, delay=0.5):
+    for attempt in range(retries + 1):
+        try:
+            return await warmup(app)
+        except Exception:
+            if attempt == retries:
+                raise
+            logger.warning("warmup failed, retrying in %.1fs", delay, exc_info=True)
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def background_warmup(app: FastAPI):
+    try:
+        await warmup_with_retries(app)
+    except Exception:
+        # a task's exception is only seen if someone awaits it: log it here
+        logger.exception("warmup failed %d times, serving without it", WARMUP_RETRIES + 1)
+        app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.warmup_seconds = None
+    app.state.pool = Pool()
+    await app.state.pool.open()
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(10.0, connect=5.0),
+    )
+    # detail lookups for popular books skip the database for `ttl` seconds
+    app.state.cache = TTLCache(maxsize=4096, ttl=30.0)
+
+    warmup_task = None
+    try:
+        # inside the try: a blocking warmup that gives up still closes the pools
+        if WARMUP == "blocking":
+            await warmup_with_retries(app)
+        elif WARMUP == "background":
+            warmup_task = asyncio.create_task(background_warmup(app))
+        else:
+            app.state.ready = True
+        yield
+    finally:
+        # fail readiness first so the load balancer stops sending traffic
+        app.state.ready = False
+        if warmup_task is not None:
+            warmup_task.cancel()
+        await app.state.http.aclose()
+        await app.state.pool.close()
+
+
+def get_pool(request: Request) -> Pool:
+    return request.app.state.pool
+
+
+def get_cache(request: Request) -> TTLCache:
+    return request.app.state.cache
+
+
+def get_http(request: Request) -> httpx.AsyncClient:
+    """Shared outbound client: keep-alive connections to upstream APIs are reused."""
+    return request.app.state.http
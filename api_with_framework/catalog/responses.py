@@ -0,0 +1,32 @@
+from contextlib import aclosing
+
+import orjson
+from starlette.responses import JSONResponse, StreamingResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson.
+
+    Routes return this directly so FastAPI skips its jsonable_encoder pass; the
+    content must already be plain dicts/lists/str/numbers. (fastapi.responses
+    has one too, but it is deprecated and warns.)
+    """
+
+    def render(self, content):
+        return orjson.dumps(content)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Newline-delimited JSON streamed from an async generator of bytes chunks.
+
+    Each chunk is only pulled from the generator after the server accepted the
+    previous one (uvicorn waits for the socket to drain), so a slow client
+    slows the producer down instead of filling memory. When the client goes
+    away the generator is closed immediately, which lets it stop its query.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def stream_response(self, send):
+        async with aclosing(self.body_iterator):
+            await super().stream_response(send)
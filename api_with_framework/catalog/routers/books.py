@@ -0,0 +1,72 @@
+import asyncio
+import os
+from contextlib import aclosing
+
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from catalog import crud
+from catalog.cache import TTLCache
+from catalog.db import connect
+from catalog.resources import get_cache, get_pool
+from catalog.responses import NDJSONStreamingResponse, ORJSONResponse
+
+router = APIRouter(prefix="/books", tags=["books"])
+
+# each stream holds its own connection for as long as the client keeps reading
+stream_slots = asyncio.Semaphore(int(os.environ.get("CATALOG_MAX_STREAMS", "4")))
+
+
+@router.get("/")
+async def list_books(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = None,
+    author: int | None = None,
+    is_published: bool | None = None,
+    pool=Depends(get_pool),
+):
+    try:
+        books, next_cursor = await crud.list_books(pool, limit, cursor, author, is_published)
+    except crud.InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return ORJSONResponse({"results": books, "next": next_cursor})
+
+
+@router.get("/stream")
+async def stream_books(
+    author: int | None = None,
+    is_published: bool | None = None,
+    batch_size: int = Query(1000, ge=1, le=10_000),
+):
+    """Every matching book as NDJSON, one object per line, in constant memory."""
+
+    async def lines():
+        async with stream_slots:
+            conn = await connect()
+            try:
+                batches = crud.stream_books(conn, author, is_published, batch_size)
+                async with aclosing(batches):
+                    async for rows in batches:
+                        yield b"".join(orjson.dumps(crud.book_row(row)) + b"\n" for row in rows)
+            finally:
+                with anyio.CancelScope(shield=True):
+                    await conn.close()
+
+    return NDJSONStreamingResponse(lines())
+
+
+@router.get("/cache")
+async def cache_stats(cache: TTLCache = Depends(get_cache)):
+    return ORJSONResponse(cache.stats())
+
+
+@router.get("/{book_id}")
+async def get_book(book_id: int, pool=Depends(get_pool), cache: TTLCache = Depends(get_cache)):
+    book = cache.get(book_id)
+    if book is None:
+        book = await crud.get_book(pool, book_id)
+        if book is None:
+            raise HTTPException(status_code=404, detail="book not found")
+        cache.set(book_id, book)
+    return ORJSONResponse(book)
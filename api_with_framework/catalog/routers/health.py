@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request
+
+from catalog.responses import ORJSONResponse
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    """The process is up and the event loop answers."""
+    return ORJSONResponse({"status": "ok"})
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    """200 once warmup finished and until shutdown starts, 503 otherwise."""
+    state = request.app.state
+    body = {"ready": state.ready, "warmup_seconds": state.warmup_seconds}
+    return ORJSONResponse(body, status_code=200 if state.ready else 503)
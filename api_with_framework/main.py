@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 
-app = FastAPI()
+from catalog.resources import lifespan
+from catalog.routers import books, health
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(books.router)
+app.include_router(health.router)
 
 @app.get("/")
 def read_root():
-    return {"Hello": "World"}
\ No newline at end of file
+    return {"Hello": "World"}
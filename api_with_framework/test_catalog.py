@@ -0,0 +1,143 @@
+"""
+End-to-end checks of the catalog app through FastAPI's TestClient, over a
+freshly migrated and seeded SQLite file (the same one bench.py builds).
+
+    python -m unittest test_catalog
+"""
+import asyncio
+import functools
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import orjson
+
+from bench import seed
+
+BOOKS = 25
+
+# catalog.db reads CATALOG_DB when it is imported, so the app is imported after seeding
+app = resources = TestClient = None
+
+
+def setUpModule():
+    global app, resources, TestClient
+    tmp = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(tmp.cleanup)
+    db_path = os.path.join(tmp.name, "catalog.sqlite3")
+    seed(db_path, BOOKS, n_authors=3)
+    os.environ["CATALOG_DB"] = db_path
+    from fastapi.testclient import TestClient
+    from catalog import resources
+    from main import app
+
+
+class CatalogTestCase(unittest.TestCase):
+    warmup = "off"
+
+    def setUp(self):
+        patcher = mock.patch.object(resources, "WARMUP", self.warmup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # entering the client runs the lifespan: pool, cache and warmup
+        self.client = TestClient(app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+
+class BooksTests(CatalogTestCase):
+    def test_cursor_pagination_walks_every_book_once_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 10} if cursor is None else {"limit": 10, "cursor": cursor}
+            response = self.client.get("/books/", params=params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page["results"]), 10)
+            seen += [book["id"] for book in page["results"]]
+            cursor = page["next"]
+            if cursor is None:
+                break
+        # seed() gives later books later created_at stamps
+        self.assertEqual(seen, list(range(BOOKS, 0, -1)))
+
+    def test_invalid_cursor_is_400(self):
+        self.assertEqual(self.client.get("/books/", params={"cursor": "nope"}).status_code, 400)
+
+    def test_second_lookup_is_a_cache_hit(self):
+        first = self.client.get("/books/3")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["content-type"], "application/json")
+        self.assertEqual(self.client.get("/books/cache").json()["hits"], 0)
+        self.assertEqual(self.client.get("/books/3").json(), first.json())
+        stats = self.client.get("/books/cache").json()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_missing_book_is_404(self):
+        self.assertEqual(self.client.get(f"/books/{BOOKS + 1}").status_code, 404)
+
+    def test_stream_is_one_json_object_per_line(self):
+        with self.client.stream("GET", "/books/stream", params={"batch_size": 7}) as response:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+            lines = list(response.iter_lines())
+        books = [orjson.loads(line) for line in lines]
+        self.assertEqual(sorted(book["id"] for book in books), list(range(1, BOOKS + 1)))
+
+    def test_stream_filters(self):
+        with self.client.stream("GET", "/books/stream", params={"is_published": True}) as response:
+            books = [orjson.loads(line) for line in response.iter_lines()]
+        self.assertTrue(books)
+        self.assertTrue(all(book["is_published"] for book in books))
+
+
+class BlockingWarmupTests(CatalogTestCase):
+    warmup = "blocking"
+
+    def test_ready_with_a_warm_cache_once_started(self):
+        response = self.client.get("/health/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()["warmup_seconds"])
+        self.assertEqual(self.client.get("/books/cache").json()["size"], BOOKS)
+
+
+class BackgroundWarmupTests(CatalogTestCase):
+    warmup = "background"
+
+    def setUp(self):
+        # set through the client's portal: the event belongs to the app's loop
+        self.release = asyncio.Event()
+        real_warmup = resources.warmup
+
+        async def gated_warmup(app):
+            await self.release.wait()
+            await real_warmup(app)
+
+        patcher = mock.patch.object(resources, "warmup", gated_warmup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_not_ready_until_warmup_finished(self):
+        self.assertEqual(self.client.get("/health/live").status_code, 200)
+        self.assertEqual(self.client.get("/health/ready").status_code, 503)
+        self.client.portal.call(self.release.set)
+        for _ in range(100):
+            if self.client.get("/health/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.client.get("/health/ready").status_code, 200)
+
+    def test_failed_warmup_still_ends_ready(self):
+        no_retries = functools.partial(resources.warmup_with_retries, retries=0)
+        with mock.patch.object(resources, "warmup", side_effect=RuntimeError("db down")), \
+                mock.patch.object(resources, "warmup_with_retries", no_retries), \
+                self.assertLogs(resources.logger, "ERROR"):
+            self.client.portal.call(resources.background_warmup, app)
+        self.assertEqual(self.client.get("/health/ready").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
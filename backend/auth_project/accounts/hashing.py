@@ -0,0 +1,95 @@
+"""
+Password hashing off the request thread.
+
+PBKDF2 with hundreds of thousands of iterations is pure CPU. Running it in a
+small process pool means a login storm uses at most LOGIN_HASH_WORKERS cores
+and the request threads stay free for everything else.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# verification latency (queue wait + hashing) in seconds, most recent last
+_latencies = deque(maxlen=10_000)
+_latencies_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _verify(password, encoded):
+    from django.contrib.auth.hashers import verify_password
+    return verify_password(password, encoded)
+
+
+def _make(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'LOGIN_HASH_WORKERS', None) or os.cpu_count() or 1
+            # spawn, not fork: the web server process has threads of its own
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context('spawn'), initializer=_init_worker
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def verify(password, encoded, timeout=None):
+    """Check `password` against `encoded` in the pool. Returns (is_correct, must_update).
+
+    An empty `encoded` (unknown user) still costs one hash, like Django does,
+    so response time doesn't reveal which usernames exist.
+    """
+    started = time.perf_counter()
+    future = get_pool().submit(_verify, password, encoded or '')
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        # don't leave work queued for a client that already got an error
+        future.cancel()
+        raise
+    finally:
+        with _latencies_lock:
+            _latencies.append(time.perf_counter() - started)
+
+
+def make(password, timeout=None):
+    """Hash `password` with the preferred (first PASSWORD_HASHERS) hasher in the pool."""
+    future = get_pool().submit(_make, password)
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def latency_stats():
+    with _latencies_lock:
+        values = sorted(_latencies)
+    if not values:
+        return {'count': 0}
+    pick = lambda pct: values[min(len(values) - 1, round(pct / 100 * (len(values) - 1)))]
+    return {
+        'count': len(values),
+        'p50_ms': pick(50) * 1000,
+        'p95_ms': pick(95) * 1000,
+        'p99_ms': pick(99) * 1000,
+        'max_ms': values[-1] * 1000,
+    }
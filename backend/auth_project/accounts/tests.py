@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher, make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .throttle import Busy, LoginLimiter
+
+
+class LegacyPasswordHasher(MD5PasswordHasher):
+    """Stands in for an outdated hasher that is still listed to read old hashes."""
+
+    algorithm = 'legacy_md5'
+
+
+FAST_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'accounts.tests.LegacyPasswordHasher',
+]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, LOGIN_REHASH=True)
+class LoginTests(TestCase):
+    def setUp(self):
+        # hash in threads of this process: spawned workers wouldn't see the test settings
+        pool = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(pool.shutdown)
+        patcher = mock.patch('accounts.hashing.get_pool', return_value=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = LoginLimiter(max_inflight=1, per_account=1, wait=0)
+        patcher = mock.patch('accounts.views.get_limiter', return_value=self.limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user('alice', password='s3cret')
+
+    def login(self, username='alice', password='s3cret'):
+        return self.client.post(reverse('accounts:login'), {'username': username, 'password': password})
+
+    def test_correct_password_logs_in(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'username': 'alice'})
+        self.assertEqual(self.client.session['_auth_user_id'], str(self.user.pk))
+
+    def test_wrong_password_is_401(self):
+        response = self.login(password='wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_unknown_user_is_401(self):
+        self.assertEqual(self.login(username='nobody').status_code, 401)
+
+    def test_legacy_hash_is_upgraded(self):
+        self.user.password = make_password('s3cret', hasher='legacy_md5')
+        self.user.save()
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('md5$'))
+        self.assertTrue(self.user.check_password('s3cret'))
+
+    def test_rehash_timeout_still_logs_in(self):
+        legacy = make_password('s3cret', hasher='legacy_md5')
+        self.user.password = legacy
+        self.user.save()
+        with mock.patch('accounts.hashing.make', side_effect=TimeoutError), \
+                self.assertLogs('accounts.views', 'WARNING'):
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, legacy)
+
+    def test_same_account_in_flight_is_429(self):
+        with self.limiter.slot('alice'):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_no_free_slot_is_503(self):
+        with self.limiter.slot('bob'):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_hashing_timeout_is_503(self):
+        with mock.patch('accounts.hashing.verify', side_effect=TimeoutError):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+
+class LoginLimiterTests(TestCase):
+    def test_slots_are_released(self):
+        limiter = LoginLimiter(max_inflight=1, per_account=1, wait=0)
+        with limiter.slot('alice'):
+            with self.assertRaises(Busy):
+                with limiter.slot('ALICE'):
+                    pass
+        with limiter.slot('alice'):
+            pass
+        self.assertEqual(dict(limiter._accounts), {})
@@ -0,0 +1,65 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class Busy(Exception):
+    """Raised when a login can't get a slot. `retry_after` is in seconds."""
+
+    def __init__(self, reason, status, retry_after=1):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LoginLimiter:
+    """Caps logins in flight: `max_inflight` overall and `per_account` per username.
+
+    Counts are per process, like the hashing pool they protect.
+    """
+
+    def __init__(self, max_inflight, per_account, wait=0.0):
+        self._global = threading.BoundedSemaphore(max_inflight)
+        self.per_account = per_account
+        self.wait = wait
+        self._accounts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, username):
+        key = username.lower()
+        with self._lock:
+            if self._accounts[key] >= self.per_account:
+                raise Busy('too many concurrent login attempts for this account', status=429)
+            self._accounts[key] += 1
+        try:
+            if not self._global.acquire(timeout=self.wait):
+                raise Busy('login service is busy', status=503, retry_after=2)
+            try:
+                yield
+            finally:
+                self._global.release()
+        finally:
+            with self._lock:
+                self._accounts[key] -= 1
+                if not self._accounts[key]:
+                    del self._accounts[key]
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LoginLimiter(
+                max_inflight=getattr(settings, 'LOGIN_MAX_INFLIGHT', 32),
+                per_account=getattr(settings, 'LOGIN_MAX_PER_ACCOUNT', 2),
+                wait=getattr(settings, 'LOGIN_QUEUE_TIMEOUT', 2.0),
+            )
+        return _limiter
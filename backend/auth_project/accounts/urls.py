@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'accounts'
+
+urlpatterns = [
+    path('login/', views.login_view, name='login'),
+    path('login/stats/', views.login_stats, name='login-stats'),
+]
@@ -0,0 +1,67 @@
+import logging
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import get_user_model, login
+from django.contrib.auth.signals import user_login_failed
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from . import hashing
+from .throttle import Busy, get_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def _busy(reason, status, retry_after):
+    response = JsonResponse({'error': reason}, status=status)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+@require_POST
+def login_view(request):
+    """Log in with `username` and `password` POST fields.
+
+    Same result as django.contrib.auth's ModelBackend, but the hash check runs
+    in the hashing pool and concurrent attempts are capped.
+    """
+    username = request.POST.get('username', '')
+    password = request.POST.get('password', '')
+    if not username or not password:
+        return JsonResponse({'error': 'username and password are required'}, status=400)
+
+    User = get_user_model()
+    timeout = getattr(settings, 'LOGIN_HASH_TIMEOUT', 10.0)
+    try:
+        with get_limiter().slot(username):
+            user = User._default_manager.filter(**{User.USERNAME_FIELD: username}).first()
+            is_correct, must_update = hashing.verify(password, user.password if user else '', timeout)
+            if user and is_correct and must_update and getattr(settings, 'LOGIN_REHASH', True):
+                # upgrade to the first PASSWORD_HASHERS entry while we know the raw password;
+                # the login itself already succeeded, so a slow pool only skips the upgrade
+                try:
+                    user.password = hashing.make(password, timeout)
+                except TimeoutError:
+                    logger.warning('rehashing the password of %s timed out, upgrade skipped', username)
+                else:
+                    user.save(update_fields=['password'])
+    except Busy as busy:
+        return _busy(busy.reason, busy.status, busy.retry_after)
+    except TimeoutError:
+        return _busy('login service is busy', 503, 2)
+
+    if not (user and is_correct and user.is_active):
+        user_login_failed.send(sender=__name__, credentials={'username': username}, request=request)
+        return JsonResponse({'error': 'invalid username or password'}, status=401)
+
+    user.backend = 'django.contrib.auth.backends.ModelBackend'
+    login(request, user)
+    return JsonResponse({'username': user.get_username()})
+
+
+@require_GET
+@staff_member_required
+def login_stats(request):
+    """Hash verification latency percentiles for this process."""
+    return JsonResponse(hashing.latency_stats())
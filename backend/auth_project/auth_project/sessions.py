@@ -0,0 +1,178 @@
+"""
+Signed-cookie / cache hybrid session engine.
+
+    SESSION_ENGINE = 'auth_project.sessions'
+
+The session data lives in a signed cookie, so loading an unchanged session
+costs no database query. Payloads too big for a cookie
+(SESSION_COOKIE_MAX_INLINE bytes) are kept in the cache and the cookie only
+carries a signed reference to them.
+
+Every session gets a random id, signed into the cookie next to the data (it
+is not part of the data itself). flush() (logout) puts that id on a
+revocation list in the cache, so a copied cookie stops working after logout,
+which plain signed-cookie sessions can't do. That only holds if every worker
+sees the same cache: settings.py configures a shared one (Redis with
+REDIS_URL, else files on local disk); LocMemCache is per process and must not
+be used with this engine.
+
+The cookie also carries the session's expiry time, so set_expiry() is
+enforced on load like the database backend does, not only by the browser.
+
+save() only re-signs / writes the cache when the data actually changed.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.core import signing
+from django.core.cache import caches
+from django.utils.crypto import get_random_string
+
+SALT = 'auth_project.sessions'
+CACHE_PREFIX = 'hybrid_session:'
+REVOKED_PREFIX = 'hybrid_session_revoked:'
+# how many expired django_session rows clear_expired() deletes per statement
+CLEANUP_BATCH_SIZE = 1000
+
+
+class SessionStore(SessionBase):
+    def __init__(self, session_key=None):
+        self._cache = caches[getattr(settings, 'SESSION_CACHE_ALIAS', 'default')]
+        self._max_inline = getattr(settings, 'SESSION_COOKIE_MAX_INLINE', 2048)
+        # then an unchanged session is re-signed too, pushing its expiry forward
+        self._save_every_request = settings.SESSION_SAVE_EVERY_REQUEST
+        # fingerprint of the data as loaded, save() is a no-op while it matches
+        self._fingerprint = None
+        # cache key when the data is stored in the cache instead of the cookie
+        self._ref = None
+        # random id of the session, what revocation is keyed on
+        self._sid = None
+        # unix time the signed payload stops being accepted
+        self._expires = None
+        super().__init__(session_key)
+
+    def _digest(self, data):
+        return hashlib.blake2b(self.serializer().dumps(data), digest_size=16).digest()
+
+    def _sign(self, payload):
+        return signing.dumps(payload, compress=True, salt=SALT, serializer=self.serializer)
+
+    def load(self):
+        try:
+            # no max_age: the expiry saved in the payload is what counts, it
+            # follows set_expiry() instead of always SESSION_COOKIE_AGE
+            payload = signing.loads(self.session_key, serializer=self.serializer, salt=SALT)
+            sid = payload['s']
+            ref = payload.get('r')
+            expires = payload['e']
+        except Exception:
+            # bad signature or garbage: start over
+            self.create()
+            return {}
+        if expires <= time.time():
+            self.create()
+            return {}
+
+        keys = [REVOKED_PREFIX + sid] + ([CACHE_PREFIX + ref] if ref else [])
+        found = self._cache.get_many(keys)
+        if REVOKED_PREFIX + sid in found:
+            self.create()
+            return {}
+        if ref:
+            data = found.get(CACHE_PREFIX + ref)
+            if data is None:
+                # evicted or expired in the cache
+                self.create()
+                return {}
+            self._ref = ref
+        else:
+            data = payload['d']
+
+        self._sid = sid
+        self._expires = expires
+        self._fingerprint = self._digest(data)
+        return data
+
+    def create(self):
+        self._fingerprint = None
+        self._ref = None
+        self._sid = None
+        self._expires = None
+        self.modified = True
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        fingerprint = self._digest(data)
+        if fingerprint == self._fingerprint and self.session_key and not self._save_every_request:
+            return
+
+        self._sid = self._sid or get_random_string(32)
+        age = self.get_expiry_age(expiry=data.get('_session_expiry'))
+        self._expires = int(time.time()) + age
+        payload = {'s': self._sid, 'e': self._expires}
+        encoded = self.serializer().dumps(data)
+        if len(encoded) <= self._max_inline:
+            if self._ref:
+                self._cache.delete(CACHE_PREFIX + self._ref)
+                self._ref = None
+            payload['d'] = data
+        else:
+            self._ref = self._ref or get_random_string(32)
+            self._cache.set(CACHE_PREFIX + self._ref, data, age)
+            payload['r'] = self._ref
+        self._session_key = self._sign(payload)
+        self._fingerprint = fingerprint
+        self.modified = True
+
+    def exists(self, session_key=None):
+        # keys are never looked up server side, every signed key is unique
+        return False
+
+    def _revoke(self):
+        self._get_session()  # loads the id of a session not read yet
+        if self._sid:
+            # remembered for as long as the cookie could still be presented
+            remaining = (self._expires or 0) - time.time()
+            self._cache.set(REVOKED_PREFIX + self._sid, True, max(1, int(remaining) + 1))
+            self._sid = None
+        if self._ref:
+            self._cache.delete(CACHE_PREFIX + self._ref)
+            self._ref = None
+
+    def flush(self):
+        # revoke before SessionBase.flush() forgets the id
+        self._revoke()
+        super().flush()
+
+    def delete(self, session_key=None):
+        self._session_key = ''
+        self._session_cache = {}
+        self.create()
+
+    def cycle_key(self):
+        # same data under a new id, so the old cookie stops working
+        self._revoke()
+        self._fingerprint = None
+        self.save()
+
+    @classmethod
+    def clear_expired(cls):
+        """Remove rows the database engine left behind in django_session.
+
+        Cookie and cache data expire by themselves; this only drains the old
+        table, in batches, so SQLite is not write-locked for one huge DELETE.
+        """
+        from django.contrib.sessions.models import Session
+        from django.utils import timezone
+
+        now = timezone.now()
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:CLEANUP_BATCH_SIZE]
+            )
+            if not keys:
+                break
+            Session.objects.filter(session_key__in=keys).delete()
@@ -10,11 +10,17 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Apps shared with book_api (jobs) live in django_apps/ at the repository
+# root; `python manage.py test jobs` runs their tests.
+sys.path.insert(0, str(BASE_DIR.parent.parent / 'django_apps'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -37,6 +43,9 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'jobs',
+    'blog',
+    'accounts',
 ]
 
 MIDDLEWARE = [
@@ -51,6 +60,29 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'auth_project.urls'
 
+# Every worker process has to see the same cache: session revocations and
+# big sessions live in it (see below). Redis when REDIS_URL is set, otherwise
+# files on local disk, which is shared by the workers of one machine.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+        }
+    }
+
+# Sessions live in a signed cookie (big ones in the cache), see auth_project/sessions.py
+SESSION_ENGINE = 'auth_project.sessions'
+SESSION_CACHE_ALIAS = 'default'
+SESSION_COOKIE_MAX_INLINE = 2048
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -76,6 +108,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # worker processes write to the same file, wait for the lock instead of failing
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -98,6 +132,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Login (accounts app): password hashes are checked in a process pool
+LOGIN_HASH_WORKERS = 2
+LOGIN_HASH_TIMEOUT = 10.0
+# logins in flight per process, and per username
+LOGIN_MAX_INFLIGHT = 32
+LOGIN_MAX_PER_ACCOUNT = 2
+# seconds to wait for a free slot before answering 503
+LOGIN_QUEUE_TIMEOUT = 2.0
+# re-hash with the first PASSWORD_HASHERS entry when a stored hash is outdated
+LOGIN_REHASH = True
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -115,3 +160,13 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# Background jobs (jobs app, `python manage.py run_workers`)
+
+JOBS_CONCURRENCY = 4
+JOBS_POLL_INTERVAL = 1.0
+JOBS_RETRY_BASE_DELAY = 5
+JOBS_RETRY_MAX_DELAY = 600
+JOBS_LOCK_TIMEOUT = 600
+JOBS_HEARTBEAT_INTERVAL = 60
@@ -0,0 +1,57 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from .sessions import SessionStore
+
+
+@override_settings(SESSION_COOKIE_AGE=3600)
+class HybridSessionTests(SimpleTestCase):
+    def saved(self, **data):
+        session = SessionStore()
+        session.update(data)
+        session.save()
+        return session.session_key
+
+    def test_round_trip(self):
+        key = self.saved(user='alice')
+        self.assertEqual(SessionStore(key)['user'], 'alice')
+
+    def test_session_id_is_not_in_the_data(self):
+        key = self.saved(user='alice')
+        self.assertEqual(dict(SessionStore(key).items()), {'user': 'alice'})
+
+    def test_big_session_goes_through_the_cache(self):
+        key = self.saved(blob='x' * 10_000)
+        self.assertLess(len(key), 1000)
+        self.assertEqual(SessionStore(key)['blob'], 'x' * 10_000)
+
+    def test_set_expiry_is_enforced_on_load(self):
+        session = SessionStore()
+        session['user'] = 'alice'
+        session.set_expiry(60)
+        session.save()
+        key = session.session_key
+        self.assertEqual(SessionStore(key)['user'], 'alice')
+        with mock.patch('auth_project.sessions.time.time', return_value=time.time() + 61):
+            self.assertNotIn('user', SessionStore(key))
+
+    def test_cookie_age_is_enforced_without_set_expiry(self):
+        key = self.saved(user='alice')
+        with mock.patch('auth_project.sessions.time.time', return_value=time.time() + 3601):
+            self.assertNotIn('user', SessionStore(key))
+
+    def test_flush_revokes_the_cookie(self):
+        key = self.saved(user='alice')
+        session = SessionStore(key)
+        session.flush()
+        self.assertNotIn('user', SessionStore(key))
+
+    def test_cycle_key_keeps_data_and_revokes_the_old_cookie(self):
+        old = self.saved(user='alice')
+        session = SessionStore(old)
+        session.cycle_key()
+        self.assertNotEqual(session.session_key, old)
+        self.assertEqual(SessionStore(session.session_key)['user'], 'alice')
+        self.assertNotIn('user', SessionStore(old))
@@ -0,0 +1,84 @@
+"""
+Authenticated request throughput: database sessions vs auth_project.sessions.
+
+    python bench_sessions.py [--requests 2000]
+
+Runs against a throwaway SQLite file, not db.sqlite3.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import django
+from django.http import HttpResponse
+from django.urls import path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth_project.settings')
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'auth_project.sessions',
+]
+
+
+def whoami(request):
+    if request.GET.get('write'):
+        request.session['hits'] = request.session.get('hits', 0) + 1
+    return HttpResponse(request.user.get_username())
+
+
+urlpatterns = [path('whoami/', whoami)]
+
+
+def bench(engine, user, n, write):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    with override_settings(SESSION_ENGINE=engine, ROOT_URLCONF=__name__):
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(user)
+        params = {'write': 1} if write else {}
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *a: queries.append(sql) or execute(sql, *a)):
+            client.get('/whoami/', params)
+        started = time.perf_counter()
+        for _ in range(n):
+            response = client.get('/whoami/', params)
+            assert response.content == b'bench', response.content
+        elapsed = time.perf_counter() - started
+    return n / elapsed, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    from django.conf import settings
+    db_file = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False).name
+    settings.DATABASES['default']['NAME'] = db_file
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    try:
+        call_command('migrate', verbosity=0)
+        user = get_user_model().objects.create_user('bench', password='bench-password')
+        print(f'{"engine":45} {"mode":6} {"req/s":>9} {"queries/req":>12}')
+        for write in (False, True):
+            for engine in ENGINES:
+                rate, queries = bench(engine, user, args.requests, write)
+                mode = 'write' if write else 'read'
+                print(f'{engine:45} {mode:6} {rate:9.1f} {queries:12}')
+    finally:
+        os.remove(db_file)
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Post, render_markdown
+
+BODIES = [
+    '# Hello\n\nSome **bold** text and a [link](https://example.com).',
+    'A short post.\n\n- one\n- two\n- three',
+    '```\nprint("code")\n```\n\nWith a code block.',
+]
+
+
+class Command(BaseCommand):
+    help = 'Seed N posts and measure feed / post list throughput with keyset pagination'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        self.seed(options['posts'], options['batch_size'])
+        max_id = Post.objects.order_by('-id').values_list('id', flat=True).first()
+        if max_id is None or max_id < 2:
+            # a cursor is "posts before this id": deep pages need a second post
+            raise CommandError('need at least 2 posts to benchmark, use --posts 2 or more')
+        n = options['requests']
+        client = Client(SERVER_NAME='localhost')
+        cursors = [random.randint(2, max_id) for _ in range(n)]
+
+        self.run('feed, first page', client, '/blog/', [None] * n)
+        self.run('feed, random deep cursor', client, '/blog/', cursors)
+        self.run('api, first page', client, '/blog/api/posts/', [None] * n)
+        self.run('api, random deep cursor', client, '/blog/api/posts/', cursors)
+
+        # for comparison: what OFFSET pagination would cost at the same depth
+        offsets = [max_id - c for c in cursors[:50]]
+        started = time.perf_counter()
+        for offset in offsets:
+            list(Post.objects.order_by('-id').values('id', 'title')[offset:offset + 20])
+        per_query = (time.perf_counter() - started) / len(offsets)
+        self.stdout.write(f'{"OFFSET query, random depth":28} {1 / per_query:10.1f} queries/s')
+
+    def seed(self, total, batch_size):
+        existing = Post.objects.count()
+        if existing >= total:
+            self.stdout.write(f'{existing} posts already present')
+            return
+        User = get_user_model()
+        author, _ = User.objects.get_or_create(username='bench')
+        rendered = [(body, render_markdown(body)) for body in BODIES]
+        now = timezone.now()
+        self.stdout.write(f'seeding {total - existing} posts...')
+        started = time.perf_counter()
+        for start in range(existing, total, batch_size):
+            # bulk_create skips Post.save(), so body_html is filled in here
+            posts = []
+            for i in range(start, min(start + batch_size, total)):
+                body, html = rendered[i % len(rendered)]
+                posts.append(Post(
+                    author=author, title=f'Post {i}', body=body, body_html=html,
+                    comment_count=i % 7, created_at=now, updated_at=now,
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+        self.stdout.write(f'seeded in {time.perf_counter() - started:.1f}s')
+
+    def run(self, label, client, url, cursors):
+        started = time.perf_counter()
+        for cursor in cursors:
+            response = client.get(url, {'before': cursor} if cursor else {})
+            assert response.status_code == 200, response.status_code
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{label:28} {len(cursors) / elapsed:10.1f} req/s')
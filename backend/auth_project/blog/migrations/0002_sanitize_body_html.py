@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def rerender(apps, schema_editor):
+    # body_html rendered before sanitizing could hold javascript: links or raw HTML
+    from blog.models import render_markdown
+
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('id', 'body').iterator(chunk_size=2000):
+        Post.objects.filter(pk=post.pk).update(body_html=render_markdown(post.body))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rerender, migrations.RunPython.noop),
+    ]
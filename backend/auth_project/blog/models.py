@@ -1,3 +1,110 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.html import linebreaks
 
-# Create your models here.
+try:
+    import markdown
+    import nh3
+except ImportError:  # pragma: no cover - markdown and nh3 are optional
+    markdown = nh3 = None
+
+# what markdown can produce; anything else (raw <script>, <iframe>, on* attributes) is dropped
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'b', 'i',
+    'code', 'pre', 'blockquote', 'ul', 'ol', 'li', 'a', 'img',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}, 'img': {'src', 'alt', 'title'}}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+
+
+def render_markdown(text):
+    """Markdown to HTML that is safe to output with |safe.
+
+    The markdown output is sanitized with nh3: only ALLOWED_TAGS survive and links
+    may only use http, https or mailto, so `[x](javascript:...)` loses its href.
+    Without markdown/nh3 installed the text is escaped and only gets line breaks.
+    """
+    if markdown is None:
+        return linebreaks(text, autoescape=True)
+    html = markdown.markdown(text, extensions=['fenced_code'])
+    return nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=ALLOWED_URL_SCHEMES,
+        link_rel='nofollow noopener noreferrer',
+    )
+
+
+class Post(models.Model):
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=200)
+    body = models.TextField(help_text='Markdown')
+    # rendered once on save so the feed never renders markdown per request
+    body_html = models.TextField(editable=False, blank=True)
+    # denormalized, kept in sync by the Comment post_save/post_delete receivers below
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        self.body_html = render_markdown(self.body)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'body' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'body_html'}
+        super().save(*args, **kwargs)
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='comments')
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f'{self.author} on {self.post}'
+
+
+
+def _bump_comment_count(post_id, delta):
+    # updated_at is part of the feed fragment cache key, so touching it invalidates the card
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta, updated_at=timezone.now()
+    )
+
+
+# Signals rather than Comment.save()/delete(): post_delete also fires for
+# queryset.delete() and for cascades (deleting a user deletes their comments).
+@receiver(post_save, sender=Comment)
+def comment_added(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _bump_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    _bump_comment_count(instance.post_id, -1)
+
+
+def recount_comments(posts=None):
+    """Recompute comment_count from the comments table, e.g. after bulk_create or raw SQL."""
+    posts = Post.objects.all() if posts is None else posts
+    counts = (
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by().values('post').annotate(n=Count('pk')).values('n')
+    )
+    return posts.update(comment_count=Coalesce(Subquery(counts), 0), updated_at=timezone.now())
@@ -1,3 +1,71 @@
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from . import models
+from .models import Comment, Post, recount_comments, render_markdown
+
+
+@skipIf(models.markdown is None, 'markdown and nh3 are not installed')
+class RenderMarkdownTests(TestCase):
+    def test_javascript_link_loses_its_href(self):
+        html = render_markdown('[click](javascript:alert(1))')
+        self.assertNotIn('javascript:', html)
+        self.assertIn('click', html)
+
+    def test_http_link_is_kept(self):
+        html = render_markdown('[site](https://example.com)')
+        self.assertIn('href="https://example.com"', html)
+
+    def test_raw_script_is_removed(self):
+        html = render_markdown('hello\n\n<script>alert(1)</script>\n\n<img src=x onerror=alert(1)>')
+        self.assertNotIn('<script', html)
+        self.assertNotIn('alert(1)</script>', html)
+        self.assertNotIn('onerror', html)
+
+    def test_less_than_in_code_is_escaped_once(self):
+        html = render_markdown('`a < b`\n\n```\nif a < b:\n    pass\n```')
+        self.assertIn('<code>a &lt; b</code>', html)
+        self.assertIn('if a &lt; b:', html)
+        self.assertNotIn('&amp;lt;', html)
+
+
+class CommentCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('writer', password='pw')
+        self.post = Post.objects.create(author=self.user, title='t', body='b')
+
+    def add_comments(self, n, author=None):
+        for i in range(n):
+            Comment.objects.create(post=self.post, author=author or self.user, body=str(i))
+
+    def count(self):
+        self.post.refresh_from_db()
+        return self.post.comment_count
+
+    def test_create_and_delete(self):
+        self.add_comments(2)
+        self.assertEqual(self.count(), 2)
+        Comment.objects.first().delete()
+        self.assertEqual(self.count(), 1)
+
+    def test_queryset_delete(self):
+        self.add_comments(3)
+        Comment.objects.filter(post=self.post).delete()
+        self.assertEqual(self.count(), 0)
+
+    def test_cascade_from_deleted_author(self):
+        other = get_user_model().objects.create_user('reader', password='pw')
+        self.add_comments(2)
+        self.add_comments(2, author=other)
+        other.delete()
+        self.assertEqual(self.count(), 2)
+
+    def test_recount_after_bulk_create(self):
+        Comment.objects.bulk_create(
+            [Comment(post=self.post, author=self.user, body=str(i)) for i in range(4)]
+        )
+        self.assertEqual(self.count(), 0)
+        recount_comments()
+        self.assertEqual(self.count(), 4)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'blog'
+
+urlpatterns = [
+    path('', views.feed, name='feed'),
+    path('api/posts/', views.post_list, name='post-list'),
+]
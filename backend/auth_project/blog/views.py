@@ -1,3 +1,60 @@
+from django.db.models import F
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
 
-# Create your views here.
+from .models import Post
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _page_params(request):
+    """Read `?before=<id>&limit=<n>` and return (before, limit), raising ValueError on junk."""
+    before = request.GET.get('before')
+    before = int(before) if before else None
+    limit = int(request.GET.get('limit', PAGE_SIZE))
+    if limit < 1 or (before is not None and before < 1):
+        raise ValueError
+    return before, min(limit, MAX_PAGE_SIZE)
+
+
+def _keyset(queryset, before, limit):
+    """Keyset pagination on the primary key: newest first, `before` is the last id seen.
+
+    Unlike OFFSET this costs the same on page 1 and page 50,000.
+    Returns (rows, next_cursor).
+    """
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    rows = list(queryset.order_by('-id')[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, last['id'] if isinstance(last, dict) else last.id
+
+
+def post_list(request):
+    try:
+        before, limit = _page_params(request)
+    except ValueError:
+        return HttpResponseBadRequest('before and limit must be positive integers')
+
+    queryset = Post.objects.values(
+        'id', 'title', 'body_html', 'comment_count', 'created_at', author_name=F('author__username')
+    )
+    posts, next_cursor = _keyset(queryset, before, limit)
+    return JsonResponse({'results': posts, 'next': next_cursor})
+
+
+def feed(request):
+    try:
+        before, limit = _page_params(request)
+    except ValueError:
+        return HttpResponseBadRequest('before and limit must be positive integers')
+
+    queryset = Post.objects.select_related('author').only(
+        'id', 'title', 'body_html', 'comment_count', 'created_at', 'updated_at', 'author__username'
+    )
+    posts, next_cursor = _keyset(queryset, before, limit)
+    return render(request, 'blog/feed.html', {'posts': posts, 'next_cursor': next_cursor, 'limit': limit})
@@ -23,13 +23,17 @@ class Book(models.Model):
     pages = models.IntegerField()
     description = models.TextField(unique=True)
     is_published = models.BooleanField(default=False)
-    onwer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='books')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='books')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
 
     def __str__(self):
         return self.title
+
+    class Meta():
+        # newest-first listing (BookViewSet ordering, keyset pagination in api_with_framework)
+        indexes = [models.Index(fields=['-created_at', '-id'], name='book_created_idx')]
     
     
     
@@ -10,11 +10,17 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Apps shared with backend/auth_project (jobs) live in django_apps/ at the
+# repository root; `python manage.py test jobs` runs their tests.
+sys.path.insert(0, str(BASE_DIR.parent / 'django_apps'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -46,7 +52,8 @@ INSTALLED_APPS = [
     'corsheaders',
 
     # My apps
-    'books',
+    'book',
+    'jobs',
 ]
 
 
@@ -87,7 +94,9 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('BOOK_API_DB', BASE_DIR / 'db.sqlite3'),
+        # worker processes write to the same file, wait for the lock instead of failing
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -167,4 +176,12 @@ SPECTACULAR_SETTINGS = {
     'TITLE': 'BOOK API',
     'DESCRIPTION': 'A comprehensive API for managing books and authors',
     'VERSION': '1.0.0',
-}
\ No newline at end of file
+}
+
+# Background jobs (jobs app, `python manage.py run_workers`)
+JOBS_CONCURRENCY = 4
+JOBS_POLL_INTERVAL = 1.0
+JOBS_RETRY_BASE_DELAY = 5
+JOBS_RETRY_MAX_DELAY = 600
+JOBS_LOCK_TIMEOUT = 600
+JOBS_HEARTBEAT_INTERVAL = 60
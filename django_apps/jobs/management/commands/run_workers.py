@@ -0,0 +1,119 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.metrics import queue_depth, task_latency
+from jobs.worker import Worker, requeue_stale
+
+
+def _format_ms(seconds):
+    return '-' if seconds is None else f'{seconds * 1000:.0f}ms'
+
+
+def _work(index, poll_interval, stop_event, burst):
+    # the parent handles Ctrl+C and tells every child to stop through stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    name = f'worker-{index}:{os.getpid()}'
+    Worker(name=name, poll_interval=poll_interval, stop_event=stop_event).run(burst=burst)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of background job worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'JOBS_CONCURRENCY', os.cpu_count() or 1),
+            help='number of worker processes',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=getattr(settings, 'JOBS_POLL_INTERVAL', 1.0),
+            help='seconds an idle worker waits before checking the queue again',
+        )
+        parser.add_argument(
+            '--stats-interval', type=float, default=30.0,
+            help='seconds between queue depth / latency log lines (0 disables)',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='exit once the queue has no due tasks left',
+        )
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(message)s')
+        concurrency = max(1, options['concurrency'])
+
+        self.requeue_stale()
+
+        # forked children must open their own database connections
+        connections.close_all()
+        ctx = multiprocessing.get_context('fork')
+        stop_event = ctx.Event()
+        processes = [
+            ctx.Process(
+                target=_work,
+                args=(i, options['poll_interval'], stop_event, options['burst']),
+                name=f'worker-{i}',
+            )
+            for i in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'started {concurrency} worker(s), Ctrl+C to stop')
+
+        stop = lambda *_: stop_event.set()
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        interval = options['stats_interval'] or None
+        # a worker can die mid-task while the pool keeps running: look for
+        # tasks without heartbeats as often as live workers send them
+        requeue_interval = getattr(settings, 'JOBS_HEARTBEAT_INTERVAL', 60)
+        tick = min(interval or 1.0, requeue_interval)
+        now = time.monotonic()
+        next_stats, next_requeue = now + (interval or 0), now + requeue_interval
+        try:
+            while any(p.is_alive() for p in processes):
+                if stop_event.wait(tick):
+                    break
+                now = time.monotonic()
+                if interval and now >= next_stats:
+                    self.log_stats()
+                    next_stats = now + interval
+                if now >= next_requeue:
+                    self.requeue_stale()
+                    next_requeue = now + requeue_interval
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join()
+        self.log_stats()
+
+    def requeue_stale(self):
+        stale = requeue_stale()
+        if stale:
+            self.stdout.write(f'requeued {stale} stale task(s)')
+
+    def log_stats(self):
+        depth = queue_depth()
+        latency = task_latency()
+        self.stdout.write(
+            'queue ready={ready} scheduled={scheduled} running={running} '
+            'done={done} failed={failed}'.format(**depth)
+        )
+        self.stdout.write(
+            'latency n={} wait p50={} p95={} run p50={} p95={} p99={}'.format(
+                latency['count'],
+                _format_ms(latency['wait'][50]), _format_ms(latency['wait'][95]),
+                _format_ms(latency['run'][50]), _format_ms(latency['run'][95]),
+                _format_ms(latency['run'][99]),
+            )
+        )
@@ -0,0 +1,45 @@
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task
+
+
+def queue_depth():
+    """Task counts by state. `ready` are due now, `scheduled` are waiting on run_at."""
+    now = timezone.now()
+    counts = dict(Task.objects.values_list('status').annotate(n=Count('id')))
+    ready = Task.objects.filter(status=Task.QUEUED, run_at__lte=now).count()
+    return {
+        'ready': ready,
+        'scheduled': counts.get(Task.QUEUED, 0) - ready,
+        'running': counts.get(Task.RUNNING, 0),
+        'done': counts.get(Task.DONE, 0),
+        'failed': counts.get(Task.FAILED, 0),
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, round(pct / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def task_latency(limit=1000):
+    """Wait (run_at -> started) and run (started -> finished) time in seconds
+    over the last `limit` finished tasks, as p50/p95/p99."""
+    rows = (
+        Task.objects.filter(status=Task.DONE, started_at__isnull=False, finished_at__isnull=False)
+        .order_by('-finished_at')
+        .values_list('run_at', 'started_at', 'finished_at')[:limit]
+    )
+    wait, run = [], []
+    for run_at, started_at, finished_at in rows:
+        wait.append(max((started_at - run_at).total_seconds(), 0.0))
+        run.append((finished_at - started_at).total_seconds())
+    return {
+        'count': len(run),
+        'wait': {p: percentile(wait, p) for p in (50, 95, 99)},
+        'run': {p: percentile(run, p) for p in (50, 95, 99)},
+    }
@@ -0,0 +1,76 @@
+"""
+Enqueue work to be run by `manage.py run_workers` instead of on the request path.
+
+    from jobs.queue import task
+
+    @task(priority=5)
+    def recompute_stats(user_id):
+        ...
+
+    recompute_stats.delay(42)                           # run as soon as a worker is free
+    recompute_stats.schedule(timedelta(hours=1), 42)    # run in an hour
+"""
+from datetime import datetime, timedelta
+from importlib import import_module
+
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def resolve(name):
+    """Return the callable registered (or importable) under `name`."""
+    if name in _registry:
+        return _registry[name]
+    module_path, _, attr = name.rpartition('.')
+    func = getattr(import_module(module_path), attr)
+    # importing the module runs the @task decorators, so the unwrapped function is registered now
+    return _registry.get(name, func)
+
+
+def enqueue(func, args=(), kwargs=None, priority=0, run_at=None, max_attempts=3):
+    """Store a task row and return it. `func` is a callable or its dotted path.
+
+    `run_at` may be a datetime or a timedelta from now.
+    """
+    name = func if isinstance(func, str) else task_name(func)
+    if isinstance(run_at, timedelta):
+        run_at = timezone.now() + run_at
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def task(func=None, *, priority=0, max_attempts=3):
+    """Register a function as a background task and give it `.delay()` / `.schedule()`."""
+    def decorator(fn):
+        name = task_name(fn)
+        _registry[name] = fn
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, priority=priority, max_attempts=max_attempts)
+
+        def schedule(when, *args, **kwargs):
+            if not isinstance(when, (datetime, timedelta)):
+                raise TypeError('when must be a datetime or a timedelta')
+            return enqueue(name, args, kwargs, priority=priority, run_at=when, max_attempts=max_attempts)
+
+        fn.delay = delay
+        fn.schedule = schedule
+        fn.task_name = name
+        return fn
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,167 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import enqueue, task
+from .worker import Heartbeat, Worker, requeue_stale, retry_delay
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise ValueError('boom')
+
+
+@override_settings(JOBS_RETRY_BASE_DELAY=5, JOBS_RETRY_MAX_DELAY=600, JOBS_LOCK_TIMEOUT=600)
+class JobsTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+        # no beats during a test: the thread only starts and stops
+        self.worker = Worker(name='test-worker', heartbeat_interval=3600)
+
+    def reload(self, task_row):
+        task_row.refresh_from_db()
+        return task_row
+
+
+class ClaimTests(JobsTestCase):
+    def test_highest_priority_due_task_first(self):
+        low = enqueue(record, ['low'])
+        high = enqueue(record, ['high'], priority=5)
+        enqueue(record, ['later'], priority=10, run_at=timedelta(hours=1))
+        claimed = self.worker.claim()
+        self.assertEqual(claimed.pk, high.pk)
+        self.assertEqual(claimed.status, Task.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertEqual(claimed.locked_by, 'test-worker')
+        self.assertIsNotNone(claimed.heartbeat_at)
+        self.assertEqual(self.worker.claim().pk, low.pk)
+        self.assertIsNone(self.worker.claim())
+
+    def test_a_claimed_task_is_not_claimed_again(self):
+        enqueue(record, ['once'])
+        other = Worker(name='other-worker', heartbeat_interval=3600)
+        self.assertIsNotNone(self.worker.claim())
+        self.assertIsNone(other.claim())
+
+    def test_run_once_runs_the_task(self):
+        row = record.delay('hello')
+        self.assertTrue(self.worker.run_once())
+        self.assertEqual(calls, ['hello'])
+        self.assertEqual(self.reload(row).status, Task.DONE)
+        self.assertFalse(self.worker.run_once())
+
+
+class RetryTests(JobsTestCase):
+    def test_failure_is_retried_later_with_the_error(self):
+        row = explode.delay()
+        before = timezone.now()
+        self.worker.run_once()
+        row = self.reload(row)
+        self.assertEqual(row.status, Task.QUEUED)
+        self.assertEqual(row.attempts, 1)
+        self.assertEqual(row.locked_by, '')
+        self.assertIn('ValueError: boom', row.last_error)
+        # first retry waits base * 2**0 = 5s, less up to half of it for jitter
+        self.assertGreaterEqual(row.run_at, before + timedelta(seconds=2.5))
+        self.assertLessEqual(row.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIsNone(self.worker.claim())
+
+    def test_failed_for_good_after_max_attempts(self):
+        row = explode.delay()
+        self.worker.run_once()
+        Task.objects.filter(pk=row.pk).update(run_at=timezone.now())
+        self.worker.run_once()
+        row = self.reload(row)
+        self.assertEqual(row.status, Task.FAILED)
+        self.assertEqual(row.attempts, 2)
+        self.assertIsNotNone(row.finished_at)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        with mock.patch('jobs.worker.random.uniform', return_value=1.0):
+            self.assertEqual([retry_delay(n) for n in (1, 2, 3)], [5, 10, 20])
+            self.assertEqual(retry_delay(20), 600)
+
+
+class RequeueTests(JobsTestCase):
+    def running(self, heartbeat_age, attempts=1, max_attempts=3):
+        row = enqueue(record, ['x'], max_attempts=max_attempts)
+        long_ago = timezone.now() - timedelta(hours=2)
+        Task.objects.filter(pk=row.pk).update(
+            status=Task.RUNNING, locked_by='dead-worker', attempts=attempts,
+            started_at=long_ago, heartbeat_at=timezone.now() - heartbeat_age,
+        )
+        return row
+
+    def test_task_without_recent_heartbeat_is_requeued(self):
+        row = self.running(timedelta(minutes=11))
+        self.assertEqual(requeue_stale(), 1)
+        row = self.reload(row)
+        self.assertEqual(row.status, Task.QUEUED)
+        self.assertEqual(row.locked_by, '')
+
+    def test_long_task_with_recent_heartbeat_is_left_running(self):
+        # started two hours ago, but its worker is still beating
+        row = self.running(timedelta(seconds=30))
+        self.assertEqual(requeue_stale(), 0)
+        self.assertEqual(self.reload(row).status, Task.RUNNING)
+
+    def test_stale_task_out_of_attempts_fails(self):
+        row = self.running(timedelta(minutes=11), attempts=3, max_attempts=3)
+        self.assertEqual(requeue_stale(), 0)
+        row = self.reload(row)
+        self.assertEqual(row.status, Task.FAILED)
+        self.assertIn('heartbeats', row.last_error)
+        self.assertIsNotNone(row.finished_at)
+
+    def test_heartbeat_refreshes_a_running_task(self):
+        row = enqueue(record, ['x'])
+        claimed = self.worker.claim()
+        Task.objects.filter(pk=row.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        # run() in this thread, for exactly one beat
+        beat = Heartbeat(claimed, 'test-worker', interval=3600)
+        beat.stopped.wait = mock.Mock(side_effect=[False, True])
+        beat.run()
+        self.assertGreater(self.reload(row).heartbeat_at, timezone.now() - timedelta(minutes=1))
+
+
+class FakeProcess:
+    """Stands in for a worker process that stays alive for a few supervisor ticks."""
+
+    def __init__(self, *args, **kwargs):
+        self.ticks = 5
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        self.ticks -= 1
+        return self.ticks >= 0
+
+    def join(self):
+        pass
+
+
+class RunWorkersTests(JobsTestCase):
+    @override_settings(JOBS_HEARTBEAT_INTERVAL=0.01)
+    def test_supervisor_requeues_stale_tasks_while_running(self):
+        command = 'jobs.management.commands.run_workers'
+        context = mock.Mock(Process=FakeProcess, Event=threading.Event)
+        with mock.patch(f'{command}.multiprocessing.get_context', return_value=context), \
+                mock.patch(f'{command}.signal.signal'), \
+                mock.patch(f'{command}.requeue_stale', return_value=0) as requeue:
+            call_command('run_workers', concurrency=1, stats_interval=0, stdout=StringIO())
+        # once at startup, then on every tick the pool was alive
+        self.assertGreaterEqual(requeue.call_count, 3)
@@ -0,0 +1,173 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import resolve
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: base * 2**(attempts - 1), capped."""
+    base = getattr(settings, 'JOBS_RETRY_BASE_DELAY', 5)
+    cap = getattr(settings, 'JOBS_RETRY_MAX_DELAY', 600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def requeue_stale(timeout=None):
+    """Put back tasks whose worker died while running them. Returns how many.
+
+    A task is stale when its worker hasn't sent a heartbeat for `timeout`
+    seconds. The dead run counted as an attempt, so a task that has used up
+    max_attempts is marked failed instead (it may be what killed the worker).
+    """
+    timeout = timeout or getattr(settings, 'JOBS_LOCK_TIMEOUT', 600)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    stale = Task.objects.filter(status=Task.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED,
+        locked_by='',
+        last_error=f'worker stopped sending heartbeats for {timeout}s',
+        finished_at=now,
+    )
+    if failed:
+        logger.error('%s stale task(s) failed permanently, no attempts left', failed)
+    return stale.update(status=Task.QUEUED, locked_by='', run_at=now)
+
+
+class Heartbeat(threading.Thread):
+    """Refreshes a running task's heartbeat_at until stopped."""
+
+    def __init__(self, task, worker_name, interval):
+        super().__init__(name=f'heartbeat-{task.pk}', daemon=True)
+        self.task = task
+        self.worker_name = worker_name
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Task.objects.filter(
+                        pk=self.task.pk, status=Task.RUNNING, locked_by=self.worker_name
+                    ).update(heartbeat_at=timezone.now())
+                except Exception:
+                    # a missed beat is fine, requeue_stale allows for several
+                    logger.exception('heartbeat for task %s failed', self.task.pk)
+        finally:
+            # this thread has its own database connection
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class Worker:
+    def __init__(self, name=None, poll_interval=1.0, batch_size=10, stop_event=None,
+                 heartbeat_interval=None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.stop_event = stop_event
+        self.heartbeat_interval = heartbeat_interval or getattr(
+            settings, 'JOBS_HEARTBEAT_INTERVAL', 60)
+
+    def should_stop(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def claim(self):
+        """Atomically take the next due task, or return None.
+
+        Workers race on a conditional UPDATE instead of row locks (SQLite has none),
+        so only the worker whose update matched the still-queued row gets the task.
+        """
+        now = timezone.now()
+        candidates = (
+            Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .values_list('id', flat=True)[:self.batch_size]
+        )
+        for pk in list(candidates):
+            claimed = Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+                status=Task.RUNNING,
+                locked_by=self.name,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Task.objects.get(pk=pk)
+        return None
+
+    def execute(self, task):
+        started = time.perf_counter()
+        heartbeat = Heartbeat(task, self.name, self.heartbeat_interval)
+        heartbeat.start()
+        try:
+            func = resolve(task.name)
+            func(*task.args, **task.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if task.attempts < task.max_attempts:
+                delay = retry_delay(task.attempts)
+                logger.warning('task %s (%s) failed, retry %s/%s in %.1fs',
+                               task.pk, task.name, task.attempts, task.max_attempts, delay)
+                Task.objects.filter(pk=task.pk).update(
+                    status=Task.QUEUED,
+                    locked_by='',
+                    last_error=error,
+                    run_at=timezone.now() + timedelta(seconds=delay),
+                )
+            else:
+                logger.error('task %s (%s) failed permanently after %s attempts',
+                             task.pk, task.name, task.attempts)
+                Task.objects.filter(pk=task.pk).update(
+                    status=Task.FAILED, last_error=error, finished_at=timezone.now()
+                )
+            return False
+        finally:
+            heartbeat.stop()
+
+        Task.objects.filter(pk=task.pk).update(status=Task.DONE, finished_at=timezone.now())
+        logger.info('task %s (%s) done in %.3fs', task.pk, task.name, time.perf_counter() - started)
+        return True
+
+    def run_once(self):
+        """Run one task if any is due. Returns True when a task was run."""
+        task = self.claim()
+        if task is None:
+            return False
+        self.execute(task)
+        return True
+
+    def run(self, burst=False):
+        """Process tasks until stopped. With `burst`, return once nothing is due."""
+        logger.info('worker %s started', self.name)
+        while not self.should_stop():
+            close_old_connections()
+            if self.run_once():
+                continue
+            if burst:
+                break
+            if self.stop_event is not None:
+                self.stop_event.wait(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+        logger.info('worker %s stopped', self.name)
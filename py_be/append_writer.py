@@ -0,0 +1,223 @@
+"""
+# Buffered appends for high-rate event logs
+
+file_handling_explanation.py appends with `open("example.txt", "a")` and one
+write() per line. Done per event, that's an open, a write system call and a
+close for every line. AppendWriter keeps the file open and writes in batches:
+
+    with AppendWriter("events.log", buffer_size=1 << 20, flush_interval=1.0,
+                      sync_interval=0.5, max_bytes=100 << 20, backups=5) as log:
+        log.write("user signed in\\n")
+
+- Buffering: lines collect in memory and go out in one os.write() when
+  buffer_size characters are waiting, or once the oldest line has waited
+  flush_interval seconds. A background thread keeps that deadline (and the
+  fsync one below) when writes stop, so an idle log doesn't hold lines back.
+  flush() or close() writes the rest. A failed write (ENOSPC, EIO) keeps
+  whatever didn't reach the file and tries again on the next flush.
+- The file is opened with O_APPEND, so each flush lands whole at the end of
+  the file even when other processes append to it too.
+- Group fsync: sync_interval=None leaves it to the OS (a crash can lose the
+  last seconds). 0 fsyncs after every flush. A number of seconds fsyncs at most
+  that often, so one fsync covers every line written since the last.
+- Rotation: a flush that would take the file past max_bytes first renames
+  events.log -> events.log.1 -> events.log.2 ..., keeping `backups` old
+  files, like logging.handlers.RotatingFileHandler.
+- atomic_write() / rewrite(): replace a whole file by writing a temp file
+  next to it and renaming it over the original, so a reader (or a crash)
+  sees either the old content or the new, never half of each.
+"""
+import os
+import tempfile
+import threading
+import time
+
+
+def atomic_write(path, data, sync=True):
+    """Replace path with data (bytes or str) via a temp file and os.replace()."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    if sync and hasattr(os, "O_DIRECTORY"):
+        # the rename is only durable once the directory entry is on disk
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class AppendWriter:
+    """Appends lines to a file in batches; safe to share between threads."""
+
+    def __init__(self, path, buffer_size=1 << 20, flush_interval=1.0, sync_interval=None,
+                 max_bytes=None, backups=5, encoding="utf-8"):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.encoding = encoding
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.buffer = []
+        self.buffered = 0
+        self.unwritten = b""  # the part of a flush a failed os.write() didn't take
+        self.deadline = None
+        self.synced_at = time.monotonic()
+        self.unsynced = False
+        self.stats = {"lines": 0, "bytes": 0, "flushes": 0, "fsyncs": 0, "rotations": 0,
+                      "errors": 0}
+        self.fd = None
+        self._open()
+        self.flusher = threading.Thread(target=self._flush_loop, name="append-writer-flush",
+                                        daemon=True)
+        self.flusher.start()
+
+    def _open(self):
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.size = os.fstat(self.fd).st_size
+
+    def write(self, line):
+        """Buffer one line of text; add the newline yourself."""
+        # this runs per event, so it does as little as it can: the text is
+        # encoded once per flush and buffer_size is counted in characters
+        with self.lock:
+            if not self.buffer:
+                self.deadline = time.monotonic() + self.flush_interval
+                self.wake.notify()
+            self.buffer.append(line)
+            self.buffered += len(line)
+            if self.buffered >= self.buffer_size or time.monotonic() >= self.deadline:
+                self._flush()
+
+    def write_many(self, lines):
+        with self.lock:
+            if not self.buffer:
+                self.deadline = time.monotonic() + self.flush_interval
+                self.wake.notify()
+            for line in lines:
+                self.buffer.append(line)
+                self.buffered += len(line)
+                if self.buffered >= self.buffer_size:
+                    self._flush()
+                    self.deadline = time.monotonic() + self.flush_interval
+            if time.monotonic() >= self.deadline:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer or self.unwritten:
+            data = self.unwritten + "".join(self.buffer).encode(self.encoding)
+            if self.max_bytes and self.size and self.size + len(data) > self.max_bytes:
+                self._rotate()
+            view = memoryview(data)
+            try:
+                while view:
+                    # os.write can write less than asked (signals, full disks)
+                    view = view[os.write(self.fd, view):]
+            finally:
+                # lines leave the buffer only once os.write() took them: if it
+                # raised, what it didn't take waits for the next flush
+                written = len(data) - len(view)
+                if written:
+                    self.stats["lines"] += len(self.buffer)
+                    self.buffer = []
+                    self.buffered = 0
+                    self.unwritten = view.tobytes()
+                    self.size += written
+                    self.stats["bytes"] += written
+                    self.unsynced = True
+            self.stats["flushes"] += 1
+        if (self.unsynced and self.sync_interval is not None
+                and time.monotonic() - self.synced_at >= self.sync_interval):
+            self._sync()
+
+    def _next_deadline(self):
+        deadlines = []
+        if self.buffer or self.unwritten:
+            deadlines.append(self.deadline)
+        if self.unsynced and self.sync_interval is not None:
+            deadlines.append(self.synced_at + self.sync_interval)
+        return min(deadlines, default=None)
+
+    def _flush_loop(self):
+        """Flush and fsync on their deadlines even when no write() comes along to do it."""
+        with self.lock:
+            while self.fd is not None:
+                deadline = self._next_deadline()
+                now = time.monotonic()
+                if deadline is None or deadline > now:
+                    self.wake.wait(None if deadline is None else deadline - now)
+                    continue
+                try:
+                    self._flush()
+                except OSError:
+                    # the data is kept and the next write(), flush() or close()
+                    # raises the error; try again in a while rather than spin
+                    self.stats["errors"] += 1
+                    self.wake.wait(max(self.flush_interval, 0.1))
+
+    def _sync(self):
+        os.fsync(self.fd)
+        self.synced_at = time.monotonic()
+        self.unsynced = False
+        self.stats["fsyncs"] += 1
+
+    def _rotate(self):
+        if self.unsynced and self.sync_interval is not None:
+            self._sync()
+        os.close(self.fd)
+        for n in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{n}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.stats["rotations"] += 1
+        self._open()
+
+    def rewrite(self, data):
+        """Flush, then atomically replace the whole file with data."""
+        with self.lock:
+            self._flush()
+            os.close(self.fd)
+            try:
+                atomic_write(self.path, data, sync=self.sync_interval is not None)
+            finally:
+                self._open()
+
+    def close(self):
+        with self.lock:
+            if self.fd is None:
+                return
+            self._flush()
+            if self.unsynced and self.sync_interval is not None:
+                self._sync()
+            os.close(self.fd)
+            self.fd = None
+            self.wake.notify()
+        self.flusher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,146 @@
+"""
+Lines per second appending an event log: open/write/close per line (as in
+file_handling_explanation.py) vs append_writer.AppendWriter.
+
+    python bench_append_writer.py
+    python bench_append_writer.py --lines 5000000 --naive-lines 200000
+
+Approaches that are slow per line run on fewer lines and are reported as a
+rate. Afterwards the script checks that every line arrived once and in order
+(including across rotated files), that rewrite() replaces the file
+atomically, that an idle writer still flushes on time and that a failed
+write loses nothing; it exits non-zero if not.
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from append_writer import AppendWriter
+
+LINE = "2024-05-01T12:00:00 INFO event {} user={} action=click\n"
+
+
+def naive(path, count, sync=False):
+    for i in range(count):
+        with open(path, "a") as file:
+            file.write(LINE.format(i, i % 1000))
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+
+
+def held_open(path, count):
+    with open(path, "a") as file:
+        for i in range(count):
+            file.write(LINE.format(i, i % 1000))
+
+
+def buffered(path, count, **options):
+    with AppendWriter(path, **options) as log:
+        for i in range(count):
+            log.write(LINE.format(i, i % 1000))
+    return log.stats
+
+
+def buffered_many(path, count, **options):
+    with AppendWriter(path, **options) as log:
+        for start in range(0, count, 1000):
+            log.write_many(LINE.format(i, i % 1000) for i in range(start, min(start + 1000, count)))
+    return log.stats
+
+
+def lines_in_order(path, count):
+    """True if path and its rotated backups hold lines 0..count-1 exactly once, in order."""
+    files = sorted(glob.glob(path + ".*"), key=lambda p: -int(p.rsplit(".", 1)[1])) + [path]
+    expected = 0
+    for name in files:
+        with open(name) as f:
+            for line in f:
+                if line != LINE.format(expected, expected % 1000):
+                    return False
+                expected += 1
+    return expected == count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark buffered appends.")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--naive-lines", type=int, default=100_000)
+    parser.add_argument("--sync-lines", type=int, default=2_000, help="for fsync per line")
+    parser.add_argument("--dir", help="where to write (default: a temp dir)")
+    args = parser.parse_args()
+
+    runs = [
+        ("open/write/close per line", args.naive_lines, naive, {}),
+        ("... and fsync per line", args.sync_lines, naive, {"sync": True}),
+        ("one open, write per line", args.lines, held_open, {}),
+        ("AppendWriter", args.lines, buffered, {}),
+        ("AppendWriter 64 KiB", args.lines, buffered, {"buffer_size": 1 << 16}),
+        ("AppendWriter write_many", args.lines, buffered_many, {}),
+        ("AppendWriter fsync 0.1s", args.lines, buffered, {"sync_interval": 0.1}),
+        ("AppendWriter fsync each", args.lines, buffered, {"buffer_size": 1 << 16, "sync_interval": 0}),
+        ("AppendWriter rotating", args.lines, buffered, {"max_bytes": 8 << 20, "backups": 1000}),
+    ]
+    problems = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        print(f"{'approach':<28}{'lines/s':>12}{'lines':>11}{'speedup':>9}  writer")
+        baseline = None
+        for n, (name, count, fn, options) in enumerate(runs):
+            path = os.path.join(tmp, f"events{n}.log")
+            started = time.perf_counter()
+            stats = fn(path, count, **options) or {}
+            rate = count / (time.perf_counter() - started)
+            baseline = baseline or rate
+            counts = ", ".join(f"{stats[k]} {k}" for k in ("flushes", "fsyncs", "rotations")
+                               if stats.get(k))
+            print(f"{name:<28}{rate:>12,.0f}{count:>11,}{rate / baseline:>8,.1f}x  {counts}")
+            if not lines_in_order(path, count):
+                problems.append(f"{name}: lines missing, repeated or out of order")
+
+        # rewrite(): a reader sees the old content or the new, and appends continue after it
+        path = os.path.join(tmp, "rewrite.log")
+        with AppendWriter(path, sync_interval=0) as log:
+            log.write("old\n")
+            log.rewrite("compacted\n")
+            log.write("after\n")
+        with open(path) as f:
+            content = f.read()
+        leftovers = [p for p in os.listdir(tmp) if p.endswith(".tmp")]
+        if content != "compacted\nafter\n" or leftovers:
+            problems.append(f"rewrite left {content!r} and temp files {leftovers}")
+
+        # no write() after the line: the flusher thread has to write and fsync it
+        path = os.path.join(tmp, "idle.log")
+        with AppendWriter(path, flush_interval=0.1, sync_interval=0.1) as log:
+            log.write("idle\n")
+            time.sleep(0.5)
+            on_disk = os.path.getsize(path)
+            fsyncs = log.stats["fsyncs"]
+        if on_disk != len("idle\n") or not fsyncs:
+            problems.append(f"idle writer: {on_disk} bytes on disk, {fsyncs} fsyncs after 0.5s")
+
+        # a full disk on the first flush: the line stays buffered and goes out with the next
+        path = os.path.join(tmp, "enospc.log")
+        with AppendWriter(path) as log:
+            log.write("first\n")
+            with mock.patch("append_writer.os.write", side_effect=OSError(28, "No space left")):
+                try:
+                    log.flush()
+                except OSError:
+                    pass
+            log.write("second\n")
+        with open(path) as f:
+            content = f.read()
+        if content != "first\nsecond\n":
+            problems.append(f"failed write lost lines: file holds {content!r}")
+
+    if problems:
+        sys.exit("\n".join(problems))
+
+
+if __name__ == "__main__":
+    main()
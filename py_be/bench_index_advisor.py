@@ -0,0 +1,98 @@
+"""
+Run the tutorial's queries through index_advisor.IndexAdvisor and report
+what its indexes gain.
+
+    python bench_index_advisor.py
+    python bench_index_advisor.py --users 1000000 --repeat 50
+
+The database is migrated to version 1 (just the users table, as db_test.py
+creates it) and filled with --users rows. The advisor then watches the
+SELECT/UPDATE/DELETE ... WHERE name = ? statements from
+database_sqlite3_explanation.py, plus lookups by email and a plain
+SELECT * that it should leave alone. The script exits non-zero unless it
+recommends exactly the name index that migrations/0002 creates, the
+timings improve, and migrating the rest of the way gives the same index.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from index_advisor import IndexAdvisor
+from users_db import BatchedWriter, connect
+from users_migrate import MIGRATIONS_DIR, current_version, migrate, migrations
+
+
+def statements(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("--")]
+
+
+def run_queries(conn, users, rounds):
+    cursor = conn.cursor()
+    for i in range(rounds):
+        n = i * 7919 % users
+        cursor.execute("SELECT * FROM users WHERE name = ?", (f"user {n}",)).fetchall()
+        cursor.execute("SELECT * FROM users WHERE email = ?", (f"user{n}@example.com",)).fetchall()
+        cursor.execute("UPDATE users SET email = ? WHERE name = ?", (f"new{n}@example.com", f"user {n}"))
+        cursor.execute("DELETE FROM users WHERE name = ?", (f"nobody {n}",))
+    cursor.execute("SELECT * FROM users").fetchall()
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the index advisor's suggestions.")
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=10, help="times each query runs while watched")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per timing")
+    args = parser.parse_args()
+
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect(os.path.join(tmp, "users.db"))
+        migrate(conn, target=1)
+        with BatchedWriter(conn, batch_size=100_000) as writer:
+            writer.write_many((f"user {i}", f"user{i}@example.com") for i in range(args.users))
+
+        advisor = IndexAdvisor(conn)
+        advisor.start()
+        run_queries(conn, args.users, args.rounds)
+        advisor.stop()
+        advices = advisor.advise()
+        timings = advisor.measure(advices, repeat=args.repeat)
+        print(f"{args.users:,} users, {len(advisor.queries)} distinct queries recorded\n")
+        print(advisor.report(timings))
+
+        suggested = {advice.index_sql for advice in advices}
+        if suggested != {"CREATE INDEX IF NOT EXISTS idx_users_name ON users (name)"}:
+            problems.append(f"unexpected suggestions {suggested}")
+        if len(advices) != 3:
+            problems.append(f"expected the 3 name queries flagged, got {len(advices)}")
+        problems += [f"no gain for {t.advice.query}" for t in timings if t.after_ms >= t.before_ms]
+        problems += [f"index unused by {t.advice.query}" for t in timings
+                     if not any("idx_users_name" in step for step in t.plan_after)]
+
+        # the advisor's migration, written after a copy of 0001, is the repo's 0002
+        directory = os.path.join(tmp, "migrations")
+        os.mkdir(directory)
+        shutil.copy(migrations()[0][2], directory)
+        path = advisor.write_migration(advices, directory=directory)
+        if path is None:
+            sys.exit("\n".join(problems))
+        print(f"\nwrote {os.path.relpath(path, tmp)}")
+        applied = migrate(conn)
+        index = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_users_name'").fetchone()
+        print(f"migrated {MIGRATIONS_DIR}: {applied}, now at version {current_version(conn)}")
+        if statements(path) != statements(migrations()[1][2]) or not index:
+            problems.append(f"{path} doesn't match migrations/0002")
+        if migrate(conn) or current_version(conn) != len(migrations()):
+            problems.append("migrating twice applied something")
+        conn.close()
+
+    if problems:
+        sys.exit("\n".join(problems))
+
+
+if __name__ == "__main__":
+    main()
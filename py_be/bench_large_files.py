@@ -0,0 +1,138 @@
+"""
+MB/s for each way of reading a big log file, from file_handling_explanation.py's
+read()/readlines()/`for line in file` to large_files' blocks, mmap and ranges.
+
+    python bench_large_files.py                          # 256 MiB and 2 GiB files
+    python bench_large_files.py --sizes 4096 --processes 2 4 8 --cold
+
+Every approach counts the lines and the lines containing "ERROR" (one line in
+100). read() and readlines() hold the whole file, so they only run on files
+under --in-memory-limit MiB. Straight after it's written the file is in the
+page cache, so the numbers are CPU cost; --cold asks the kernel to drop the
+file's cached pages (posix_fadvise) before each approach, to include the disk.
+The script exits non-zero if any approach counts differently.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from functools import partial
+
+from large_files import count_lines, iter_mmap_lines, map_ranges
+
+NEEDLE = "ERROR"
+LINE = "2024-05-01T12:00:{:02d}.{:06d} {} worker-{} request {} served in {} ms\n"
+
+
+def generate(path, size):
+    """Write about size bytes of log lines; returns (lines, ERROR lines)."""
+    lines = errors = written = 0
+    with open(path, "w", encoding="ascii") as f:
+        while written < size:
+            block = []
+            for i in range(lines, lines + 10_000):
+                level = NEEDLE if i % 100 == 99 else "INFO"
+                block.append(LINE.format(i % 60, i % 1_000_000, level, i % 16, i, i % 997))
+            text = "".join(block)
+            f.write(text)
+            written += len(text)
+            lines += len(block)
+            errors += len(block) // 100
+    return lines, errors
+
+
+def drop_cache(path):
+    with open(path, "rb") as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def with_read(path):
+    with open(path, "r") as file:
+        lines = file.read().splitlines()
+    return len(lines), sum(NEEDLE in line for line in lines)
+
+
+def with_readlines(path):
+    with open(path, "r") as file:
+        lines = file.readlines()
+    return len(lines), sum(NEEDLE in line for line in lines)
+
+
+def iterate(path, mode):
+    needle = NEEDLE if mode == "r" else NEEDLE.encode()
+    lines = matches = 0
+    with open(path, mode) as file:
+        for line in file:
+            lines += 1
+            matches += needle in line
+    return lines, matches
+
+
+def with_mmap(path):
+    # a memoryview has no `in` for substrings, but re searches any buffer
+    search = re.compile(NEEDLE.encode()).search
+    lines = matches = 0
+    for line in iter_mmap_lines(path):
+        lines += 1
+        matches += search(line) is not None
+    return lines, matches
+
+
+def with_ranges(path, processes):
+    results = map_ranges(path, partial(count_lines, needle=NEEDLE.encode()), processes)
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def approaches(size, limit, processes):
+    if size <= limit:
+        yield "read()", with_read
+        yield "readlines()", with_readlines
+    yield "for line in file", partial(iterate, mode="r")
+    yield "for line in file (rb)", partial(iterate, mode="rb")
+    yield "mmap lines", with_mmap
+    for kib in (16, 64, 1024, 16384):
+        yield f"line blocks {kib} KiB", partial(count_lines, needle=NEEDLE.encode(),
+                                                 buffer_size=kib * 1024)
+    for n in processes:
+        yield f"ranges x{n} processes", partial(with_ranges, processes=n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ways of reading large files.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 2048], help="MiB")
+    parser.add_argument("--processes", type=int, nargs="+", default=[os.cpu_count(), 4])
+    parser.add_argument("--in-memory-limit", type=int, default=1024,
+                        help="MiB; bigger files skip read() and readlines()")
+    parser.add_argument("--cold", action="store_true", help="drop the file from the page cache first")
+    parser.add_argument("--dir", help="where to write the files (default: a temp dir)")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for mib in args.sizes:
+            path = os.path.join(tmp, f"app-{mib}.log")
+            expected = generate(path, mib << 20)
+            size = os.path.getsize(path)
+            print(f"\n{size / 2**20:,.0f} MiB, {expected[0]:,} lines, {os.cpu_count()} cpus"
+                  f"{', cold cache' if args.cold else ''}")
+            print(f"{'approach':<24}{'seconds':>9}{'MB/s':>9}")
+            for name, fn in approaches(mib, args.in_memory_limit, args.processes):
+                if args.cold:
+                    drop_cache(path)
+                started = time.perf_counter()
+                counts = fn(path)
+                elapsed = time.perf_counter() - started
+                ok = tuple(counts) == expected
+                failed |= not ok
+                print(f"{name:<24}{elapsed:>9.2f}{size / elapsed / 1e6:>9,.0f}"
+                      + ("" if ok else f"  counted {counts}, expected {expected}"))
+            os.remove(path)
+
+    if failed:
+        sys.exit("an approach counted differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Rows per second loading users: one commit per row (as in the tutorial) vs
+users_db.BatchedWriter.
+
+    python bench_users_db.py                        # 10M users batched, 20k per-row
+    python bench_users_db.py --rows 1000000 --batch-size 100000
+
+Committing every row takes hours at 10M rows, so that approach runs on
+--naive-rows and is reported as a rate. After the batched load, a share of the
+users is loaded again with new names to time the ON CONFLICT(email) upsert path.
+The script checks the final row count and the updated names, and exits
+non-zero if they are wrong.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from users_db import INSERT, BatchedWriter, connect, create_schema
+
+
+def users(count, start=0, name="user"):
+    for i in range(start, start + count):
+        yield (f"{name} {i}", f"user{i}@example.com")
+
+
+def per_row(path, count):
+    # like database_sqlite3_explanation.py: default connection, commit per insert
+    conn = sqlite3.connect(path)
+    create_schema(conn)
+    started = time.perf_counter()
+    for row in users(count):
+        conn.execute(INSERT, row)
+        conn.commit()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return count / elapsed
+
+
+def batched(path, count, batch_size, updates):
+    conn = connect(path)
+    create_schema(conn)
+    started = time.perf_counter()
+    with BatchedWriter(conn, batch_size=batch_size) as writer:
+        writer.write_many(users(count))
+    load_rate = count / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with BatchedWriter(conn, batch_size=batch_size) as writer:
+        writer.write_many(users(updates, start=count - updates // 2, name="renamed"))
+    upsert_rate = updates / (time.perf_counter() - started)
+
+    total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    renamed = conn.execute("SELECT COUNT(*) FROM users WHERE name LIKE 'renamed %'").fetchone()[0]
+    conn.close()
+    return load_rate, upsert_rate, total, renamed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched writes to users.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--naive-rows", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--dir", help="where to put the databases (default: a temp dir)")
+    args = parser.parse_args()
+    updates = max(args.rows // 10, 2)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        naive = per_row(os.path.join(tmp, "naive.db"), args.naive_rows)
+        print(f"per-row commit  {naive:>12,.0f} rows/s  ({args.naive_rows:,} rows; "
+              f"{args.rows / naive / 60:,.0f} min for {args.rows:,})")
+        load, upsert, total, renamed = batched(
+            os.path.join(tmp, "batched.db"), args.rows, args.batch_size, updates)
+        print(f"batched insert  {load:>12,.0f} rows/s  ({args.rows:,} rows, "
+              f"{args.rows / load:.1f}s, {load / naive:,.0f}x)")
+        print(f"batched upsert  {upsert:>12,.0f} rows/s  ({updates:,} rows, half of them new)")
+
+    expected_total = args.rows + updates - updates // 2
+    if total != expected_total or renamed != updates:
+        sys.exit(f"expected {expected_total} users with {updates} renamed, "
+                 f"got {total} with {renamed}")
+
+
+if __name__ == "__main__":
+    main()
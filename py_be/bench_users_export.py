@@ -0,0 +1,97 @@
+"""
+Peak memory and rows/sec for reading and exporting the users table.
+
+    python bench_users_export.py                   # 1M users
+    python bench_users_export.py --users 5000000 --arraysize 50000
+
+Each approach scans SELECT * FROM users once, under tracemalloc, and reports
+the peak Python memory it allocated. fetchall() grows with the table; the
+streaming ones should stay near arraysize rows. Every approach must see every
+row; the script exits non-zero when one doesn't.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from users_db import BatchedWriter, connect, create_schema
+from users_export import export_csv, export_parquet, iter_numpy, iter_rows, to_numpy
+
+SQL = "SELECT id, name, email FROM users"
+
+
+def populate(path, count):
+    conn = connect(path)
+    create_schema(conn)
+    with BatchedWriter(conn, batch_size=100_000) as writer:
+        writer.write_many((f"user {i}", f"user{i}@example.com") for i in range(count))
+    return conn
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming reads and exports.")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--arraysize", type=int, default=10_000)
+    args = parser.parse_args()
+    size = args.arraysize
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = populate(os.path.join(tmp, "users.db"), args.users)
+
+        def fetchall():
+            return len(conn.execute(SQL).fetchall())
+
+        def dicts():
+            # what the row factories avoid: a dict per row
+            names = ("id", "name", "email")
+            return sum(1 for row in iter_rows(conn, SQL, arraysize=size) if dict(zip(names, row)))
+
+        def rows(factory):
+            return lambda: sum(1 for _ in iter_rows(conn, SQL, arraysize=size, row_factory=factory))
+
+        approaches = [
+            ("fetchall()", fetchall),
+            ("stream tuple", rows("tuple")),
+            ("stream Row", rows("row")),
+            ("stream namedtuple", rows("namedtuple")),
+            ("stream dict", dicts),
+            ("numpy batches", lambda: sum(len(c["id"]) for c in iter_numpy(conn, SQL, arraysize=size))),
+            ("to_numpy (whole)", lambda: len(to_numpy(conn, SQL, arraysize=size)["id"])),
+            ("csv", lambda: export_csv(conn, SQL, os.path.join(tmp, "users.csv"), arraysize=size)),
+        ]
+        try:
+            import pyarrow  # noqa: F401
+            approaches.append(("parquet", lambda: export_parquet(
+                conn, SQL, os.path.join(tmp, "users.parquet"), arraysize=size)))
+        except ImportError:
+            print("pyarrow not installed, skipping parquet")
+
+        print(f"{args.users:,} users, arraysize {size:,}")
+        print(f"{'approach':<20}{'rows/s':>12}{'peak MiB':>10}")
+        failed = False
+        for name, fn in approaches:
+            count, elapsed, peak = measure(fn)
+            ok = count == args.users
+            failed |= not ok
+            print(f"{name:<20}{count / elapsed:>12,.0f}{peak / 2**20:>10.1f}"
+                  f"{'' if ok else f'  saw {count} rows'}")
+        conn.close()
+
+    if failed:
+        sys.exit("an approach missed rows")
+
+
+if __name__ == "__main__":
+    main()
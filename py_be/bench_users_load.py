@@ -0,0 +1,93 @@
+"""
+Rows per second for users_load.load() on generated CSV and NDJSON files.
+
+    python bench_users_load.py                       # 1M rows
+    python bench_users_load.py --rows 5000000 --processes 1 4
+
+Every 100th row has a broken email and every 50th repeats an earlier user
+with the address in upper case, so validation and normalization are on the
+hot path. The users table gets an index on name, as a real database would,
+to show what dropping and rebuilding it saves. The script checks the loaded
+and rejected counts and exits non-zero if they are wrong.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+
+from users_db import connect, create_schema
+from users_load import load
+
+
+def generate(path, count):
+    """Write the test file; returns (rows expected in the table, rows expected rejected)."""
+    users, bad = 0, 0
+    ndjson = path.endswith(".ndjson")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None if ndjson else csv.writer(f)
+        if writer:
+            writer.writerow(["id", "name", "email"])
+        for i in range(count):
+            if i % 100 == 99:
+                email, bad = f"user{i}-at-example.com", bad + 1
+            elif i % 50 == 49:
+                email = f" USER{i - 1}@Example.COM "
+            else:
+                email, users = f"user{i}@example.com", users + 1
+            if ndjson:
+                f.write(json.dumps({"id": i, "name": f"user {i}", "email": email}) + "\n")
+            else:
+                writer.writerow([i, f"user {i}", email])
+    return users, bad
+
+
+def run(path, processes, keep_indexes):
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path)) as tmp:
+        db = os.path.join(tmp, "users.db")
+        conn = connect(db)
+        create_schema(conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS users_name ON users (name)")
+        conn.close()
+        stats = load(path, db, processes=processes, keep_indexes=keep_indexes)
+        conn = connect(db)
+        stats["count"] = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        stats["indexed"] = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'users_name'").fetchone()[0]
+        conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the users bulk loader.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--dir", help="where to put the files (default: a temp dir)")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        print(f"{args.rows:,} rows, {os.cpu_count()} cpus")
+        print(f"{'file':<8}{'processes':>10}{'indexes':>10}{'rows/s':>12}{'seconds':>9}"
+              f"{'index s':>9}")
+        for fmt in ("csv", "ndjson"):
+            path = os.path.join(tmp, f"users.{fmt}")
+            users, bad = generate(path, args.rows)
+            runs = [(p, False) for p in args.processes] + [(1, True)]
+            for processes, keep in runs:
+                stats = run(path, processes, keep)
+                ok = (stats["count"] == users and stats["rejected"] == bad
+                      and stats["read"] == args.rows and stats["indexed"] == 1)
+                failed |= not ok
+                print(f"{fmt:<8}{processes:>10}{'kept' if keep else 'rebuilt':>10}"
+                      f"{stats['rows_per_second']:>12,.0f}{stats['seconds']:>9.2f}"
+                      f"{stats['index_seconds']:>9.2f}"
+                      + ("" if ok else f"  got {stats['count']} users, {stats['rejected']} rejected"))
+
+    if failed:
+        sys.exit(f"expected {users} users and {bad} rejected rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Read throughput of users_pool.UsersPool as reader threads are added.
+
+    python bench_users_pool.py
+    python bench_users_pool.py --users 1000000 --lookups 50000 --threads 1 2 4 8 16
+
+For each thread count, every thread looks up users by email for --lookups
+queries, first through one shared connection behind a lock (the global `conn`
+approach), then through the pool. The pool runs a second time while the
+writer upserts in the background, and once more with statement caching off.
+First it checks that a failing write in a group commit leaves the others in
+place; the script exits non-zero if that or a lookup goes wrong.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from users_db import UPSERT, BatchedWriter, connect, create_schema
+from users_pool import UsersPool
+
+LOOKUP = "SELECT id, name, email FROM users WHERE email = ?"
+
+
+def populate(path, count):
+    conn = connect(path)
+    create_schema(conn)
+    with BatchedWriter(conn, batch_size=100_000) as writer:
+        writer.write_many((f"user {i}", f"user{i}@example.com") for i in range(count))
+    conn.close()
+
+
+def run_threads(threads, lookups, users, lookup):
+    def work(seed):
+        rng = random.Random(seed)
+        misses = 0
+        for _ in range(lookups):
+            i = rng.randrange(users)
+            row = lookup(f"user{i}@example.com")
+            misses += row is None or row[2] != f"user{i}@example.com"
+        return misses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        misses = sum(pool.map(work, range(threads)))
+    return threads * lookups / (time.perf_counter() - started), misses
+
+
+def check_group_commit(pool):
+    futures = [pool.write(UPSERT, (f"group {i}", f"group{i}@example.com")) for i in range(10)]
+    futures.insert(5, pool.write(UPSERT, (None, "broken@example.com")))   # NOT NULL fails
+    failed = [f for f in futures if f.exception(timeout=10) is not None]
+    with pool.reader() as conn:
+        stored = conn.execute(
+            "SELECT COUNT(*) FROM users WHERE email LIKE 'group%@example.com'").fetchone()[0]
+    return len(failed) == 1 and isinstance(failed[0].exception(), sqlite3.IntegrityError) \
+        and stored == 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the users connection pool.")
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=20_000, help="per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.db")
+        populate(path, args.users)
+        print(f"{args.users:,} users, {args.lookups:,} lookups per thread, {os.cpu_count()} cpus")
+
+        shared = connect(path, check_same_thread=False)
+        lock = threading.Lock()
+
+        def shared_lookup(email):
+            with lock:
+                return shared.execute(LOOKUP, (email,)).fetchone()
+
+        pool = UsersPool(path, readers=max(args.threads))
+        failed |= not check_group_commit(pool)
+
+        def pooled_lookup(email):
+            with pool.reader() as conn:
+                return conn.execute(LOOKUP, (email,)).fetchone()
+
+        uncached = UsersPool(path, readers=max(args.threads), cached_statements=0)
+
+        def uncached_lookup(email):
+            with uncached.reader() as conn:
+                return conn.execute(LOOKUP, (email,)).fetchone()
+
+        stop = threading.Event()
+
+        def keep_writing():
+            n = 0
+            while not stop.is_set():
+                rows = [(f"writer {n + i}", f"writer{n + i}@example.com") for i in range(500)]
+                pool.write_many(UPSERT, rows).result()
+                n += 500
+
+        print(f"{'threads':>8}{'shared conn':>14}{'pool':>12}{'pool+writes':>14}{'no stmt cache':>15}")
+        for threads in args.threads:
+            row = []
+            for lookup, writing in [(shared_lookup, False), (pooled_lookup, False),
+                                    (pooled_lookup, True), (uncached_lookup, False)]:
+                writer = threading.Thread(target=keep_writing) if writing else None
+                if writer:
+                    stop.clear()
+                    writer.start()
+                rate, misses = run_threads(threads, args.lookups, args.users, lookup)
+                if writer:
+                    stop.set()
+                    writer.join()
+                failed |= misses > 0
+                row.append(rate)
+            print(f"{threads:>8}" + "".join(f"{r:>{w},.0f}" for r, w in zip(row, (14, 12, 14, 15))))
+        print(f"writer: {pool.stats}")
+        pool.close()
+        uncached.close()
+        shared.close()
+
+    if failed:
+        sys.exit("a lookup or the group commit check failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+# Find the queries that scan a whole table, and the index that fixes them
+
+database_sqlite3_explanation.py looks users up with `WHERE name = ?`, but
+only `email` is indexed (by UNIQUE), so every one of those SELECTs, UPDATEs
+and DELETEs reads the entire table. The advisor watches a connection, asks
+SQLite how it ran each statement, and suggests an index where it had to scan:
+
+    advisor = IndexAdvisor(conn)
+    advisor.start()                  # record every statement conn executes
+    ... run the application's queries ...
+    advisor.stop()
+    advices = advisor.advise()       # EXPLAIN QUERY PLAN each recorded query
+    print(advisor.report(advisor.measure(advices)))              # before/after ms
+    advisor.measure(advices, apply=True)                         # and keep the indexes
+    advisor.write_migration(advices)                             # or save them as a migration
+
+A query is flagged when its plan has a plain `SCAN <table>` step. The index
+is built from the columns its WHERE compares: `=`/`IN`/`IS` columns first,
+then one range (`<`, `>`, `BETWEEN`, `LIKE`) column, the order SQLite can use
+them in. This is a rule of thumb, not SQLite's planner: measure() times each
+query with the index in place and reports what it actually gained.
+"""
+import re
+import sqlite3
+import time
+from collections import Counter, namedtuple
+
+from users_migrate import MIGRATIONS_DIR, next_migration_path
+
+Advice = namedtuple("Advice", "query table columns plan index_sql")
+Timing = namedtuple("Timing", "advice before_ms after_ms plan_after")
+
+SCAN = re.compile(r"SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$")
+CLAUSE_END = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|RETURNING|WINDOW)\b", re.I)
+EQUALITY = re.compile(r"(?:\b(\w+)\.)?\b(\w+)\s*(?:==?|\bIN\b|\bIS\b(?!\s+NOT))", re.I)
+RANGE = re.compile(r"(?:\b(\w+)\.)?\b(\w+)\s*(?:<=?|>=?|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)", re.I)
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def shape(sql):
+    """The statement with its literal values replaced by ?, to group repeats."""
+    return " ".join(LITERAL.sub("?", sql).split())
+
+
+class IndexAdvisor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.queries = Counter()        # shape -> times executed
+        self.examples = {}              # shape -> one statement as executed
+
+    def record(self, sql):
+        if sql.lstrip()[:6].upper() not in ("SELECT", "UPDATE", "DELETE"):
+            return
+        key = shape(sql)
+        self.queries[key] += 1
+        self.examples.setdefault(key, sql)
+
+    def start(self):
+        # the trace callback gets every statement with its parameters filled in
+        self.conn.set_trace_callback(self.record)
+
+    def stop(self):
+        self.conn.set_trace_callback(None)
+
+    def execute(self, sql):
+        try:
+            return self.conn.execute(sql)
+        except sqlite3.ProgrammingError:
+            # before Python 3.11 the trace callback sees ? placeholders, not
+            # values; with NULLs bound the plan is the same
+            return self.conn.execute(sql, [None] * sql.count("?"))
+
+    def plan(self, sql):
+        return [row[3] for row in self.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+    def columns(self, table):
+        return {row[1].lower() for row in self.conn.execute(f'PRAGMA table_info("{table}")')}
+
+    def index_columns(self, sql, table, alias):
+        where = re.split(r"\bWHERE\b", sql, maxsplit=1, flags=re.I)
+        if len(where) < 2:
+            return []
+        where = CLAUSE_END.split(where[1])[0]
+        known = self.columns(table)
+        names = {table.lower(), (alias or table).lower()}
+
+        def wanted(matches):
+            return [column.lower() for qualifier, column in matches
+                    if column.lower() in known and (not qualifier or qualifier.lower() in names)]
+
+        chosen = []
+        for column in wanted(EQUALITY.findall(where)):
+            if column not in chosen:
+                chosen.append(column)
+        for column in wanted(RANGE.findall(where)):
+            if column not in chosen:
+                chosen.append(column)
+                break
+        return chosen
+
+    def advise(self):
+        """One Advice per recorded query whose plan scans a table it filters on."""
+        self.stop()
+        advices = []
+        for key, _ in self.queries.most_common():
+            sql = self.examples[key]
+            plan = self.plan(sql)
+            for step in plan:
+                match = SCAN.fullmatch(step)
+                if not match:
+                    continue
+                table, alias = match[1], match[2]
+                columns = self.index_columns(sql, table, alias)
+                if columns:
+                    name = f"idx_{table}_{'_'.join(columns)}"
+                    index_sql = (f"CREATE INDEX IF NOT EXISTS {name} "
+                                 f"ON {table} ({', '.join(columns)})")
+                    advices.append(Advice(key, table, tuple(columns), plan, index_sql))
+        return advices
+
+    def time_query(self, sql, repeat):
+        # UPDATE and DELETE run inside a savepoint that is rolled back, so
+        # timing them doesn't change the data
+        self.conn.execute("SAVEPOINT advisor_timing")
+        try:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                self.execute(sql).fetchall()
+            return (time.perf_counter() - started) / repeat * 1000
+        finally:
+            self.conn.execute("ROLLBACK TO advisor_timing")
+            self.conn.execute("RELEASE advisor_timing")
+
+    def measure(self, advices=None, repeat=20, apply=False):
+        """Time each advised query without and with the indexes; keep them if apply."""
+        self.stop()
+        if self.conn.in_transaction:
+            raise RuntimeError("commit or roll back before measuring")
+        advices = self.advise() if advices is None else advices
+        # all the "before" timings first: queries on the same column share an index
+        before = [self.time_query(self.examples[advice.query], repeat) for advice in advices]
+        self.conn.execute("SAVEPOINT advisor_index")
+        for index_sql in dict.fromkeys(advice.index_sql for advice in advices):
+            self.conn.execute(index_sql)
+        timings = []
+        for advice, before_ms in zip(advices, before):
+            sql = self.examples[advice.query]
+            timings.append(Timing(advice, before_ms, self.time_query(sql, repeat), self.plan(sql)))
+        if not apply:
+            self.conn.execute("ROLLBACK TO advisor_index")
+        self.conn.execute("RELEASE advisor_index")
+        return timings
+
+    def report(self, timings):
+        lines = []
+        for t in timings:
+            lines.append(f"{t.advice.query}  ({self.queries[t.advice.query]}x)")
+            lines.append(f"    plan:   {' / '.join(t.advice.plan)}")
+            lines.append(f"    index:  {t.advice.index_sql}")
+            lines.append(f"    after:  {' / '.join(t.plan_after)}")
+            lines.append(f"    {t.before_ms:.3f} ms -> {t.after_ms:.3f} ms per query "
+                         f"({t.before_ms / max(t.after_ms, 1e-9):,.0f}x)")
+        return "\n".join(lines) or "no full-table scans with a usable WHERE"
+
+    def write_migration(self, advices, description="advisor_indexes", directory=MIGRATIONS_DIR):
+        """Save the distinct CREATE INDEX statements as the next numbered migration."""
+        statements = list(dict.fromkeys(advice.index_sql for advice in advices))
+        if not statements:
+            return None
+        path = next_migration_path(description, directory)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("-- from index_advisor.py\n")
+            for sql in statements:
+                f.write(sql + ";\n")
+        return path
+
@@ -0,0 +1,136 @@
+"""
+# Reading files too big for read() and readlines()
+
+file_handling_explanation.py reads example.txt three ways: read() and
+readlines() load the whole file into memory, and `for line in file` decodes
+and allocates a str per line. For multi-GB logs there are faster ways:
+
+    for chunk in iter_chunks("app.log", buffer_size=1 << 20):   # raw bytes, fixed memory
+    for block in iter_line_blocks("app.log"):                    # whole lines, ~64 KiB at a time
+    for line in iter_mmap_lines("app.log"):                      # memoryview per line, no copies
+
+    ranges = split_ranges("app.log", parts=8)                    # [(start, end)] on line breaks
+    counts = map_ranges("app.log", count_lines, processes=8)     # one process per range
+
+- iter_chunks: readinto() one reusable buffer. With reuse=True each chunk
+  is a memoryview of that buffer, only valid until the next one is read.
+- iter_line_blocks: chunks cut after the last newline, with the tail carried
+  into the next block, so every block holds whole lines. Working on a block
+  with bytes methods (count, find, split) is where the speed is.
+- iter_mmap_lines: the OS pages the file in as it's touched; each line is a
+  slice of the mapping, so nothing is copied until you call bytes() on it.
+  Each view is released when the next line is requested; copy it with
+  bytes(line) to keep it.
+- split_ranges / map_ranges: cut one file into byte ranges that start and
+  end on line boundaries, and run fn(path, start, end) on each in a process
+  pool. Every worker opens the file itself; only the results are pickled.
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 64 KiB: enough to make the read() calls cheap, and small enough that a block
+# stays in the CPU cache while count() and find() scan it (1 MiB blocks were
+# ~20% slower in bench_large_files.py)
+DEFAULT_BUFFER = 1 << 16
+
+
+def iter_chunks(path, buffer_size=DEFAULT_BUFFER, reuse=False, start=0, end=None):
+    """Yield the bytes of path[start:end] in chunks of at most buffer_size."""
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        f.seek(start)
+        remaining = (end if end is not None else os.fstat(f.fileno()).st_size) - start
+        while remaining > 0:
+            n = f.readinto(view[:min(buffer_size, remaining)])
+            if not n:
+                return
+            remaining -= n
+            yield view[:n] if reuse else bytes(view[:n])
+
+
+def iter_line_blocks(path, buffer_size=DEFAULT_BUFFER, start=0, end=None):
+    """Yield bytes blocks of whole lines, about buffer_size each."""
+    # pieces of the unfinished line, joined once it ends: `tail += chunk`
+    # would copy the whole tail per chunk, quadratic on a very long line
+    tail = []
+    for chunk in iter_chunks(path, buffer_size, start=start, end=end):
+        cut = chunk.rfind(b"\n") + 1
+        if cut:
+            tail.append(chunk[:cut])
+            yield b"".join(tail)
+            tail = [chunk[cut:]]
+        else:
+            tail.append(chunk)
+    if any(tail):
+        yield b"".join(tail)
+
+
+def iter_mmap_lines(path, start=0, end=None):
+    """Yield each line of path[start:end] (newline included) as a memoryview."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return              # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm) if end is None else end
+            data = memoryview(mm)
+            line = None
+            try:
+                find = mm.find
+                pos = start
+                while pos < end:
+                    stop = find(b"\n", pos, end) + 1 or end
+                    # release() by hand rather than `with`: it's per line, and
+                    # the mapping can't close while any view of it is alive
+                    line = data[pos:stop]
+                    yield line
+                    line.release()
+                    pos = stop
+            finally:
+                if line is not None:
+                    line.release()
+                data.release()
+
+
+def split_ranges(path, parts):
+    """Cut the file into up to `parts` (start, end) byte ranges on line boundaries."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = max(size * i // parts, bounds[-1])
+            if target >= size:
+                break
+            f.seek(target)
+            f.readline()            # move to the start of the next line
+            if f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+    if bounds[-1] != size:
+        bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def map_ranges(path, fn, processes=None, parts=None):
+    """Run fn(path, start, end) over split_ranges(path) in a process pool; results in file order."""
+    processes = processes or os.cpu_count()
+    ranges = split_ranges(path, parts or processes)
+    if processes <= 1:
+        return [fn(path, start, end) for start, end in ranges]
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(fn, path, start, end) for start, end in ranges]
+        return [future.result() for future in futures]
+
+
+def count_lines(path, start=0, end=None, needle=None, buffer_size=DEFAULT_BUFFER):
+    """(lines, lines containing needle) in path[start:end]; usable with map_ranges."""
+    lines = matches = 0
+    for block in iter_line_blocks(path, buffer_size, start, end):
+        lines += block.count(b"\n") + (not block.endswith(b"\n"))
+        pos = block.find(needle) if needle else -1
+        while pos != -1:
+            # count the line once, however often the needle is on it
+            matches += 1
+            pos = block.find(b"\n", pos) + 1
+            pos = block.find(needle, pos) if pos else -1
+    return lines, matches
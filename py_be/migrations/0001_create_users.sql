@@ -0,0 +1,6 @@
+-- the users table from db_test.py / database_sqlite3_explanation.py
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE
+);
@@ -0,0 +1,3 @@
+-- from index_advisor.py: SELECT/UPDATE/DELETE ... WHERE name = ? scanned the
+-- whole table (see database_sqlite3_explanation.py, steps 4-6)
+CREATE INDEX IF NOT EXISTS idx_users_name ON users (name);
@@ -0,0 +1,136 @@
+"""
+# Reusable SQLite access for the `users` table
+
+db_test.py and database_sqlite3_explanation.py show the basics: connect,
+create `users`, insert with execute/executemany and commit after each step.
+That is fine for three rows. For ingestion jobs that write millions, this
+module packages the same table with the settings that make SQLite fast:
+
+    from users_db import connect, create_schema, BatchedWriter
+
+    conn = connect("users.db")
+    create_schema(conn)
+    with BatchedWriter(conn, batch_size=50_000) as writer:
+        for name, email in rows:
+            writer.write((name, email))     # upserts on the unique email
+
+- connect(): WAL journal, synchronous=NORMAL, a bigger page cache, memory
+  temp store and a busy timeout, so readers don't block the writer and a
+  commit doesn't wait for a full fsync of the database file.
+- BatchedWriter: groups rows into one transaction per batch_size rows, or
+  per max_delay seconds when rows trickle in. A commit costs about the same
+  for 1 row as for 50,000, so this is where the speed comes from.
+- UPSERT: INSERT ... ON CONFLICT(email) DO UPDATE, so loading the same user
+  twice updates their name instead of failing on the UNIQUE constraint.
+"""
+import sqlite3
+import time
+from itertools import islice
+
+DB_FILE = "example.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE
+);
+"""
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    # with WAL, NORMAL only fsyncs at checkpoints; a crash can lose the last
+    # commits but never corrupts the database
+    "synchronous": "NORMAL",
+    "cache_size": -64_000,          # negative means KiB: 64 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5_000,          # ms to wait for a lock before "database is locked"
+    "foreign_keys": "ON",
+}
+
+INSERT = "INSERT INTO users (name, email) VALUES (?, ?)"
+# the WHERE skips rewriting rows whose name didn't change
+UPSERT = (
+    "INSERT INTO users (name, email) VALUES (?, ?) "
+    "ON CONFLICT(email) DO UPDATE SET name = excluded.name "
+    "WHERE users.name IS NOT excluded.name"
+)
+
+
+def connect(path=DB_FILE, pragmas=None, **kwargs):
+    """Open a connection with PRAGMAS applied (pragmas= overrides single entries)."""
+    conn = sqlite3.connect(path, **kwargs)
+    for name, value in {**PRAGMAS, **(pragmas or {})}.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def create_schema(conn):
+    conn.executescript(SCHEMA)
+
+
+def upsert_users(conn, rows):
+    """Upsert (name, email) rows in a single transaction."""
+    with conn:
+        conn.executemany(UPSERT, rows)
+
+
+class BatchedWriter:
+    """
+    Buffers rows and writes them with executemany, one transaction per batch.
+
+    A batch is flushed when it reaches batch_size rows, or on the next write
+    once the oldest buffered row has waited max_delay seconds. Call flush()
+    (or close the writer) to write whatever is left.
+    """
+
+    def __init__(self, conn, sql=UPSERT, batch_size=10_000, max_delay=1.0):
+        self.conn = conn
+        self.sql = sql
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.buffer = []
+        self.first_at = None
+        self.rows = 0
+        self.batches = 0
+
+    def write(self, row):
+        if not self.buffer:
+            self.first_at = time.monotonic()
+        self.buffer.append(row)
+        if (len(self.buffer) >= self.batch_size
+                or time.monotonic() - self.first_at >= self.max_delay):
+            self.flush()
+
+    def write_many(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.batch_size - len(self.buffer)))
+            if not chunk:
+                return
+            if not self.buffer:
+                self.first_at = time.monotonic()
+            self.buffer.extend(chunk)
+            if (len(self.buffer) >= self.batch_size
+                    or time.monotonic() - self.first_at >= self.max_delay):
+                self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with self.conn:
+            self.conn.executemany(self.sql, self.buffer)
+        self.rows += len(self.buffer)
+        self.batches += 1
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # on an error, keep what was already committed and drop the partial batch
+        if exc_type is None:
+            self.flush()
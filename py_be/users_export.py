@@ -0,0 +1,149 @@
+"""
+# Streaming reads and columnar export for the users table
+
+Step 4 of database_sqlite3_explanation.py calls `cursor.fetchall()`, which
+builds every row of `SELECT * FROM users` as a Python tuple before the first
+one is used. For a table of millions of rows that is gigabytes. Everything
+here reads `arraysize` rows at a time with fetchmany instead, so memory stays
+flat however big the table is:
+
+    for user in iter_rows(conn, "SELECT * FROM users"):          # plain tuples
+    for user in iter_rows(conn, sql, row_factory="row"):         # user["email"]
+    for batch in iter_batches(conn, sql, arraysize=50_000):      # lists of tuples
+
+    export_csv(conn, "SELECT * FROM users", "users.csv")
+    export_parquet(conn, "SELECT * FROM users", "users.parquet")   # needs pyarrow
+    columns = to_numpy(conn, "SELECT id FROM users")               # needs numpy
+
+Row factories, cheapest first:
+- "tuple" (the default): what SQLite hands back, no extra object per row
+- "row": sqlite3.Row, written in C; access by name or index without a dict
+- "namedtuple": one class per query, built once from cursor.description
+Building a dict per row (the usual `dict(zip(names, row))`) is what they avoid.
+"""
+import csv
+import sqlite3
+from collections import namedtuple
+from functools import lru_cache
+
+DEFAULT_ARRAYSIZE = 10_000
+
+
+@lru_cache(maxsize=64)
+def _row_class(names):
+    return namedtuple("Record", names, rename=True)
+
+
+def namedtuple_factory(cursor, row):
+    names = tuple(column[0] for column in cursor.description)
+    return _row_class(names)._make(row)
+
+
+ROW_FACTORIES = {"tuple": None, "row": sqlite3.Row, "namedtuple": namedtuple_factory}
+
+
+def _cursor(conn, sql, params, arraysize, row_factory):
+    cursor = conn.cursor()
+    cursor.row_factory = ROW_FACTORIES.get(row_factory, row_factory)
+    cursor.arraysize = arraysize
+    cursor.execute(sql, params)
+    return cursor
+
+
+def iter_batches(conn, sql, params=(), arraysize=DEFAULT_ARRAYSIZE, row_factory="tuple"):
+    """Yield lists of up to `arraysize` rows."""
+    cursor = _cursor(conn, sql, params, arraysize, row_factory)
+    try:
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def iter_rows(conn, sql, params=(), arraysize=DEFAULT_ARRAYSIZE, row_factory="tuple"):
+    for rows in iter_batches(conn, sql, params, arraysize, row_factory):
+        yield from rows
+
+
+def column_names(conn, sql, params=()):
+    cursor = conn.execute(f"SELECT * FROM ({sql}) LIMIT 0", params)
+    return [column[0] for column in cursor.description]
+
+
+def export_csv(conn, sql, path, params=(), arraysize=DEFAULT_ARRAYSIZE):
+    """Write the query to a CSV file with a header row; returns the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(column_names(conn, sql, params))
+        for rows in iter_batches(conn, sql, params, arraysize):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def iter_numpy(conn, sql, params=(), arraysize=DEFAULT_ARRAYSIZE):
+    """Yield {column: numpy array} per batch: int64/float64 columns, object for the rest."""
+    import numpy as np
+
+    names = column_names(conn, sql, params)
+    for rows in iter_batches(conn, sql, params, arraysize):
+        columns = {}
+        for name, values in zip(names, zip(*rows)):
+            kinds = set(map(type, values))
+            if kinds == {int}:
+                columns[name] = np.fromiter(values, dtype=np.int64, count=len(values))
+            elif kinds <= {int, float}:
+                columns[name] = np.fromiter(values, dtype=np.float64, count=len(values))
+            else:
+                columns[name] = np.array(values, dtype=object)
+        yield columns
+
+
+def to_numpy(conn, sql, params=(), arraysize=DEFAULT_ARRAYSIZE):
+    """The whole result as {column: numpy array}. Holds the result, but never as tuples."""
+    import numpy as np
+
+    parts = {}
+    for columns in iter_numpy(conn, sql, params, arraysize):
+        for name, array in columns.items():
+            parts.setdefault(name, []).append(array)
+    if not parts:
+        return {name: np.array([]) for name in column_names(conn, sql, params)}
+    return {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+
+def iter_record_batches(conn, sql, params=(), arraysize=DEFAULT_ARRAYSIZE):
+    """Yield pyarrow RecordBatches of up to `arraysize` rows."""
+    import pyarrow as pa
+
+    names = column_names(conn, sql, params)
+    types = None
+    for rows in iter_batches(conn, sql, params, arraysize):
+        # later batches reuse the first batch's types, so a batch that happens
+        # to be all NULL in some column still matches the schema
+        arrays = [pa.array(values, type=types[i] if types else None)
+                  for i, values in enumerate(zip(*rows))]
+        types = types or [array.type for array in arrays]
+        yield pa.RecordBatch.from_arrays(arrays, names)
+
+
+def export_parquet(conn, sql, path, params=(), arraysize=DEFAULT_ARRAYSIZE):
+    """Write the query to Parquet, one row group per batch; returns the row count."""
+    import pyarrow.parquet as pq
+
+    count = 0
+    writer = None
+    try:
+        for batch in iter_record_batches(conn, sql, params, arraysize):
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema)
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
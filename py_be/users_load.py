@@ -0,0 +1,277 @@
+"""
+# Bulk-load users from CSV or NDJSON
+
+    python users_load.py users.csv --db users.db
+    python users_load.py users.ndjson --db users.db --processes 4 --rejects bad.ndjson
+
+db_test.py inserts three hand-written tuples. This loads files of millions:
+
+- The file is read in binary blocks of --block-size bytes, cut at the last
+  newline that ends a record, and each block is parsed into (name, email)
+  rows. For CSV the cut skips newlines inside quoted fields, so multi-line
+  values load the same way with or without --processes, which parses blocks
+  in a process pool while the main process writes.
+- Emails are stripped and lowercased, and rows with a missing name or an
+  address that doesn't look like local@domain.tld are rejected (counted, and
+  written to --rejects if given) instead of failing the load.
+- Rows go in with executemany, --batch-size rows per transaction, with
+  synchronous=OFF for the load. The users indexes are dropped first and
+  recreated at the end, so each row updates one b-tree instead of all of them.
+  They are recreated even when the load fails.
+  (The UNIQUE(email) index is part of the table and can't be dropped; it's
+  what --on-conflict acts on.)
+
+CSV needs a header row with `name` and `email` columns (any order, other
+columns ignored); NDJSON needs "name" and "email" keys.
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+
+from users_db import DB_FILE, UPSERT, connect, create_schema
+
+EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s.]+")
+
+STATEMENTS = {
+    "update": UPSERT,
+    "ignore": "INSERT INTO users (name, email) VALUES (?, ?) ON CONFLICT(email) DO NOTHING",
+    "fail": "INSERT INTO users (name, email) VALUES (?, ?)",
+}
+
+
+def normalize_email(email):
+    """The lowercased address, or None if it isn't a plausible email."""
+    if not email:
+        return None
+    email = email.strip().lower()
+    return email if EMAIL.fullmatch(email) else None
+
+
+def clean(name, email):
+    name = name.strip() if isinstance(name, str) else None
+    email = normalize_email(email) if isinstance(email, str) else None
+    return (name, email) if name and email else None
+
+
+def parse_csv(block, name_col, email_col):
+    """Parse a block of CSV records into (rows, rejected records as CSV text)."""
+    rows, rejected = [], []
+    text = block.decode("utf-8", errors="replace")
+    width = max(name_col, email_col)
+    # clean() inlined: this loop runs once per row and the call adds ~15%
+    match = EMAIL.fullmatch
+    for record in csv.reader(io.StringIO(text, newline="")):
+        if len(record) > width:
+            name = record[name_col].strip()
+            email = record[email_col].strip().lower()
+            if name and match(email):
+                rows.append((name, email))
+                continue
+        if any(field.strip() for field in record):
+            out = io.StringIO()
+            csv.writer(out, lineterminator="").writerow(record)
+            rejected.append(out.getvalue())
+    return rows, rejected
+
+
+def parse_ndjson(block):
+    rows, rejected = [], []
+    for line in block.decode("utf-8", errors="replace").splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            row = clean(record.get("name"), record.get("email"))
+        except (ValueError, AttributeError):
+            row = None
+        if row:
+            rows.append(row)
+        else:
+            rejected.append(line)
+    return rows, rejected
+
+
+def record_end(data, quoted):
+    """Offset just after the last newline in data that ends a record (0 if none)."""
+    cut = data.rfind(b"\n") + 1
+    if quoted:
+        # blocks always start outside quotes, so a newline is a record end when
+        # an even number of '"' come before it ("" escapes count as two)
+        quotes = data.count(b'"', 0, cut)
+        while cut and quotes % 2:
+            previous = data.rfind(b"\n", 0, cut - 1) + 1
+            quotes -= data.count(b'"', previous, cut)
+            cut = previous
+    return cut
+
+
+def read_blocks(f, block_size, quoted=False):
+    """Yield blocks of whole records, each about block_size bytes.
+
+    quoted: newlines inside "..." don't end a record (CSV).
+    """
+    tail = b""
+    while True:
+        data = f.read(block_size)
+        if not data:
+            if tail:
+                yield tail
+            return
+        data = tail + data
+        cut = record_end(data, quoted)
+        if cut:
+            tail = data[cut:]
+            yield data[:cut]
+        else:
+            tail = data
+
+
+def open_source(path, fmt=None):
+    """Open the file and pick its parser: returns (binary file, parse(block), quoted)."""
+    fmt = fmt or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+    f = open(path, "rb")
+    if fmt == "ndjson":
+        return f, parse_ndjson, False
+    header = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+    columns = [column.strip().lower() for column in header]
+    if "name" not in columns or "email" not in columns:
+        f.close()
+        raise ValueError(f"{path}: the CSV header needs name and email columns, got {header}")
+    parse = partial(parse_csv, name_col=columns.index("name"), email_col=columns.index("email"))
+    return f, parse, True
+
+
+def parsed_blocks(f, parse, block_size, processes, quoted=False):
+    blocks = read_blocks(f, block_size, quoted)
+    if processes <= 1:
+        yield from map(parse, blocks)
+        return
+    # spawn: forking a process that holds an open sqlite connection isn't safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        # map() submits every block up front; keep only a few in flight instead
+        pending = []
+        for block in blocks:
+            pending.append(pool.submit(parse, block))
+            if len(pending) >= processes * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def index_statements(conn, table="users"):
+    """{name: CREATE INDEX IF NOT EXISTS ...} for the table's own indexes."""
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+        "AND sql IS NOT NULL", (table,)).fetchall()
+    # sqlite_master keeps the statement without IF NOT EXISTS
+    return {name: re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX IF NOT EXISTS ", sql,
+                          flags=re.I)
+            for name, sql in indexes}
+
+
+def drop_indexes(conn, indexes):
+    for name in indexes:
+        conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+    conn.commit()
+
+
+def rebuild_indexes(conn, indexes):
+    with conn:
+        for sql in indexes.values():
+            conn.execute(sql)
+
+
+def load(path, db=DB_FILE, fmt=None, on_conflict="update", batch_size=200_000,
+         block_size=1 << 20, processes=1, rejects=None, keep_indexes=False):
+    """Load one file into users; returns a dict of counts and timings."""
+    stats = {"read": 0, "loaded": 0, "rejected": 0, "batches": 0}
+    started = time.perf_counter()
+    with ExitStack() as files:
+        # whatever got opened is closed again, even if a later open or connect() fails
+        f, parse, quoted = open_source(path, fmt)
+        files.enter_context(f)
+        reject_file = files.enter_context(open(rejects, "a", encoding="utf-8")) if rejects else None
+        conn = connect(db, pragmas={"synchronous": "OFF"})
+        files.callback(conn.close)
+        indexes = {}
+        try:
+            create_schema(conn)
+            if not keep_indexes:
+                # remembered before dropping, so the finally below can put back
+                # whatever was dropped even if the drop or the load fails
+                indexes = index_statements(conn)
+                drop_indexes(conn, indexes)
+            sql = STATEMENTS[on_conflict]
+            batch = []
+            for rows, rejected in parsed_blocks(f, parse, block_size, processes, quoted):
+                stats["read"] += len(rows) + len(rejected)
+                stats["rejected"] += len(rejected)
+                if reject_file and rejected:
+                    reject_file.write("\n".join(rejected) + "\n")
+                batch.extend(rows)
+                if len(batch) >= batch_size:
+                    stats["loaded"] += write_batch(conn, sql, batch)
+                    stats["batches"] += 1
+                    batch = []
+            if batch:
+                stats["loaded"] += write_batch(conn, sql, batch)
+                stats["batches"] += 1
+            stats["load_seconds"] = time.perf_counter() - started
+        finally:
+            index_started = time.perf_counter()
+            if conn.in_transaction:
+                conn.rollback()
+            rebuild_indexes(conn, indexes)
+            stats["index_seconds"] = time.perf_counter() - index_started
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def write_batch(conn, sql, rows):
+    before = conn.total_changes
+    with conn:
+        conn.executemany(sql, rows)
+    return conn.total_changes - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load users from CSV or NDJSON.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--format", choices=["csv", "ndjson"],
+                        help="default: ndjson for .ndjson/.jsonl files, csv otherwise")
+    parser.add_argument("--on-conflict", choices=sorted(STATEMENTS), default="update",
+                        help="when the email already exists: update the name, skip, or fail")
+    parser.add_argument("--batch-size", type=int, default=200_000, help="rows per transaction")
+    parser.add_argument("--block-size", type=int, default=1 << 20, help="bytes parsed at a time")
+    parser.add_argument("--processes", type=int, default=1, help="parse in this many processes")
+    parser.add_argument("--rejects", help="write rejected lines to this file")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="don't drop and rebuild the users indexes")
+    args = parser.parse_args()
+
+    for path in args.files:
+        try:
+            stats = load(path, args.db, args.format, args.on_conflict, args.batch_size,
+                         args.block_size, args.processes, args.rejects, args.keep_indexes)
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            sys.exit(f"error: {exc}")
+        print(f"{os.path.basename(path)}: {stats['read']:,} rows read, {stats['loaded']:,} "
+              f"written, {stats['rejected']:,} rejected in {stats['seconds']:.2f}s "
+              f"({stats['rows_per_second']:,.0f} rows/s; indexes {stats['index_seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+# Versioned schema migrations for the sqlite helpers
+
+db_test.py creates `users` with CREATE TABLE IF NOT EXISTS, which can create
+a table but never change one. Here the schema lives in numbered SQL files:
+
+    migrations/0001_create_users.sql
+    migrations/0002_index_users_name.sql
+
+and the database remembers how far it got in PRAGMA user_version:
+
+    python users_migrate.py --db users.db             # apply everything new
+    python users_migrate.py --db users.db --target 1  # only up to 0001
+    python users_migrate.py --db users.db --status
+
+Each file runs in its own transaction together with the user_version bump,
+so a failing migration leaves the database at the previous version. Files
+are only ever added: to change the schema, write the next number.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from users_db import DB_FILE, connect
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+FILENAME = re.compile(r"(\d+)_(\w+)\.sql")
+
+
+def migrations(directory=MIGRATIONS_DIR):
+    """[(version, name, path)] sorted by version; versions must run 1, 2, 3, ..."""
+    found = []
+    for filename in os.listdir(directory):
+        match = FILENAME.fullmatch(filename)
+        if match:
+            found.append((int(match[1]), match[2], os.path.join(directory, filename)))
+    found.sort()
+    for expected, (version, name, _) in enumerate(found, 1):
+        if version != expected:
+            raise ValueError(f"{directory}: expected migration {expected:04d}, "
+                             f"found {version:04d}_{name}.sql")
+    return found
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, directory=MIGRATIONS_DIR, target=None):
+    """Apply the migrations after the current version, up to target; returns their names."""
+    pending = [m for m in migrations(directory) if m[0] > current_version(conn)]
+    applied = []
+    for version, name, path in pending:
+        if target is not None and version > target:
+            break
+        with open(path, encoding="utf-8") as f:
+            script = f.read()
+        try:
+            # executescript commits whatever is open first, then runs as written
+            conn.executescript(f"BEGIN;\n{script}\n;PRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise sqlite3.OperationalError(f"migration {version:04d}_{name} failed: {exc}") from exc
+        applied.append(f"{version:04d}_{name}")
+    return applied
+
+
+def next_migration_path(description, directory=MIGRATIONS_DIR):
+    version = len(migrations(directory)) + 1
+    return os.path.join(directory, f"{version:04d}_{description}.sql")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the numbered schema migrations.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--dir", default=MIGRATIONS_DIR)
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--status", action="store_true", help="show versions and exit")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        version = current_version(conn)
+        if args.status:
+            for number, name, _ in migrations(args.dir):
+                print(f"{'applied' if number <= version else 'pending':<8} {number:04d}_{name}")
+            return
+        for name in migrate(conn, args.dir, args.target):
+            print(f"applied {name}")
+        print(f"{args.db} is at version {current_version(conn)}")
+    except (ValueError, sqlite3.Error) as exc:
+        sys.exit(f"error: {exc}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+# A thread-safe connection pool for the users database
+
+database_sqlite3_explanation.py keeps one global `conn` and `cursor`. A
+sqlite3 connection can't be shared by threads (by default it refuses, and
+with check_same_thread=False two threads would interleave statements on it).
+This pool gives every thread what SQLite is good at:
+
+    pool = UsersPool("users.db", readers=8)
+
+    with pool.reader() as conn:                  # any number of readers at once
+        conn.execute("SELECT name FROM users WHERE email = ?", (email,)).fetchone()
+
+    pool.write(UPSERT, ("Alice", "alice@example.com")).result()
+    pool.write_many(UPSERT, rows)                 # returns a Future
+    pool.submit(lambda conn: ...)                 # any function, on the writer
+
+- Readers: `readers` read-only connections (PRAGMA query_only) handed out
+  from a queue. With WAL, they read a consistent snapshot while the writer
+  writes, and the sqlite3 module releases the GIL while a query runs.
+- Writer: SQLite allows one writer at a time, so all writes go through one
+  thread with its own connection. It takes whatever writes are queued (up to
+  group_size) and commits them as one transaction, each in its own SAVEPOINT
+  so a failing write doesn't undo the others. If the transaction itself
+  fails, every write in the group fails with that error and the writer
+  carries on with the next group.
+- Statement cache: every connection keeps the last `cached_statements`
+  compiled statements, so reusing the same SQL text skips re-preparing it.
+  Keep the SQL constant and pass values as parameters.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+from users_db import connect, create_schema
+
+
+class _Checkout:
+    # a plain class rather than @contextmanager: this runs once per query, and
+    # a generator-based context manager costs a few microseconds more
+    __slots__ = ("pool", "conn")
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __enter__(self):
+        try:
+            self.conn = self.pool.idle.get(timeout=self.pool.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"no reader connection free after {self.pool.timeout}s") from None
+        return self.conn
+
+    def __exit__(self, *exc):
+        if self.conn.in_transaction:
+            self.conn.rollback()
+        self.pool.idle.put(self.conn)
+
+
+class UsersPool:
+    def __init__(self, path, readers=4, group_size=256, cached_statements=256, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self.group_size = group_size
+        self.cached_statements = cached_statements
+        self.jobs = queue.Queue()
+        self.stats = {"writes": 0, "commits": 0, "failed_writes": 0}
+        # the writer creates the schema before any reader opens the file
+        ready = Future()
+        self.writer = threading.Thread(target=self._write_loop, args=(ready,),
+                                       name="users-writer", daemon=True)
+        self.writer.start()
+        ready.result()
+        # SimpleQueue: a C implementation, far cheaper per checkout than Queue
+        self.idle = queue.SimpleQueue()
+        for _ in range(readers):
+            conn = connect(path, check_same_thread=False, cached_statements=cached_statements)
+            conn.execute("PRAGMA query_only = ON")
+            self.idle.put(conn)
+        self.readers = readers
+
+    def reader(self):
+        """`with pool.reader() as conn:` checks out a read-only connection."""
+        return _Checkout(self)
+
+    def submit(self, fn):
+        """Run fn(conn) on the writer thread, inside a transaction. Returns a Future."""
+        future = Future()
+        self.jobs.put((fn, future))
+        return future
+
+    def write(self, sql, params=()):
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def write_many(self, sql, rows):
+        rows = list(rows)
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def _write_loop(self, ready):
+        try:
+            # autocommit mode: the loop issues BEGIN / COMMIT itself
+            conn = connect(self.path, isolation_level=None,
+                           cached_statements=self.cached_statements)
+            create_schema(conn)
+        except Exception as exc:
+            ready.set_exception(exc)
+            return
+        ready.set_result(None)
+        stopping = False
+        while not stopping:
+            group = [self.jobs.get()]
+            while len(group) < self.group_size:
+                try:
+                    group.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if None in group:
+                stopping = True
+                group = [job for job in group if job is not None]
+            if group:
+                try:
+                    self._commit_group(conn, group)
+                except Exception as exc:
+                    # a bug here must not kill the writer and leave callers waiting
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(exc)
+        conn.close()
+
+    def _commit_group(self, conn, group):
+        # a Future the caller cancelled is dropped; the rest can't be cancelled from here on
+        group = [(fn, future) for fn, future in group if future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in group:
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = fn(conn)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO job")
+                    results.append((future, None, exc))
+                else:
+                    results.append((future, result, None))
+                conn.execute("RELEASE job")
+            conn.execute("COMMIT")
+        except Exception as exc:
+            # not only sqlite3.Error: whatever went wrong, nothing in the group was committed
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(future, None, exc) for _, future in group]
+        else:
+            self.stats["commits"] += 1
+        for future, result, exc in results:
+            if exc is None:
+                self.stats["writes"] += 1
+                future.set_result(result)
+            else:
+                self.stats["failed_writes"] += 1
+                future.set_exception(exc)
+
+    def close(self):
+        self.jobs.put(None)
+        self.writer.join()
+        for _ in range(self.readers):
+            self.idle.get().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
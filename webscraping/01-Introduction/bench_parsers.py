@@ -0,0 +1,85 @@
+"""
+Pages per second for each parser backend, on stored fixture HTML.
+
+    python bench_parsers.py                       # 500 generated pages in a temp dir
+    python bench_parsers.py --fixtures pages/     # .html files you saved yourself
+    python bench_parsers.py --save pages/ --pages 200
+
+Before timing, every backend's output is compared with the bs4 backend's on
+each page; the script exits non-zero when they disagree.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fixture_site
+from parsers import BACKENDS, available, get_parser, prettify
+
+
+def save_fixtures(directory, pages):
+    os.makedirs(directory, exist_ok=True)
+    site = fixture_site.Site(pages)
+    for n in range(1, pages + 1):
+        with open(os.path.join(directory, f"page-{n:05d}.html"), "w", encoding="utf-8") as f:
+            f.write(site.render(f"/page/{n}/"))
+
+
+def load_fixtures(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parser backends.")
+    parser.add_argument("--fixtures", help="directory of .html pages to parse")
+    parser.add_argument("--save", help="write generated fixture pages here and use them")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.fixtures or args.save or tmp
+        if not args.fixtures:
+            save_fixtures(directory, args.pages)
+        pages = load_fixtures(directory)
+    url = "http://127.0.0.1/page/1/"
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.1f} KiB each")
+
+    reference = [get_parser("bs4")(html, url) for html in pages]
+    failed = False
+    print(f"{'backend':<12}{'pages/s':>10}{'quotes':>9}")
+    for name in available()[::-1]:
+        parse = get_parser(name)
+        if [parse(html, url) for html in pages] != reference:
+            print(f"{name:<12}{'output differs from bs4':>19}")
+            failed = True
+            continue
+        best = min(timed(parse, pages, url) for _ in range(args.rounds))
+        quotes = sum(len(result[0]) for result in reference)
+        print(f"{name:<12}{len(pages) / best:>10.0f}{quotes:>9}")
+    missing = sorted(set(BACKENDS) - set(available()))
+    if missing:
+        print(f"not installed: {', '.join(missing)}")
+
+    # what the old scraper paid per page just to print 500 characters
+    best = min(timed(lambda html, _: prettify(html)[:500], pages, url) for _ in range(args.rounds))
+    print(f"{'prettify':<12}{len(pages) / best:>10.0f}  (debug output only)")
+    if failed:
+        sys.exit("backends disagree")
+
+
+def timed(parse, pages, url):
+    started = time.perf_counter()
+    for html in pages:
+        parse(html, url)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
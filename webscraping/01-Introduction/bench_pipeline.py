@@ -0,0 +1,78 @@
+"""
+Inline parsing vs the fetch -> queue -> process pool pipeline, on the fixture site.
+
+    python bench_pipeline.py                          # 2000 pages, bs4 parser
+    python bench_pipeline.py --parser lxml --latency 0.02 --processes 1 2 4
+
+The fixture site runs in its own process so it doesn't compete with the
+crawler for the GIL. Each run follows every in-site link; the script exits
+non-zero when a run misses pages or quotes.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import fixture_site
+from crawler import Crawler
+from pipeline import PipelineCrawler
+
+
+def serve(pages, port, latency):
+    code = (f"import fixture_site as s; s.Handler.latency = {latency}; "
+            f"s.Handler.site = s.Site({pages}); "
+            f"s.ThreadingHTTPServer(('127.0.0.1', {port}), s.Handler).serve_forever()")
+    server = subprocess.Popen([sys.executable, "-c", code], cwd=os.path.dirname(__file__) or ".")
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + "/").read()
+            return server, base_url
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    sys.exit("fixture server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parse pipeline.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8310)
+    parser.add_argument("--parser", default="bs4")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the fixture server waits before each response")
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count()}))
+    args = parser.parse_args()
+
+    server, base_url = serve(args.pages, args.port, args.latency)
+    expected_pages = len(list(fixture_site.Site(args.pages).paths()))
+    expected_items = args.pages * fixture_site.QUOTES_PER_PAGE
+    print(f"{expected_pages} pages, parser={args.parser}, {os.cpu_count()} cpus")
+    options = dict(concurrency=args.concurrency, delay=0, follow_links=True,
+                   parser=args.parser)
+    failed = False
+    try:
+        runs = [("inline", Crawler([base_url], **options))]
+        runs += [(f"pipeline x{n}", PipelineCrawler([base_url], processes=n, **options))
+                 for n in args.processes]
+        for name, crawler in runs:
+            stats = asyncio.run(crawler.run())
+            ok = stats["pages"] == expected_pages and stats["items"] == expected_items
+            failed |= not ok
+            print(f"{name:<14}{stats['pages'] / stats['seconds']:>8.0f} pages/s"
+                  f"{'' if ok else '  MISSED PAGES'}")
+            for stage, metrics in stats.get("stages", {}).items():
+                print(f"    {stage:<6} {metrics}")
+    finally:
+        server.kill()
+    if failed:
+        sys.exit("a run did not crawl the whole site")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Records per second for each output sink, on quotes from the fixture site.
+
+    python bench_sinks.py                     # 200k quotes, 10% of them repeated
+    python bench_sinks.py --records 1000000 --batch-size 5000
+
+Every sink is run on its own, then all of them behind one Dedup. Each output is
+read back and counted; the script exits non-zero when a count is off.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import fixture_site
+from sinks import SINKS, Dedup, open_sink
+
+
+def records(count, repeat):
+    site = fixture_site.Site(count // fixture_site.QUOTES_PER_PAGE + 1)
+    unique = count - int(count * repeat)
+    out = []
+    for n in range(1, site.pages + 1):
+        for quote in site.quotes(n):
+            out.append({**quote, "url": f"http://127.0.0.1/page/{n}/"})
+            if len(out) == unique:
+                # repeat the first quotes, as overlapping pages would
+                return out + out[:count - unique]
+    return out
+
+
+def count_rows(path):
+    extension = os.path.splitext(path)[1]
+    if extension in (".ndjson", ".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return sum(1 for line in f if json.loads(line))
+    if extension == ".csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            return sum(1 for _ in csv.reader(f)) - 1
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM scraped_quotes").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the output sinks.")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--repeat", type=float, default=0.1,
+                        help="fraction of records that repeat an earlier one")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    items = records(args.records, args.repeat)
+    unique = len({(item["text"], item["author"]) for item in items})
+    options = {"batch_size": args.batch_size} if args.batch_size else {}
+    extensions = [".ndjson", ".csv", ".parquet", ".db"]
+    failed = False
+    print(f"{len(items)} records, {unique} unique")
+    print(f"{'sink':<20}{'records/s':>12}{'rows':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def run(name, make, expect):
+            nonlocal failed
+            started = time.perf_counter()
+            sink = make()
+            with sink:
+                for item in items:
+                    sink(item)
+            elapsed = time.perf_counter() - started
+            rows = [count_rows(path) for path in paths]
+            ok = all(r == e for r, e in zip(rows, expect))
+            failed |= not ok
+            print(f"{name:<20}{len(items) / elapsed:>12,.0f}{rows[0]:>10}"
+                  f"{'' if ok else '  expected ' + str(expect)}")
+
+        for extension in extensions:
+            if extension == ".parquet" and not pyarrow_installed():
+                print(f"{'parquet':<20}{'(pyarrow not installed)':>22}")
+                continue
+            paths = [os.path.join(tmp, "alone" + extension)]
+            # SQLite skips repeats itself, through a unique index on the quote key
+            expect = unique if SINKS[extension].__name__ == "SQLiteSink" else len(items)
+            run(SINKS[extension].__name__, lambda: open_sink(paths[0], **options), [expect])
+
+        paths = [os.path.join(tmp, "chained" + extension) for extension in extensions
+                 if extension != ".parquet" or pyarrow_installed()]
+        run("Dedup -> all", lambda: Dedup(*(open_sink(path, **options) for path in paths)),
+            [unique] * len(paths))
+
+    if failed:
+        sys.exit("a sink wrote the wrong number of rows")
+
+
+def pyarrow_installed():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Crawl the generated fixture site and check the crawler end to end.
+
+    python check_crawl.py                 # 3000 quote pages
+    python check_crawl.py --pages 5000 --concurrency 32
+
+Checks, against fixture_site.py on a local port:
+- following "Next" links from / reaches every quote page, each fetched once,
+  and yields every quote
+- with --follow-links the author and tag pages are crawled too, still once each
+  despite the many duplicate links
+- a crawl stopped after a third of the pages and run again with the same
+  state directory finishes the site without fetching any page twice
+- the politeness delay holds between requests to the same domain
+
+Exits non-zero when a check fails.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import fixture_site
+from crawler import crawl
+
+
+def run(base_url, **options):
+    items = []
+    stats = crawl([base_url + "/"], on_item=items.append, **options)
+    return stats, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end checks for crawler.py.")
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server, base_url = fixture_site.start(args.pages)
+    site = fixture_site.Handler.site
+    quote_pages = args.pages
+    all_pages = len(list(site.paths()))
+    failures = []
+
+    def check(name, ok, detail=""):
+        print(f"{'ok  ' if ok else 'FAIL'} {name} {detail}")
+        if not ok:
+            failures.append(name)
+
+    hits = fixture_site.Handler.hits
+    stats, items = run(base_url, concurrency=args.concurrency, delay=0)
+    rate = stats["pages"] / stats["seconds"]
+    check("pagination", stats["pages"] == quote_pages and len(hits) == quote_pages,
+          f"{stats['pages']} pages, {rate:.0f} pages/s")
+    check("quotes", len(items) == quote_pages * fixture_site.QUOTES_PER_PAGE,
+          f"{len(items)} quotes")
+    check("fetched once", max(hits.values()) == 1)
+
+    hits.clear()
+    stats, items = run(base_url, concurrency=args.concurrency, delay=0, follow_links=True)
+    check("follow links", stats["pages"] == all_pages and set(hits) == set(site.paths())
+          and max(hits.values()) == 1, f"{stats['pages']} of {all_pages} pages")
+
+    hits.clear()
+    with tempfile.TemporaryDirectory() as state:
+        first, items = run(base_url, concurrency=args.concurrency, delay=0, follow_links=True,
+                           state_dir=state, max_pages=all_pages // 3, checkpoint_every=100)
+        second, more = run(base_url, concurrency=args.concurrency, delay=0, follow_links=True,
+                           state_dir=state, checkpoint_every=100)
+    check("resume", first["pending"] > 0 and second["pending"] == 0
+          and set(hits) == set(site.paths()) and max(hits.values()) == 1,
+          f"{first['pages']} + {second['pages'] - first['pages']} pages")
+    check("resume quotes", len(items) + len(more) == quote_pages * fixture_site.QUOTES_PER_PAGE)
+
+    # one request per 20ms to the single domain: 30 pages can't take under 0.58s
+    server.shutdown()
+    server, base_url = fixture_site.start(30)
+    started = time.perf_counter()
+    stats, _ = run(base_url, concurrency=8, delay=0.02)
+    elapsed = time.perf_counter() - started
+    check("politeness", stats["pages"] == 30 and elapsed >= 29 * 0.02, f"{elapsed:.2f}s")
+    server.shutdown()
+
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Crawl the fixture site repeatedly with a CrawlStore and check what a re-crawl costs.
+
+    python check_incremental.py
+    python check_incremental.py --pages 3000 --edits 20
+
+Runs, all against one store:
+1. first crawl: every page downloaded and parsed, every quote emitted
+2. nothing changed, server sends ETags: every page answers 304, nothing parsed or emitted
+3. --edits pages rewritten: only those pages are parsed, only their new quotes emitted
+4. server stops sending ETags: full bodies again, but the content hash
+   matches, so nothing is parsed or emitted
+
+Exits non-zero when a run doesn't match.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+import fixture_site
+from crawl_state import CrawlStore
+from crawler import crawl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental re-crawl checks.")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server, base_url = fixture_site.start(args.pages)
+    handler, site = fixture_site.Handler, fixture_site.Handler.site
+    total = len(list(site.paths()))
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CrawlStore(os.path.join(tmp, "crawl.db"))
+
+        def run(name, expect_items, expect_unchanged):
+            items = []
+            stats = crawl([base_url + "/"], concurrency=args.concurrency, delay=0,
+                          follow_links=True, store=store, on_item=items.append)
+            parsed = stats["pages"] - stats["unchanged"]
+            ok = (stats["pages"] == total and len(items) == expect_items
+                  and stats["unchanged"] == expect_unchanged)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<16} {stats['pages']} pages, "
+                  f"{parsed} parsed, {len(items)} quotes, "
+                  f"{stats['bytes'] / 1024:.0f} KiB, {stats['seconds']:.2f}s")
+            if not ok:
+                failures.append(name)
+
+        handler.validators = True
+        run("first crawl", args.pages * fixture_site.QUOTES_PER_PAGE, 0)
+        run("no changes", 0, total)
+        for n in random.Random(1).sample(range(1, args.pages + 1), args.edits):
+            site.edit(n)
+        run("edited pages", args.edits, total - args.edits)
+        handler.validators = False
+        run("no etags", 0, total)
+        store.close()
+    server.shutdown()
+
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
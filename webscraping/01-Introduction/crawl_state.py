@@ -0,0 +1,144 @@
+"""
+What the last crawl saw, kept in SQLite, so a re-crawl only pays for what changed.
+
+For every URL the store keeps the ETag and Last-Modified the server sent, a
+hash of the body, and the links found on the page. For every quote it keeps a
+hash of (text, author). On the next crawl:
+- the crawler sends If-None-Match / If-Modified-Since, and a 304 costs no body
+- a 200 whose body hashes the same as last time is not parsed again
+- either way the stored links are followed, so the crawl still reaches every page
+- only quotes whose hash is new are passed on
+
+    store = CrawlStore("crawl.db")
+    crawl([url], store=store)      # crawler.Crawler(store=...)
+    store.close()
+
+The crawler calls the store through asyncio.to_thread so a slow disk doesn't
+stall the event loop; the methods take a lock, one thread at a time.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    next_url TEXT,
+    links TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    first_seen REAL NOT NULL
+);
+"""
+
+
+def content_hash(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def quote_hash(quote):
+    key = f"{quote['text']}\x1f{quote['author']}".encode()
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+class CrawlStore:
+    def __init__(self, path, batch=200):
+        # used from the crawler's to_thread workers, one at a time under self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # a crash can lose the last batch, which only means refetching those pages
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.batch = batch
+        self.pending = 0
+
+    def conditional_headers(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def unchanged(self, url, digest=None, etag=None, last_modified=None):
+        """
+        True when the page is as stored: a 304 (no digest) or a body with the
+        same hash. Refreshes the validators and fetch time when it is.
+        """
+        now = time.time()
+        with self.lock:
+            if digest is None:
+                cursor = self.db.execute(
+                    "UPDATE pages SET fetched_at = ? WHERE url = ?", (now, url))
+            else:
+                cursor = self.db.execute(
+                    "UPDATE pages SET fetched_at = ?, etag = ?, last_modified = ? "
+                    "WHERE url = ? AND content_hash = ?",
+                    (now, etag, last_modified, url, digest))
+            self._wrote()
+        return cursor.rowcount == 1
+
+    def links(self, url):
+        """(next_url, links) found on the page when it was last parsed; (None, []) if unknown."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT next_url, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None, []
+        return row[0], json.loads(row[1])
+
+    def record(self, url, digest, etag, last_modified, quotes, next_url, links):
+        """Store a parsed page and return the quotes not seen before."""
+        now = time.time()
+        with self.lock:
+            return self._record(url, digest, etag, last_modified, quotes, next_url, links, now)
+
+    def _record(self, url, digest, etag, last_modified, quotes, next_url, links, now):
+        self.db.execute(
+            "INSERT INTO pages (url, etag, last_modified, content_hash, next_url, links, "
+            "fetched_at, changed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, "
+            "last_modified = excluded.last_modified, content_hash = excluded.content_hash, "
+            "next_url = excluded.next_url, links = excluded.links, "
+            "fetched_at = excluded.fetched_at, changed_at = excluded.changed_at",
+            (url, etag, last_modified, digest, next_url, json.dumps(links), now, now))
+        new = []
+        for quote in quotes:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO quotes (hash, url, first_seen) VALUES (?, ?, ?)",
+                (quote_hash(quote), url, now))
+            if cursor.rowcount:
+                new.append(quote)
+        self._wrote()
+        return new
+
+    def _wrote(self):
+        self.pending += 1
+        if self.pending >= self.batch:
+            self._commit()
+
+    def commit(self):
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.db.close()
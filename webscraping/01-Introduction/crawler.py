@@ -0,0 +1,381 @@
+"""
+An asyncio crawler for quotes.toscrape.com-style sites.
+
+    python scraper.py https://quotes.toscrape.com --concurrency 8 --delay 1 --state .crawl
+
+How it fits together:
+- Frontier holds the URLs still to fetch, one queue per domain, and hands out
+  a URL only once that domain's politeness delay has passed.
+- SeenSet remembers every URL ever queued (a Bloom filter: a few bytes per URL
+  instead of the whole string) so each page is fetched once.
+- Crawler runs `concurrency` workers over one aiohttp session, follows the
+  "Next" link of every page (and every in-site link with follow_links=True),
+  and hands each quote to on_item. Pages are parsed by one of the backends
+  in parsers.py (lxml if installed, unless parser= names one).
+- With a state directory, the frontier and seen-set are checkpointed there
+  every checkpoint_every pages and on exit, and a later run picks up where the
+  last one stopped.
+- With a crawl_state.CrawlStore (store=), requests are conditional, pages
+  whose content hasn't changed are not parsed again, and only quotes not seen
+  by an earlier crawl reach on_item. Store calls run in asyncio.to_thread.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from urllib.parse import urldefrag, urlsplit, urlunsplit
+
+import aiohttp
+
+from crawl_state import content_hash
+from parsers import get_parser, prettify
+
+log = logging.getLogger("crawler")
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5)
+USER_AGENT = "quotes-crawler/1.0 (+course project)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# fetch() result for a page the store says is the same as last crawl
+NOT_MODIFIED = object()
+
+
+def normalize(url):
+    """Canonical form used for dedup: no fragment, lowercase host, no default port."""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and (parts.scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", parts.query, ""))
+
+
+def domain(url):
+    return urlsplit(url).netloc
+
+
+class SeenSet:
+    """
+    A Bloom filter over URLs. Membership can be wrong only one way: a URL
+    never added may (with probability error_rate) look seen and be skipped.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-6):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, url):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url):
+        """Add url; returns False when it was (probably) already there."""
+        new = False
+        for p in self._positions(url):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        self.count += new
+        return new
+
+    def __len__(self):
+        return self.count
+
+    def dump(self, path):
+        header = json.dumps({"capacity": self.capacity, "error_rate": self.error_rate,
+                             "count": self.count}).encode()
+        with open(path, "wb") as f:
+            f.write(header + b"\n")
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            meta = json.loads(f.readline())
+            seen = cls(meta["capacity"], meta["error_rate"])
+            seen.bits = bytearray(f.read())
+        seen.count = meta["count"]
+        return seen
+
+
+class Frontier:
+    """Per-domain FIFO queues with a minimum delay between requests to a domain."""
+
+    def __init__(self, delay=1.0, seen=None):
+        self.delay = delay
+        self.seen = seen or SeenSet()
+        self.queues = {}
+        self.next_at = {}
+        self.in_flight = set()
+        self._changed = asyncio.Event()
+
+    def add(self, url):
+        url = normalize(url)
+        if not self.seen.add(url):
+            return False
+        self.queues.setdefault(domain(url), deque()).append(url)
+        self._changed.set()
+        return True
+
+    def retry(self, url):
+        """Put an already-seen URL back at the front of its queue."""
+        self.in_flight.discard(url)
+        self.queues.setdefault(domain(url), deque()).appendleft(url)
+        self._changed.set()
+
+    def done(self, url):
+        self.in_flight.discard(url)
+        self._changed.set()
+
+    def pending(self):
+        """Everything not fetched yet, in-flight URLs first (for checkpoints)."""
+        return [*self.in_flight, *(url for q in self.queues.values() for url in q)]
+
+    def __len__(self):
+        return sum(len(q) for q in self.queues.values())
+
+    async def get(self):
+        """Next URL whose domain may be hit now, or None once the crawl is finished."""
+        while True:
+            now = time.monotonic()
+            ready, wake = None, None
+            for name, queue in self.queues.items():
+                if not queue:
+                    continue
+                at = self.next_at.get(name, 0.0)
+                if at <= now:
+                    ready = name
+                    break
+                wake = at if wake is None else min(wake, at)
+            if ready is not None:
+                url = self.queues[ready].popleft()
+                self.next_at[ready] = now + self.delay
+                self.in_flight.add(url)
+                return url
+            if wake is None and not self.in_flight:
+                # nothing queued and nothing in flight that could add more
+                self._changed.set()
+                return None
+            self._changed.clear()
+            timeout = None if wake is None else wake - now
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class Crawler:
+    def __init__(self, start_urls, concurrency=8, delay=1.0, follow_links=False,
+                 state_dir=None, checkpoint_every=500, max_pages=None, retries=2,
+                 on_item=None, timeout=DEFAULT_TIMEOUT, capacity=1_000_000, parser=None,
+                 store=None):
+        self.start_urls = list(start_urls)
+        self.allowed = {domain(normalize(url)) for url in self.start_urls}
+        self.concurrency = concurrency
+        self.follow_links = follow_links
+        self.state_dir = state_dir
+        self.checkpoint_every = checkpoint_every
+        self.max_pages = max_pages
+        self.retries = retries
+        self.on_item = on_item or (lambda item: None)
+        self.timeout = timeout
+        self.parse = get_parser(parser)
+        self.store = store
+        # validators of fetched pages waiting to be recorded with their parse
+        self.fetched = {}
+        self.attempts = {}
+        self.started = 0
+        self.stats = {"pages": 0, "items": 0, "errors": 0, "bytes": 0, "retries": 0,
+                      "unchanged": 0}
+        self.frontier = self._load(delay, capacity)
+
+    # -- state -------------------------------------------------------------
+
+    def _paths(self):
+        return (os.path.join(self.state_dir, "frontier.json"),
+                os.path.join(self.state_dir, "seen.bin"))
+
+    def _load(self, delay, capacity):
+        if self.state_dir:
+            frontier_path, seen_path = self._paths()
+            if os.path.exists(frontier_path):
+                with open(frontier_path) as f:
+                    state = json.load(f)
+                frontier = Frontier(delay, SeenSet.load(seen_path))
+                for url in state["pending"]:
+                    frontier.queues.setdefault(domain(url), deque()).append(url)
+                self.stats.update(state["stats"])
+                return frontier
+        frontier = Frontier(delay, SeenSet(capacity))
+        for url in self.start_urls:
+            frontier.add(url)
+        return frontier
+
+    def checkpoint(self):
+        if not self.state_dir:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        frontier_path, seen_path = self._paths()
+        # write both files beside the old ones, then swap them in, so a crash
+        # mid-checkpoint leaves the previous checkpoint intact
+        self.frontier.seen.dump(seen_path + ".tmp")
+        with open(frontier_path + ".tmp", "w") as f:
+            json.dump({"pending": self.frontier.pending(), "stats": self.stats}, f)
+        os.replace(seen_path + ".tmp", seen_path)
+        os.replace(frontier_path + ".tmp", frontier_path)
+
+    # -- crawling ----------------------------------------------------------
+
+    def _in_scope(self, url):
+        if urlsplit(url).scheme not in ("http", "https"):
+            return False
+        # compare in the form self.allowed was built from: "Example.com:80" is example.com
+        return domain(normalize(url)) in self.allowed
+
+    async def fetch(self, session, url):
+        """
+        Return (body, encoding), NOT_MODIFIED, None after recording a failure,
+        or False when the URL was put back for a retry.
+        """
+        headers = None
+        if self.store:
+            headers = await asyncio.to_thread(self.store.conditional_headers, url)
+        try:
+            while True:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and headers:
+                        if await asyncio.to_thread(self.store.unchanged, url):
+                            self.stats["unchanged"] += 1
+                            return NOT_MODIFIED
+                        # the store no longer has the page the validators came
+                        # from, so there are no links to follow: ask for the body
+                        headers = None
+                        continue
+                    if response.status in RETRY_STATUSES:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, (), status=response.status)
+                    if response.status != 200:
+                        self.stats["errors"] += 1
+                        return None
+                    if "html" not in response.headers.get("Content-Type", "text/html"):
+                        return None
+                    body = await response.read()
+                    self.stats["bytes"] += len(body)
+                    if self.store:
+                        validators = (content_hash(body), response.headers.get("ETag"),
+                                      response.headers.get("Last-Modified"))
+                        if await asyncio.to_thread(self.store.unchanged, url, *validators):
+                            self.stats["unchanged"] += 1
+                            return NOT_MODIFIED
+                        self.fetched[url] = validators
+                    return body, response.get_encoding()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            attempt = self.attempts.get(url, 0) + 1
+            if attempt <= self.retries:
+                self.attempts[url] = attempt
+                self.stats["retries"] += 1
+                self.frontier.retry(url)
+                return False
+            self.attempts.pop(url, None)
+            self.stats["errors"] += 1
+            return None
+
+    async def accept(self, url, quotes, next_url, links):
+        """Emit a parsed page's quotes and queue the links worth following."""
+        if self.store:
+            quotes = await asyncio.to_thread(
+                self.store.record, url, *self.fetched.pop(url), quotes, next_url, links)
+        for item in quotes:
+            self.on_item(item)
+        self.stats["items"] += len(quotes)
+        self.follow(next_url, links)
+
+    def follow(self, next_url, links):
+        if next_url and self._in_scope(next_url):
+            self.frontier.add(next_url)
+        if self.follow_links:
+            for link in links:
+                if self._in_scope(link):
+                    self.frontier.add(link)
+
+    def finish(self, url):
+        self.stats["pages"] += 1
+        self.frontier.done(url)
+        if self.checkpoint_every and self.stats["pages"] % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    async def process(self, url, body, encoding):
+        """Parse a fetched page inline; pipeline.py overrides this to hand it off."""
+        try:
+            result = self.parse(body.decode(encoding, errors="replace"), url)
+        except Exception:
+            # one malformed page shouldn't end the worker, and with it the crawl
+            log.exception("parsing %s failed", url)
+            self.fetched.pop(url, None)
+            self.stats["errors"] += 1
+        else:
+            await self.accept(url, *result)
+        self.finish(url)
+
+    async def worker(self, session):
+        while True:
+            # max_pages counts pages of this run, not the ones resumed from state
+            if self.max_pages is not None and self.started >= self.max_pages:
+                return
+            self.started += 1
+            url = await self.frontier.get()
+            if url is None:
+                return
+            page = await self.fetch(session, url)
+            if page is False:
+                self.started -= 1
+                continue
+            if page is None:
+                self.finish(url)
+                continue
+            if page is NOT_MODIFIED:
+                # not parsed again, but its links still lead to pages that may have changed
+                self.follow(*await asyncio.to_thread(self.store.links, url))
+                self.finish(url)
+                continue
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("%s\n%s", url, prettify(page[0].decode(page[1], errors="replace"))[:500])
+            await self.process(url, *page)
+
+    async def run_workers(self, session):
+        await asyncio.gather(*(self.worker(session) for _ in range(self.concurrency)))
+
+    def report(self, elapsed):
+        return {**self.stats, "pending": len(self.frontier), "seconds": round(elapsed, 3)}
+
+    async def run(self):
+        started = time.perf_counter()
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        headers = {"User-Agent": USER_AGENT}
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                             headers=headers) as session:
+                await self.run_workers(session)
+        finally:
+            # also on Ctrl-C / cancellation: in-flight URLs are saved as pending
+            self.checkpoint()
+            if self.store:
+                await asyncio.to_thread(self.store.commit)
+        return self.report(time.perf_counter() - started)
+
+
+def crawl(start_urls, **options):
+    return asyncio.run(Crawler(start_urls, **options).run())
@@ -0,0 +1,179 @@
+"""
+A generated stand-in for quotes.toscrape.com, for tests and benchmarks.
+
+    python fixture_site.py                  # serves 3000 pages on http://127.0.0.1:8300
+    python fixture_site.py --pages 500 --port 8301
+
+Every page is built on the fly from a seeded random generator, so the same
+path always returns the same HTML. The site has:
+- /page/<n>/ (and / for page 1): QUOTES_PER_PAGE quotes each, a "Next" link
+  up to the last page, and links to the author and tag pages of each quote
+- /author/<slug>/: one per author, linking back to a few quote pages
+- /tag/<tag>/: one per tag, linking to a few quote pages
+
+Lots of links point at pages already seen, so a crawler has to dedup.
+Handler.hits counts requests per path and Handler.latency delays every response.
+With Handler.validators on, pages carry an ETag and Last-Modified and a
+matching If-None-Match gets a 304. Site.edit(n) rewrites one quote on page n,
+to simulate the site changing between two crawls.
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUOTES_PER_PAGE = 10
+AUTHORS = [f"Author {i}" for i in range(60)]
+TAGS = [f"tag{i}" for i in range(40)]
+WORDS = ("the world as we have created it is a process of our thinking it cannot be "
+         "changed without changing how we think life love truth simple").split()
+
+
+def slug(name):
+    return name.lower().replace(" ", "-")
+
+
+class Site:
+    def __init__(self, pages=3000, seed=0):
+        self.pages = pages
+        self.seed = seed
+        self.revisions = {}
+
+    def edit(self, n):
+        self.revisions[n] = self.revisions.get(n, 0) + 1
+
+    def paths(self):
+        """Every path a full crawl from / should fetch."""
+        yield "/"
+        for n in range(2, self.pages + 1):
+            yield f"/page/{n}/"
+        for author in AUTHORS:
+            yield f"/author/{slug(author)}/"
+        for tag in TAGS:
+            yield f"/tag/{tag}/"
+
+    def quotes(self, n):
+        rng = random.Random(self.seed * 1_000_003 + n)
+        for i in range(QUOTES_PER_PAGE):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+            if i == 0 and n in self.revisions:
+                text += f" revised {self.revisions[n]} times"
+            yield {
+                "text": f"“{text.capitalize()} ({n}.{i}).”",
+                "author": rng.choice(AUTHORS),
+                "tags": rng.sample(TAGS, rng.randint(1, 4)),
+            }
+
+    def render(self, path):
+        """Return the HTML for path, or None when it does not exist."""
+        parts = [p for p in path.split("/") if p]
+        if not parts:
+            return self.quote_page(1)
+        if len(parts) == 2 and parts[0] == "page" and parts[1].isdigit():
+            n = int(parts[1])
+            # /page/1/ exists on the real site too; nothing here links to it
+            if 1 <= n <= self.pages:
+                return self.quote_page(n)
+        if len(parts) == 2 and parts[0] == "author" and parts[1] in {slug(a) for a in AUTHORS}:
+            return self.link_page(parts[1], parts[1])
+        if len(parts) == 2 and parts[0] == "tag" and parts[1] in TAGS:
+            return self.link_page(parts[1], f"Viewing tag: {parts[1]}")
+        return None
+
+    def quote_page(self, n):
+        out = [f"<html><head><title>Quotes to Scrape</title></head><body>"
+               f"<div class=\"container\"><div class=\"row header-box\">"
+               f"<h1><a href=\"/\">Quotes to Scrape</a></h1></div><div class=\"col-md-8\">"]
+        for quote in self.quotes(n):
+            tags = "".join(f'<a class="tag" href="/tag/{t}/">{t}</a>' for t in quote["tags"])
+            out.append(
+                '<div class="quote" itemscope itemtype="http://schema.org/CreativeWork">'
+                f'<span class="text" itemprop="text">{escape(quote["text"])}</span>'
+                f'<span>by <small class="author" itemprop="author">{escape(quote["author"])}</small>'
+                f' <a href="/author/{slug(quote["author"])}/">(about)</a></span>'
+                f'<div class="tags">Tags: {tags}</div></div>'
+            )
+        out.append('<nav><ul class="pager">')
+        if n > 1:
+            prev = "/" if n == 2 else f"/page/{n - 1}/"
+            out.append(f'<li class="previous"><a href="{prev}">&larr; Previous</a></li>')
+        if n < self.pages:
+            out.append(f'<li class="next"><a href="/page/{n + 1}/">Next &rarr;</a></li>')
+        out.append("</ul></nav></div></div></body></html>")
+        return "".join(out)
+
+    def link_page(self, key, title):
+        rng = random.Random(f"{self.seed}:{key}")
+        links = "".join(
+            f'<li><a href="/page/{rng.randint(2, self.pages)}/">page</a></li>' for _ in range(5)
+        )
+        return (f"<html><head><title>{escape(title)}</title></head><body>"
+                f"<h3>{escape(title)}</h3><ul>{links}</ul>"
+                f'<a href="/">Quotes to Scrape</a></body></html>')
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    site = Site()
+    lock = threading.Lock()
+    hits = {}
+    latency = 0.0
+    validators = False
+    last_modified = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        with Handler.lock:
+            Handler.hits[path] = Handler.hits.get(path, 0) + 1
+        if Handler.latency:
+            time.sleep(Handler.latency)
+        html = Handler.site.render(path)
+        status = 200 if html is not None else 404
+        data = (html or "<html><body>Not found</body></html>").encode()
+        headers = {}
+        if Handler.validators and html is not None:
+            etag = '"%s"' % hashlib.sha1(data).hexdigest()[:16]
+            headers = {"ETag": etag, "Last-Modified": Handler.last_modified}
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start(pages=3000, port=0):
+    """Serve a fresh site in a background thread; returns (server, base_url)."""
+    Handler.site = Site(pages)
+    Handler.hits = {}
+    Handler.validators = False
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--port", type=int, default=8300)
+    args = parser.parse_args()
+    Handler.site = Site(args.pages)
+    print(f"serving {args.pages} quote pages on http://127.0.0.1:{args.port}")
+    ThreadingHTTPServer(("127.0.0.1", args.port), Handler).serve_forever()
@@ -0,0 +1,132 @@
+"""
+Quote extraction backends. Each one is a function parse(html, url) returning
+(quotes, next_url, links), where quotes are dicts with text, author, tags and url.
+
+- "bs4": BeautifulSoup with html.parser, as in the first lessons. Slowest.
+- "lxml": lxml.html with XPath expressions compiled once at import.
+- "selectolax": the Lexbor engine from the selectolax package (optional,
+  pip install selectolax; Modest on versions before 1.0).
+
+lxml and selectolax are both about ten times faster than bs4 and close to
+each other; which one wins changes from run to run on these pages, so
+measure with bench_parsers.py before switching.
+
+get_parser() picks one by name; with no name it takes lxml, then
+selectolax, then bs4, whichever is installed first.
+"""
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+
+def parse_bs4(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    quotes = []
+    for quote in soup.select("div.quote"):
+        text = quote.select_one("span.text")
+        author = quote.select_one("small.author")
+        if text is None or author is None:
+            continue
+        quotes.append({
+            "text": text.get_text(),
+            "author": author.get_text(),
+            "tags": [tag.get_text() for tag in quote.select("a.tag")],
+            "url": url,
+        })
+    next_link = soup.select_one("li.next > a[href]")
+    next_url = urljoin(url, next_link["href"]) if next_link else None
+    links = [urljoin(url, a["href"]) for a in soup.select("a[href]")]
+    return quotes, next_url, links
+
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is in requirements.txt
+    lxml = None
+else:
+    def _has_class(name):
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+    # smart_strings=False: plain str results, no back-reference to the tree
+    QUOTE = etree.XPath(f"//div[{_has_class('quote')}]")
+    TEXT = etree.XPath(f"string(.//span[{_has_class('text')}])", smart_strings=False)
+    AUTHOR = etree.XPath(f"string(.//small[{_has_class('author')}])", smart_strings=False)
+    HAS_TEXT_AND_AUTHOR = etree.XPath(
+        f"boolean(.//span[{_has_class('text')}] and .//small[{_has_class('author')}])")
+    TAGS = etree.XPath(f".//a[{_has_class('tag')}]/text()", smart_strings=False)
+    NEXT = etree.XPath(f"//li[{_has_class('next')}]/a/@href", smart_strings=False)
+    HREFS = etree.XPath("//a/@href", smart_strings=False)
+
+
+def parse_lxml(html, url):
+    if not html or html.isspace():
+        # lxml raises "Document is empty" where the other backends find nothing
+        return [], None, []
+    root = lxml.html.fromstring(html)
+    quotes = [
+        {"text": TEXT(quote), "author": AUTHOR(quote), "tags": TAGS(quote),
+         "url": url}
+        for quote in QUOTE(root) if HAS_TEXT_AND_AUTHOR(quote)
+    ]
+    next_href = NEXT(root)
+    next_url = urljoin(url, next_href[0]) if next_href else None
+    links = [urljoin(url, href) for href in HREFS(root)]
+    return quotes, next_url, links
+
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+
+def parse_selectolax(html, url):
+    tree = HTMLParser(html)
+    quotes = []
+    for quote in tree.css("div.quote"):
+        text = quote.css_first("span.text")
+        author = quote.css_first("small.author")
+        if text is None or author is None:
+            continue
+        quotes.append({
+            "text": text.text(),
+            "author": author.text(),
+            "tags": [tag.text() for tag in quote.css("a.tag")],
+            "url": url,
+        })
+    next_link = tree.css_first("li.next > a[href]")
+    next_url = urljoin(url, next_link.attributes["href"]) if next_link else None
+    links = [urljoin(url, a.attributes["href"]) for a in tree.css("a[href]")]
+    return quotes, next_url, links
+
+
+BACKENDS = {"bs4": parse_bs4, "lxml": parse_lxml, "selectolax": parse_selectolax}
+
+
+def available():
+    """Names of the backends whose library is installed, the default first."""
+    names = []
+    if lxml is not None:
+        names.append("lxml")
+    if HTMLParser is not None:
+        names.append("selectolax")
+    names.append("bs4")
+    return names
+
+
+def get_parser(name=None):
+    name = name or available()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown parser {name!r}, choose from {', '.join(BACKENDS)}")
+    if name not in available():
+        raise ImportError(f"the {name} parser needs `pip install {name}`")
+    return BACKENDS[name]
+
+
+def prettify(html):
+    """Indented HTML for debug output only; re-parsing a page this way is slow."""
+    return BeautifulSoup(html, "html.parser").prettify()
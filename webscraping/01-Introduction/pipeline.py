@@ -0,0 +1,135 @@
+"""
+Crawl with fetching and parsing in separate stages, so parsing uses every core.
+
+    fetchers (asyncio tasks, `concurrency` of them)
+      -> bounded queue of raw page bytes (`queue_size`)
+      -> a process pool of parsers (`processes`)
+      -> accept(): quotes to on_item (the sink), links back to the frontier
+
+When the queue is full the fetchers wait, so a slow parse stage throttles the
+network instead of piling pages up in memory. A URL counts as in flight until
+its page has been parsed, so checkpoints and the end-of-crawl test still see it.
+
+    from pipeline import PipelineCrawler
+    stats = asyncio.run(PipelineCrawler([url], concurrency=16, processes=4).run())
+    stats["stages"]     # per-stage counts, busy time and rates
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler import Crawler
+
+log = logging.getLogger("crawler")
+
+
+def parse_page(parse, url, body, encoding):
+    """Runs in a pool process: decode and parse one page, timing the CPU it took."""
+    started = time.process_time()
+    result = parse(body.decode(encoding, errors="replace"), url)
+    return result, time.process_time() - started
+
+
+class PipelineCrawler(Crawler):
+    def __init__(self, start_urls, processes=None, queue_size=None, **options):
+        super().__init__(start_urls, **options)
+        self.processes = processes or os.cpu_count()
+        self.queue_size = queue_size or self.processes * 4
+        self.queue = None
+        self.metrics = {
+            "fetch": {"pages": 0, "busy": 0.0},
+            "queue": {"pages": 0, "wait": 0.0, "max_depth": 0},
+            "parse": {"pages": 0, "cpu": 0.0, "errors": 0},
+            "sink": {"items": 0, "busy": 0.0},
+        }
+        sink = self.on_item
+
+        def on_item(item):
+            started = time.perf_counter()
+            sink(item)
+            self.metrics["sink"]["busy"] += time.perf_counter() - started
+            self.metrics["sink"]["items"] += 1
+
+        self.on_item = on_item
+
+    async def fetch(self, session, url):
+        started = time.perf_counter()
+        page = await super().fetch(session, url)
+        if page is not False:
+            self.metrics["fetch"]["pages"] += 1
+            self.metrics["fetch"]["busy"] += time.perf_counter() - started
+        return page
+
+    async def process(self, url, body, encoding):
+        await self.queue.put((url, body, encoding, time.perf_counter()))
+        queue = self.metrics["queue"]
+        queue["max_depth"] = max(queue["max_depth"], self.queue.qsize())
+
+    async def parser(self, pool):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job is None:
+                return
+            url, body, encoding, queued = job
+            self.metrics["queue"]["pages"] += 1
+            self.metrics["queue"]["wait"] += time.perf_counter() - queued
+            try:
+                result, cpu = await loop.run_in_executor(
+                    pool, parse_page, self.parse, url, body, encoding)
+            except Exception:
+                log.exception("parsing %s failed", url)
+                self.fetched.pop(url, None)
+                self.metrics["parse"]["errors"] += 1
+                self.stats["errors"] += 1
+            else:
+                self.metrics["parse"]["pages"] += 1
+                self.metrics["parse"]["cpu"] += cpu
+                await self.accept(url, *result)
+            self.finish(url)
+
+    async def run_workers(self, session):
+        self.queue = asyncio.Queue(self.queue_size)
+        # spawn, not fork: forking a process that runs an event loop and
+        # aiohttp's resolver threads can deadlock the children
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.processes, mp_context=context) as pool:
+            # two feeders per process, so each one has its next page waiting
+            parsers = [asyncio.create_task(self.parser(pool)) for _ in range(self.processes * 2)]
+            try:
+                await super().run_workers(session)
+                for _ in parsers:
+                    await self.queue.put(None)
+                await asyncio.gather(*parsers)
+            finally:
+                for task in parsers:
+                    task.cancel()
+
+    def report(self, elapsed):
+        fetch, queue, parse, sink = (self.metrics[name] for name in
+                                     ("fetch", "queue", "parse", "sink"))
+        stages = {
+            "fetch": {**fetch, "per_sec": rate(fetch["pages"], elapsed)},
+            "queue": {"max_depth": queue["max_depth"], "size": self.queue_size,
+                      "avg_wait_ms": round(1000 * queue["wait"] / max(queue["pages"], 1), 2)},
+            "parse": {**parse, "processes": self.processes,
+                      "per_sec": rate(parse["pages"], elapsed),
+                      "per_cpu_sec": rate(parse["pages"], parse["cpu"])},
+            "sink": {**sink, "per_sec": rate(sink["items"], elapsed)},
+        }
+        for stage in stages.values():
+            for key in ("busy", "cpu"):
+                if key in stage:
+                    stage[key] = round(stage[key], 3)
+        return {**super().report(elapsed), "stages": stages}
+
+
+def rate(count, seconds):
+    return round(count / seconds, 1) if seconds else 0.0
+
+
+def crawl(start_urls, **options):
+    return asyncio.run(PipelineCrawler(start_urls, **options).run())
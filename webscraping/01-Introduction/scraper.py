@@ -1,25 +1,87 @@
-#from pydoc import text
-import requests;
-from bs4 import BeautifulSoup;
+"""
+Crawl quotes.toscrape.com (or any site with the same markup) and print every quote.
 
+    python scraper.py                                   # the whole site, politely
+    python scraper.py https://quotes.toscrape.com --concurrency 4 --delay 0.5
+    python scraper.py --state .crawl --max-pages 3      # stop early; run again to resume
+    python scraper.py --parser bs4 --debug              # also print the start of each page
+    python scraper.py --processes 4                     # parse in 4 processes (pipeline.py)
+    python scraper.py --store crawl.db                  # print only quotes new since last run
+    python scraper.py --out quotes.ndjson --out quotes.db   # write to sinks.py sinks instead
 
-url = "https://quotes.toscrape.com"
-print(f"fetching {url}")
+The fetching and parsing live in crawler.py (and pipeline.py with --processes);
+this script only wires up the command line and prints `text - author` like
+the single-page version did.
+"""
+import argparse
+import logging
 
-response = requests.get(url)
-print(f"response code {response.status_code}")
-if response.status_code != 200:
-    print(f"failed response code {response.status_code}")
-    exit()
+import crawler
+import pipeline
+from crawl_state import CrawlStore
+from parsers import BACKENDS
+from sinks import Dedup, Tee, open_sink
 
-soup = BeautifulSoup(response.text, "html.parser")
-print(soup.prettify()[:500])
 
-quotes  = soup.find_all("div", class_="quotes")
+def print_quote(quote):
+    print(f"{quote['text']} - {quote['author']}")
 
-for quote in quotes:
-    text = quote.find("span", class_="text").text
-    author = quote.find("small", class_="author").text
 
-    print(f"{text} - {author}")
-    
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a quotes site and print the quotes.")
+    parser.add_argument("urls", nargs="*", default=["https://quotes.toscrape.com"])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=1.0,
+                        help="seconds between two requests to the same domain")
+    parser.add_argument("--follow-links", action="store_true",
+                        help="follow every in-site link, not only the Next button")
+    parser.add_argument("--state", help="directory to checkpoint into and resume from")
+    parser.add_argument("--max-pages", type=int)
+    parser.add_argument("--parser", choices=sorted(BACKENDS),
+                        help="HTML parser backend (default: lxml if installed)")
+    parser.add_argument("--processes", type=int,
+                        help="parse in this many processes instead of inline")
+    parser.add_argument("--store",
+                        help="SQLite file remembering the last crawl, for incremental re-crawls")
+    parser.add_argument("--out", action="append", default=[],
+                        help="write quotes to this .ndjson/.csv/.parquet/.db file (repeatable); "
+                             "existing files are appended to, except .parquet, which is replaced")
+    parser.add_argument("--debug", action="store_true",
+                        help="log the prettified start of every page (slow)")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(message)s")
+    if args.debug:
+        logging.getLogger("crawler").setLevel(logging.DEBUG)
+
+    print(f"crawling {', '.join(args.urls)}")
+    options = {"processes": args.processes} if args.processes else {}
+    crawl = pipeline.crawl if args.processes else crawler.crawl
+    store = CrawlStore(args.store) if args.store else None
+    sinks = []
+    try:
+        for path in args.out:
+            sinks.append(open_sink(path))
+        sink = Dedup(*sinks) if sinks else print_quote
+        stats = crawl(
+            args.urls,
+            concurrency=args.concurrency,
+            delay=args.delay,
+            follow_links=args.follow_links,
+            state_dir=args.state,
+            max_pages=args.max_pages,
+            parser=args.parser,
+            store=store,
+            on_item=sink,
+            **options,
+        )
+    finally:
+        # also on Ctrl-C or a crawl error: flush what was buffered, and a
+        # Parquet file is unreadable until its footer is written
+        Tee(*sinks).close()
+        if store:
+            store.close()
+    print(f"done: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Where scraped quotes go. A sink is a callable taking one quote dict, so it can
+be passed straight to the crawler as on_item; it buffers quotes and writes
+them batch_size at a time.
+
+- NDJSONSink: one JSON object per line
+- CSVSink: text, author, tags (joined with "|"), url
+- ParquetSink: one row group per batch (needs pyarrow)
+- SQLiteSink: executemany into a table, one transaction per batch; a quote
+  already in the table is skipped
+- Dedup(*sinks): passes each (text, author) on once
+- Tee(*sinks): passes every quote to each of its sinks
+
+Sinks chain, and closing the first one flushes and closes the rest:
+
+    with Dedup(NDJSONSink("quotes.ndjson"), SQLiteSink("quotes.db")) as sink:
+        crawl([url], on_item=sink)
+
+open_sink("quotes.csv") picks the sink from the file extension.
+
+NDJSON, CSV and SQLite sinks add to an existing file. A Parquet file can't be
+appended to (its footer indexes the row groups), so ParquetSink replaces it.
+"""
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+
+FIELDS = ("text", "author", "tags", "url")
+
+
+def quote_key(item):
+    """64-bit hash of (text, author), the dedup key in Dedup and SQLiteSink."""
+    digest = hashlib.blake2b(f"{item['text']}\x1f{item['author']}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little", signed=True)
+
+
+class Sink:
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+
+    def __call__(self, item):
+        self.buffer.append(item)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.write(self.buffer)
+            self.written += len(self.buffer)
+            self.buffer = []
+
+    def write(self, items):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Tee(Sink):
+    def __init__(self, *sinks):
+        super().__init__()
+        self.sinks = sinks
+
+    def __call__(self, item):
+        # no buffer of its own: each downstream sink batches for itself
+        self.written += 1
+        for sink in self.sinks:
+            sink(item)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        # every sink gets closed even if an earlier one fails; the first error is raised
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
+
+
+class Dedup(Tee):
+    """Drops quotes whose (text, author) already went through."""
+
+    def __init__(self, *sinks):
+        super().__init__(*sinks)
+        self.seen = set()
+        self.dropped = 0
+
+    def __call__(self, item):
+        key = quote_key(item)
+        if key in self.seen:
+            self.dropped += 1
+            return
+        self.seen.add(key)
+        super().__call__(item)
+
+
+class NDJSONSink(Sink):
+    def __init__(self, path, batch_size=1000):
+        super().__init__(batch_size)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, items):
+        self.file.write("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items))
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class CSVSink(Sink):
+    def __init__(self, path, batch_size=1000):
+        super().__init__(batch_size)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        if new:
+            self.writer.writerow(FIELDS)
+
+    def write(self, items):
+        self.writer.writerows(
+            (item["text"], item["author"], "|".join(item.get("tags", ())), item.get("url"))
+            for item in items
+        )
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class ParquetSink(Sink):
+    """Writes a new file, replacing any existing one (Parquet has no append)."""
+
+    def __init__(self, path, batch_size=10_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(batch_size)
+        self.pa = pa
+        self.schema = pa.schema([
+            ("text", pa.string()),
+            ("author", pa.string()),
+            ("tags", pa.list_(pa.string())),
+            ("url", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, items):
+        columns = {name: [item.get(name) for item in items] for name in FIELDS}
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+class SQLiteSink(Sink):
+    def __init__(self, path, batch_size=1000, table="scraped_quotes"):
+        super().__init__(batch_size)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # repeats are caught by a unique index on the 8-byte key rather than on
+        # (text, author); rows still go in rowid order, so the table appends
+        self.db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key INTEGER NOT NULL UNIQUE, "
+            f"text TEXT NOT NULL, author TEXT NOT NULL, tags TEXT NOT NULL, url TEXT)")
+        self.insert = (f"INSERT OR IGNORE INTO {table} (key, text, author, tags, url) "
+                       f"VALUES (?, ?, ?, ?, ?)")
+
+    def write(self, items):
+        with self.db:
+            self.db.executemany(self.insert, (
+                (quote_key(item), item["text"], item["author"], json.dumps(item.get("tags", [])),
+                 item.get("url"))
+                for item in items
+            ))
+
+    def close(self):
+        super().close()
+        self.db.close()
+
+
+SINKS = {
+    ".ndjson": NDJSONSink,
+    ".jsonl": NDJSONSink,
+    ".csv": CSVSink,
+    ".parquet": ParquetSink,
+    ".db": SQLiteSink,
+    ".sqlite": SQLiteSink,
+}
+
+
+def open_sink(path, **options):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"no sink for {path!r}, use one of {', '.join(SINKS)}")
+    return SINKS[extension](path, **options)
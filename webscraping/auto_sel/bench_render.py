@@ -0,0 +1,93 @@
+"""
+Time the render profiles and the hybrid scraper on local fixture pages.
+
+    python bench_render.py
+    python bench_render.py --pages 100 --asset-latency 0.1 --size 4
+
+Each mode scrapes the same static pages (quotes in the HTML) and JS pages
+(quotes rendered client-side), `size` at a time, with browsers from a warm
+pool of stand-in drivers (stand_in_driver.py loads subresources the way the
+profile would make Chrome). Every mode must find every quote, except plain
+HTTP on JS pages, which is what the hybrid mode's fallback is for. Exits
+non-zero when a mode misses quotes it should have found.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+
+import fixture_pages
+from browser_pool import BrowserPool
+from render import FAST, FULL, HybridScraper
+from stand_in_driver import StandInDriver
+
+REQUIRED = "div.quote"
+
+
+def count_quotes(html):
+    return len(BeautifulSoup(html, "lxml").select(REQUIRED))
+
+
+def browser_only(pool):
+    render = HybridScraper(REQUIRED, pool).render
+
+    def scrape(url):
+        return pool.run(render, url)
+    return scrape
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark render profiles and hybrid mode.")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--asset-latency", type=float, default=0.05,
+                        help="seconds the server takes per image/font/script")
+    args = parser.parse_args()
+
+    fixture_pages.Handler.asset_latency = args.asset_latency
+    server, base_url = fixture_pages.start()
+    print("FAST profile in Chrome:", FAST.chrome_options().to_capabilities())
+    print(f"{'mode':<16}{'static ms/page':>16}{'js ms/page':>12}{'quotes':>14}")
+    failed = False
+    session = requests.Session()
+
+    def pool_for(profile):
+        return BrowserPool(args.size, factory=lambda: StandInDriver(startup=0, profile=profile))
+
+    def http_only(url):
+        return session.get(url).text
+
+    for name, profile in [("http only", None), ("full browser", FULL),
+                          ("fast browser", FAST), ("hybrid (fast)", FAST)]:
+        pool = pool_for(profile).start() if profile else None
+        if name.startswith("hybrid"):
+            scrape = HybridScraper(REQUIRED, pool, session=session).scrape
+        elif pool:
+            scrape = browser_only(pool)
+        else:
+            scrape = http_only
+        row, found = [], []
+        for kind in ("static", "js"):
+            urls = [f"{base_url}/{kind}/{n}" for n in range(args.pages)]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.size) as jobs:
+                pages = list(jobs.map(scrape, urls))
+            row.append(1000 * (time.perf_counter() - started) / len(urls))
+            found.append(sum(map(count_quotes, pages)))
+        if pool:
+            pool.close()
+        expected = args.pages * 5
+        ok = found[0] == expected and (found[1] == expected or name == "http only")
+        failed |= not ok
+        print(f"{name:<16}{row[0]:>16.1f}{row[1]:>12.1f}{f'{found[0]}/{found[1]}':>14}"
+              f"{'' if ok else '  MISSING QUOTES'}")
+    server.shutdown()
+    if failed:
+        sys.exit("a mode missed quotes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+A pool of warm headless browsers, so scripts stop paying browser startup per page.
+
+    python browser_pool.py https://example.com https://quotes.toscrape.com --size 2
+
+    with BrowserPool(size=4, max_pages=50) as pool:
+        titles = list(pool.map(get_title, urls))     # get_title(driver, url)
+
+        with pool.browser() as driver:               # or check one out by hand
+            driver.get(url)
+
+How it behaves:
+- `size` browsers are started in parallel up front and handed out from a queue;
+  map() runs jobs on `size` threads, so every browser stays busy.
+- After every job the browser is reset: cookies and local/session storage are
+  cleared and about:blank is loaded, so one job never sees another's login.
+  The pool notes the origin of every driver.get() and of the page a job ends
+  on. Chrome clears the storage of each of them over CDP; other browsers can
+  only clear the current page's, so one that visited other origins is
+  replaced instead.
+- A browser is quit and replaced in the background after `max_pages` jobs
+  (long-lived browsers grow) or when it stops answering after a failed job.
+  A launch that fails is logged and retried `launch_retries` times with backoff.
+"""
+import argparse
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+log = logging.getLogger("browser_pool")
+
+
+def headless_chrome():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1280,1024")
+    return webdriver.Chrome(options=options)
+
+
+def origin(url):
+    """scheme://host[:port] of an http(s) URL, else None."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+def reset(driver, origins=()):
+    """
+    Forget everything the last job left behind. Returns False when that can't
+    be guaranteed: storage of origins other than the current page's is left.
+    """
+    complete = True
+    if hasattr(driver, "execute_cdp_cmd"):
+        # Chrome: cookies of every site, and storage of every origin visited
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for name in origins:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                                   {"origin": name, "storageTypes": "all"})
+    else:
+        current = origin(driver.current_url)
+        complete = all(name == current for name in origins)
+    driver.delete_all_cookies()
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except Exception:
+        # pages like about:blank have no storage to clear
+        pass
+    driver.get("about:blank")
+    return complete
+
+
+def alive(driver):
+    try:
+        driver.current_url
+    except Exception:
+        return False
+    return True
+
+
+def quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class Browser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        # origins loaded since the last reset, for reset() to clear
+        self.origins = set()
+        get = driver.get
+
+        def tracked_get(url):
+            name = origin(url)
+            if name:
+                self.origins.add(name)
+            return get(url)
+
+        driver.get = tracked_get
+
+
+class BrowserPool:
+    def __init__(self, size=4, factory=headless_chrome, max_pages=100, checkout_timeout=120,
+                 launch_retries=3, launch_backoff=1.0):
+        self.size = size
+        self.factory = factory
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self.launch_retries = launch_retries
+        self.launch_backoff = launch_backoff
+        self.idle = queue.Queue()
+        self.launcher = ThreadPoolExecutor(size, thread_name_prefix="browser-launch")
+        self.lock = threading.Lock()
+        self.started = False
+        self.closed = threading.Event()
+        self.launch_error = None
+        self.stats = {"launched": 0, "recycled": 0, "crashed": 0, "jobs": 0, "failed_jobs": 0,
+                      "launch_failures": 0}
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return self
+            self.started = True
+        for _ in range(self.size):
+            self.launcher.submit(self._launch)
+        return self
+
+    def _launch(self):
+        for attempt in range(self.launch_retries + 1):
+            if self.closed.is_set():
+                return
+            try:
+                driver = self.factory()
+                break
+            except Exception as exc:
+                self.launch_error = exc
+                with self.lock:
+                    self.stats["launch_failures"] += 1
+                if attempt == self.launch_retries:
+                    log.exception("could not start a browser, giving up after %d attempts",
+                                  attempt + 1)
+                    return
+                delay = self.launch_backoff * 2 ** attempt
+                log.warning("could not start a browser (%r), retrying in %.1fs", exc, delay)
+                # close() sets the event, so a pool being shut down stops waiting
+                self.closed.wait(delay)
+        with self.lock:
+            if not self.closed.is_set():
+                self.stats["launched"] += 1
+                self.idle.put(Browser(driver))
+                return
+        quit_quietly(driver)
+
+    def _replace(self, browser, reason):
+        quit_quietly(browser.driver)
+        with self.lock:
+            self.stats[reason] += 1
+            if self.closed.is_set():
+                return
+            # under the lock, so close() can't shut the launcher down in between
+            self.launcher.submit(self._launch)
+
+    @contextmanager
+    def browser(self):
+        self.start()
+        try:
+            browser = self.idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"no browser free after {self.checkout_timeout}s"
+                               f" (last launch error: {self.launch_error!r})") from None
+        failed = False
+        try:
+            yield browser.driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release(browser, failed)
+
+    def _release(self, browser, failed):
+        browser.pages += 1
+        with self.lock:
+            self.stats["jobs"] += 1
+            self.stats["failed_jobs"] += failed
+        if failed and not alive(browser.driver):
+            self._replace(browser, "crashed")
+            return
+        if browser.pages >= self.max_pages:
+            self._replace(browser, "recycled")
+            return
+        try:
+            # the page the job ended on may have come from a click, not a get()
+            browser.origins.add(origin(browser.driver.current_url))
+            browser.origins.discard(None)
+            complete = reset(browser.driver, sorted(browser.origins))
+        except Exception:
+            self._replace(browser, "crashed")
+            return
+        if not complete:
+            self._replace(browser, "recycled")
+            return
+        browser.origins.clear()
+        with self.lock:
+            if not self.closed.is_set():
+                self.idle.put(browser)
+                return
+        quit_quietly(browser.driver)
+
+    def run(self, job, item):
+        with self.browser() as driver:
+            return job(driver, item)
+
+    def map(self, job, items):
+        """job(driver, item) for every item, on all browsers at once; results in order."""
+        with ThreadPoolExecutor(self.size, thread_name_prefix="browser-job") as jobs:
+            futures = [jobs.submit(self.run, job, item) for item in items]
+            for future in futures:
+                yield future.result()
+
+    def close(self):
+        with self.lock:
+            self.closed.set()
+        self.launcher.shutdown(wait=True)
+        while True:
+            try:
+                quit_quietly(self.idle.get_nowait().driver)
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def page_title(driver, url):
+    driver.get(url)
+    return driver.title
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the title of every URL, using a browser pool.")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--size", type=int, default=2)
+    parser.add_argument("--max-pages", type=int, default=100)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with BrowserPool(args.size, max_pages=args.max_pages) as pool:
+        for url, title in zip(args.urls, pool.map(page_title, args.urls)):
+            print(f"{url}: {title}")
+    print(f"{len(args.urls)} pages in {time.perf_counter() - started:.1f}s, {pool.stats}")
@@ -0,0 +1,141 @@
+"""
+Check browser_pool.py against the stand-in driver and local pages, no browser needed.
+
+    python check_pool.py
+    python check_pool.py --jobs 400 --size 8 --startup 1.0
+
+Checks:
+- N jobs on a pool of `size` browsers start only `size` (+ recycled) browsers
+  and beat one fresh browser per job by roughly the startup cost per page
+- a job never sees the cookies or localStorage the previous job left, on
+  the page it ended on or any other origin it visited
+- browsers are replaced after max_pages jobs and after a crash
+- a failed launch is retried, and nothing is launched after close()
+
+Exits non-zero when a check fails.
+"""
+import argparse
+import sys
+import time
+
+import fixture_pages
+from browser_pool import BrowserPool, page_title
+from stand_in_driver import StandInDriver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end checks for browser_pool.py.")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--max-pages", type=int, default=30)
+    parser.add_argument("--startup", type=float, default=0.5,
+                        help="seconds each stand-in browser takes to start")
+    args = parser.parse_args()
+
+    server, base_url = fixture_pages.start()
+    urls = [f"{base_url}/page/{n}" for n in range(args.jobs)]
+    failures = []
+
+    def check(name, ok, detail=""):
+        print(f"{'ok  ' if ok else 'FAIL'} {name} {detail}")
+        if not ok:
+            failures.append(name)
+
+    def factory():
+        return StandInDriver(startup=args.startup)
+
+    # a handful of fresh browsers, one per page, as the old scripts do
+    sample = urls[:10]
+    started = time.perf_counter()
+    for url in sample:
+        driver = factory()
+        page_title(driver, url)
+        driver.quit()
+    fresh = (time.perf_counter() - started) / len(sample)
+
+    before = StandInDriver.launched
+    started = time.perf_counter()
+    with BrowserPool(args.size, factory=factory, max_pages=args.max_pages) as pool:
+        titles = list(pool.map(page_title, urls))
+    pooled = (time.perf_counter() - started) / len(urls)
+    launched = StandInDriver.launched - before
+    check("results", titles == [f"Page {n}" for n in range(args.jobs)])
+    check("browsers reused", launched == args.size + pool.stats["recycled"],
+          f"{launched} started for {args.jobs} jobs, {pool.stats}")
+    check("recycled", pool.stats["recycled"] >= args.jobs // args.max_pages - args.size)
+    check("faster", pooled < fresh / 2,
+          f"{1000 * fresh:.0f} ms/page fresh, {1000 * pooled:.1f} ms/page pooled")
+
+    # state left by one job must be gone for the next, on the same browser
+    def log_in(driver, user):
+        driver.get(f"{base_url}/login?user={user}")
+        driver.execute_script(f"window.localStorage.setItem('user', '{user}')")
+        return driver.title
+
+    def who(driver, _):
+        driver.get(f"{base_url}/whoami")
+        return driver.title, driver.execute_script("return window.localStorage.getItem('user')")
+
+    with BrowserPool(1, factory=factory) as pool:
+        pool.run(log_in, "alice")
+        check("state reset", pool.run(who, None) == ("nobody", None))
+
+    # the same, when the job moved on to another origin before it finished
+    other_origin = base_url.replace("127.0.0.1", "localhost")
+
+    def log_in_and_leave(driver, user):
+        log_in(driver, user)
+        driver.get(f"{other_origin}/page/1")
+
+    with BrowserPool(1, factory=factory) as pool:
+        pool.run(log_in_and_leave, "bob")
+        check("state reset, other origin", pool.run(who, None) == ("nobody", None),
+              str(pool.stats))
+
+    # a crashed browser is replaced, and the pool keeps serving
+    def crash(driver, _):
+        driver.crash()
+        raise RuntimeError("browser died mid-job")
+
+    with BrowserPool(2, factory=factory) as pool:
+        errors = 0
+        for n in range(6):
+            try:
+                pool.run(crash if n % 3 == 0 else page_title, urls[n])
+            except RuntimeError:
+                errors += 1
+        check("crash recovery", errors == 2 and pool.stats["crashed"] == 2
+              and pool.run(page_title, urls[7]) == "Page 7", str(pool.stats))
+
+    # launches that fail are retried with backoff
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise OSError("chromedriver not ready")
+        return factory()
+
+    with BrowserPool(1, factory=flaky, launch_backoff=0.01) as pool:
+        check("launch retried", pool.run(page_title, urls[1]) == "Page 1"
+              and pool.stats["launch_failures"] == 2, str(pool.stats))
+
+    # a browser handed back after close() is quit, not replaced
+    pool = BrowserPool(1, factory=factory, max_pages=1).start()
+    try:
+        with pool.browser() as driver:
+            before = StandInDriver.launched
+            pool.close()
+        ok = driver.dead and StandInDriver.launched == before
+    except RuntimeError as exc:
+        ok = False
+        print(exc)
+    check("no launch after close", ok, str(pool.stats))
+    server.shutdown()
+
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
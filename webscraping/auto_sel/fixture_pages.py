@@ -0,0 +1,121 @@
+"""
+Local static pages for the auto_sel checks and benchmarks.
+
+    python fixture_pages.py              # serves on http://127.0.0.1:8400
+
+Routes:
+- /page/<n>: a page titled "Page <n>" with a few quotes
+- /login?user=<name>: sets a session=<name> cookie
+- /whoami: says which session cookie came with the request
+- /static/<n>: quotes in the HTML, plus images, fonts, a script and a
+  third-party tracker, like a real page
+- /js/<n>: the same page, but the quotes arrive as JSON in a
+  <script data-render="quotes"> block for client-side code to render
+- /assets/<name>: those subresources, each delayed by Handler.asset_latency
+
+The tracker is loaded from "localhost" rather than 127.0.0.1, so it counts as
+another site.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def quotes_html(n):
+    return "".join(
+        f'<div class="quote"><span class="text">Quote {n}.{i}</span>'
+        f'<small class="author">Author {i}</small></div>'
+        for i in range(5)
+    )
+
+
+def quote_page(n):
+    return f"<html><head><title>Page {n}</title></head><body>{quotes_html(n)}</body></html>"
+
+
+def assets(port):
+    images = "".join(f'<img src="/assets/photo-{i}.jpg">' for i in range(6))
+    return (
+        '<link rel="stylesheet" href="/assets/site.css">'
+        '<link rel="preload" as="font" href="/assets/serif.woff2">'
+        '<link rel="preload" as="font" href="/assets/sans.woff2">'
+        '<script src="/assets/app.js"></script>'
+        f'<script src="http://localhost:{port}/assets/tracker.js"></script>'
+        f"{images}"
+    )
+
+
+def static_page(n, port):
+    return (f"<html><head><title>Page {n}</title>{assets(port)}</head>"
+            f"<body>{quotes_html(n)}</body></html>")
+
+
+def js_page(n, port):
+    data = json.dumps([{"text": f"Quote {n}.{i}", "author": f"Author {i}"} for i in range(5)])
+    return (f"<html><head><title>Page {n}</title>{assets(port)}</head><body>"
+            f'<div id="quotes"></div><script type="application/json" data-render="quotes">'
+            f"{data}</script></body></html>")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    asset_latency = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_html(self, html, status=200, headers=None, content_type="text/html; charset=utf-8"):
+        data = html.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        port = self.server.server_port
+        if len(parts) == 2 and parts[0] == "page" and parts[1].isdigit():
+            self.send_html(quote_page(int(parts[1])))
+        elif len(parts) == 2 and parts[0] == "static" and parts[1].isdigit():
+            self.send_html(static_page(int(parts[1]), port))
+        elif len(parts) == 2 and parts[0] == "js" and parts[1].isdigit():
+            self.send_html(js_page(int(parts[1]), port))
+        elif len(parts) == 2 and parts[0] == "assets":
+            time.sleep(Handler.asset_latency)
+            self.send_html("x" * 2048, content_type="application/octet-stream")
+        elif parts == ["login"]:
+            user = parse_qs(url.query).get("user", ["anonymous"])[0]
+            self.send_html(f"<html><head><title>Hello {user}</title></head></html>",
+                           headers={"Set-Cookie": f"session={user}; Path=/"})
+        elif parts == ["whoami"]:
+            cookie = self.headers.get("Cookie") or ""
+            session = dict(c.strip().partition("=")[::2] for c in cookie.split(";") if c.strip())
+            self.send_html(f"<html><head><title>{session.get('session', 'nobody')}</title></head></html>")
+        else:
+            self.send_html("<html><head><title>Not found</title></head></html>", status=404)
+
+
+def start(port=0):
+    """Serve in a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    print("serving on http://127.0.0.1:8400")
+    ThreadingHTTPServer(("127.0.0.1", 8400), Handler).serve_forever()
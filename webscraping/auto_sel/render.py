@@ -0,0 +1,115 @@
+"""
+Render profiles for Selenium scraping, and a hybrid scraper that only uses a
+browser when it has to.
+
+A full render waits for every image, font and third-party script before
+driver.get() returns. For scraping, none of that matters:
+
+    FAST.chrome()        # headless, eager load, images/media/fonts/trackers blocked
+    RenderProfile(blocked=[*BLOCKED_RESOURCES, "*/ads/*"]).chrome()
+    BrowserPool(4, factory=FAST.chrome)
+
+HybridScraper tries a plain HTTP GET first and only falls back to a browser
+when the content it needs (a CSS selector) isn't in the HTML, as with pages
+rendered by JavaScript:
+
+    with BrowserPool(2, factory=FAST.chrome) as pool:
+        scraper = HybridScraper("div.quote", pool)
+        html = scraper.scrape("https://quotes.toscrape.com/js/")
+        scraper.stats      # pages served over HTTP vs by the browser, and time spent
+"""
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+# Chrome's Network.setBlockedURLs patterns: * matches anything
+BLOCKED_IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"]
+BLOCKED_MEDIA = ["*.mp4", "*.webm", "*.mp3", "*.ogg"]
+BLOCKED_FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+BLOCKED_TRACKERS = ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+                    "*facebook.net*", "*hotjar.com*"]
+BLOCKED_RESOURCES = BLOCKED_IMAGES + BLOCKED_MEDIA + BLOCKED_FONTS + BLOCKED_TRACKERS
+
+
+class RenderProfile:
+    def __init__(self, headless=True, page_load_strategy="eager", images=False,
+                 blocked=BLOCKED_RESOURCES, window_size="1280,1024"):
+        self.headless = headless
+        # "normal" waits for the load event (every subresource), "eager" only
+        # for DOMContentLoaded, "none" returns as soon as the HTML arrives
+        self.page_load_strategy = page_load_strategy
+        self.images = images
+        self.blocked = list(blocked)
+        self.window_size = window_size
+
+    def chrome_options(self):
+        from selenium import webdriver
+
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--disable-gpu")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"--window-size={self.window_size}")
+        options.page_load_strategy = self.page_load_strategy
+        if not self.images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def chrome(self):
+        from selenium import webdriver
+
+        driver = webdriver.Chrome(options=self.chrome_options())
+        if self.blocked:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked})
+        return driver
+
+
+FULL = RenderProfile(headless=True, page_load_strategy="normal", images=True, blocked=())
+FAST = RenderProfile()
+
+
+class HybridScraper:
+    def __init__(self, required, pool, session=None, timeout=10):
+        self.required = required
+        self.pool = pool
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.stats = {"http": 0, "browser": 0, "http_seconds": 0.0, "browser_seconds": 0.0}
+        # scrape() runs on many threads (pool.map, executors); += on a dict isn't atomic
+        self.lock = threading.Lock()
+
+    def scrape(self, url):
+        """The page's HTML, from a plain GET when it already holds `required`."""
+        started = time.perf_counter()
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        html = response.text
+        found = BeautifulSoup(html, "lxml").select_one(self.required) is not None
+        self._count("http", time.perf_counter() - started, pages=int(found))
+        if found:
+            return html
+        started = time.perf_counter()
+        html = self.pool.run(self.render, url)
+        self._count("browser", time.perf_counter() - started)
+        return html
+
+    def _count(self, how, seconds, pages=1):
+        with self.lock:
+            self.stats[how] += pages
+            self.stats[how + "_seconds"] += seconds
+
+    def render(self, driver, url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver.get(url)
+        WebDriverWait(driver, self.timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, self.required)))
+        return driver.page_source
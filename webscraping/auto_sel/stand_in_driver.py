@@ -0,0 +1,176 @@
+"""
+Just enough of a Selenium WebDriver to exercise browser_pool.py without a browser.
+
+StandInDriver sleeps `startup` seconds when created, as launching Chrome would,
+then loads pages with urllib. It keeps cookies per host (sent back on later
+requests) and a per-origin localStorage that execute_script understands for
+setItem / getItem / clear / length. crash() makes every later call raise, like
+a browser whose process died.
+
+Given a render.RenderProfile, get() loads subresources the way that profile
+would make Chrome: scripts and stylesheets always, fonts and images only with
+the "normal" page load strategy, images not at all when they are disabled,
+and nothing matching a blocked pattern. There is no JavaScript engine; the one
+"script" it runs is the fixture pages' renderer, which turns a
+<script data-render="quotes"> JSON block into div.quote elements.
+"""
+import json
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+
+
+class BrowserGone(Exception):
+    pass
+
+
+class JavascriptError(Exception):
+    pass
+
+
+class Element:
+    def __init__(self, tag):
+        self.tag = tag
+        self.text = tag.get_text(" ", strip=True)
+
+    def get_attribute(self, name):
+        return self.tag.get(name)
+
+
+class StandInDriver:
+    lock = threading.Lock()
+    launched = 0
+
+    def __init__(self, startup=0.5, profile=None):
+        time.sleep(startup)
+        with StandInDriver.lock:
+            StandInDriver.launched += 1
+        self.page_load_strategy = getattr(profile, "page_load_strategy", "normal")
+        self.images = getattr(profile, "images", True)
+        self.blocked = list(getattr(profile, "blocked", ()))
+        # browsers fetch about six subresources at a time per site
+        self.loader = ThreadPoolExecutor(6)
+        self.requests = 0
+        self.cookies = {}
+        self.storage = {}
+        self.dead = False
+        self.current = "about:blank"
+        self.page_source = "<html><head></head><body></body></html>"
+
+    def _check(self):
+        if self.dead:
+            raise BrowserGone("browser is not running")
+
+    def crash(self):
+        self.dead = True
+
+    @property
+    def current_url(self):
+        self._check()
+        return self.current
+
+    @property
+    def title(self):
+        self._check()
+        title = BeautifulSoup(self.page_source, "html.parser").title
+        return title.get_text() if title else ""
+
+    def get(self, url):
+        self._check()
+        self.current = url
+        if url == "about:blank":
+            self.page_source = "<html><head></head><body></body></html>"
+            return
+        host = urlsplit(url).netloc
+        request = urllib.request.Request(url)
+        jar = self.cookies.get(host, {})
+        if jar:
+            request.add_header("Cookie", "; ".join(f"{k}={v}" for k, v in jar.items()))
+        with urllib.request.urlopen(request) as response:
+            self.requests += 1
+            for header in response.headers.get_all("Set-Cookie") or []:
+                name, _, value = header.split(";", 1)[0].partition("=")
+                self.cookies.setdefault(host, {})[name.strip()] = value.strip()
+            html = response.read().decode("utf-8", errors="replace")
+        soup = BeautifulSoup(html, "html.parser")
+        list(self.loader.map(self._load, self._subresources(soup, url)))
+        for block in soup.select('script[data-render="quotes"]'):
+            target = soup.select_one("#quotes") or soup.body
+            for quote in json.loads(block.string or "[]"):
+                div = BeautifulSoup(
+                    '<div class="quote"><span class="text"></span><small class="author"></small></div>',
+                    "html.parser").div
+                div.span.string = quote["text"]
+                div.small.string = quote["author"]
+                target.append(div)
+        self.page_source = str(soup)
+
+    def _subresources(self, soup, url):
+        urls = [tag["src"] for tag in soup.select("script[src]")]
+        urls += [tag["href"] for tag in soup.select('link[rel="stylesheet"][href]')]
+        if self.page_load_strategy == "normal":
+            # the load event waits for these; DOMContentLoaded ("eager") doesn't
+            urls += [tag["href"] for tag in soup.select('link[as="font"][href]')]
+            if self.images:
+                urls += [tag["src"] for tag in soup.select("img[src]")]
+        urls = [urljoin(url, u) for u in urls]
+        return [u for u in urls if not any(fnmatch(u, pattern) for pattern in self.blocked)]
+
+    def _load(self, url):
+        with urllib.request.urlopen(url) as response:
+            response.read()
+        self.requests += 1
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"no element matches {value!r}")
+        return elements[0]
+
+    def find_elements(self, by, value):
+        self._check()
+        if by != "css selector":
+            raise NotImplementedError("the stand-in only supports By.CSS_SELECTOR")
+        return [Element(tag) for tag in BeautifulSoup(self.page_source, "html.parser").select(value)]
+
+    def get_cookies(self):
+        self._check()
+        host = urlsplit(self.current).netloc
+        return [{"name": k, "value": v} for k, v in self.cookies.get(host, {}).items()]
+
+    def add_cookie(self, cookie):
+        self._check()
+        self.cookies.setdefault(urlsplit(self.current).netloc, {})[cookie["name"]] = cookie["value"]
+
+    def delete_all_cookies(self):
+        # like Selenium: only the cookies visible to the current page
+        self._check()
+        self.cookies.pop(urlsplit(self.current).netloc, None)
+
+    def execute_script(self, script, *args):
+        self._check()
+        origin = urlsplit(self.current)
+        if origin.scheme not in ("http", "https"):
+            raise JavascriptError("SecurityError: storage is not available on this page")
+        storage = self.storage.setdefault(origin.netloc, {})
+        if "localStorage.clear()" in script:
+            storage.clear()
+        for key, value in re.findall(r"localStorage\.setItem\('([^']*)', '([^']*)'\)", script):
+            storage[key] = value
+        match = re.search(r"return window\.localStorage\.getItem\('([^']*)'\)", script)
+        if match:
+            return storage.get(match.group(1))
+        if "return window.localStorage.length" in script:
+            return len(storage)
+        return None
+
+    def quit(self):
+        self.dead = True
+        self.loader.shutdown(wait=False)